@@ -0,0 +1,206 @@
+"""
+Helpers shared by the review agents
+
+Each agent runs as a script (python .agents/<agent>/review.py), so it puts
+this directory on sys.path before importing from here.
+"""
+import re
+import os
+import functools
+import mmap
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import blake2b
+from itertools import islice
+from typing import List
+import yaml
+
+# libyaml's C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+# Below this many files the process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 64
+# Worker process cap; run_all.py sets it so concurrent agents share the CPUs
+# (unset: one worker per CPU)
+MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "0")) or None
+
+# Files at least this large are decoded straight from an mmap
+MMAP_MIN_SIZE = 256 * 1024
+
+# Serial reviews read ahead this many files on this many threads
+_PREFETCH_WORKERS = 4
+_PREFETCH_DEPTH = 8
+
+
+@functools.lru_cache(maxsize=4)
+def load_config(config_path: str) -> dict:
+    """Parse config.yaml once per process"""
+    with open(config_path) as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def ruleset_version(*paths: str) -> str:
+    """Hash of the given agent source and config files, and of this module
+
+    Any change to them invalidates the caches built with the old rules.
+    """
+    digest = blake2b()
+    for path in (*paths, __file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def read_source(file_path: str, mmap_min_size: int = MMAP_MIN_SIZE) -> str:
+    """Read a file as text, like open(..., errors='ignore').read()
+
+    Empty files are not read at all, and large ones are decoded directly
+    from an mmap so the raw bytes are never copied onto the heap.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ''
+        if size < mmap_min_size:
+            content = f.read().decode('utf-8', errors='ignore')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, 'utf-8', 'ignore')
+
+    # Match text-mode universal newlines
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def prefetched_sources(file_paths, read=read_source):
+    """Yield (path, read(path)) in order while the next files are read on threads
+
+    File reads release the GIL, so reading ahead overlaps I/O with the
+    CPU-bound review of the current file. Read-ahead is bounded.
+    """
+    paths = iter(file_paths)
+    with ThreadPoolExecutor(max_workers=_PREFETCH_WORKERS) as executor:
+        pending = deque((file_path, executor.submit(read, file_path))
+                        for file_path in islice(paths, _PREFETCH_DEPTH))
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(read, next_path)))
+            yield file_path, future.result()
+
+
+def line_table(content: str) -> List[int]:
+    """Offsets at which each line of content starts (index 0 is line 1)"""
+    return [0] + [m.end() for m in re.finditer('\n', content)]
+
+
+def iter_source_files(root: str, exts: tuple, skip_dirs: frozenset):
+    """Yield files under root ending in exts, top-down like os.walk
+
+    Directories named in skip_dirs, and symlinked ones, are not entered.
+    """
+    subdirs = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir():
+                if entry.name not in skip_dirs and not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(exts):
+                yield entry.path
+    for subdir in subdirs:
+        yield from iter_source_files(subdir, exts, skip_dirs)
+
+
+_worker_agent = None
+
+
+def _init_worker(agent_cls: type, config_path: str, config: dict):
+    """Create the per-process agent used by _call_worker_agent"""
+    global _worker_agent
+    # Reuse the parent's parsed config rather than re-reading the YAML
+    _worker_agent = agent_cls(config_path, config)
+
+
+def _call_worker_agent(method: str, *args):
+    return getattr(_worker_agent, method)(*args)
+
+
+def map_in_workers(agent, method: str, *iterables, chunksize: int):
+    """Yield agent.<method>(*args) for each args of iterables, in order
+
+    The calls run in a pool of worker processes, each with its own agent
+    built from agent's config_path and parsed config, so method must only
+    return its results (see the agents' _review_*_isolated methods).
+    """
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                             initargs=(type(agent), agent.config_path, agent._full_config)) as executor:
+        yield from executor.map(functools.partial(_call_worker_agent, method), *iterables, chunksize=chunksize)
+
+
+class ScanCache:
+    """Issues of every file scanned before, for repeat runs (CI, run_all)
+
+    Two maps: path -> (mtime_ns, size, content key) and content key ->
+    issues without their path. A file whose (mtime, size) is unchanged
+    replays its content's issues without being opened; a changed or new
+    file is hashed, so copies of content already scanned anywhere in the
+    tree (generated or vendored duplicates) replay it instead of being
+    scanned again.
+    """
+
+    def __init__(self, cache_path: str, ruleset: str):
+        self.cache_path = cache_path
+        self.ruleset = ruleset
+        self.paths = {}
+        self.contents = {}
+        self.dirty = False
+        try:
+            with open(cache_path, 'rb') as f:
+                ruleset_stored, paths, contents = pickle.load(f)
+            if ruleset_stored == ruleset:
+                self.paths = paths
+                self.contents = contents
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError,
+                pickle.UnpicklingError):
+            pass
+
+    def content_key(self, file_path: str, stamp: tuple) -> bytes:
+        """Key of file_path's extension and bytes, hashed only if stamp changed"""
+        entry = self.paths.get(file_path)
+        if entry is not None and entry[:2] == stamp:
+            return entry[2]
+        # Apart from its extension, a file's path does not affect what the
+        # scan finds, so the key covers the extension and the bytes
+        digest = blake2b(os.path.splitext(file_path)[1].encode())
+        with open(file_path, 'rb') as f:
+            digest.update(f.read())
+        key = digest.digest()
+        self.paths[file_path] = (*stamp, key)
+        self.dirty = True
+        return key
+
+    def store(self, key: bytes, issues: list):
+        self.contents[key] = issues
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        # Drop contents no path has any more (edited or deleted files)
+        live = {entry[2] for entry in self.paths.values()}
+        contents = {key: issues for key, issues in self.contents.items() if key in live}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((self.ruleset, self.paths, contents), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass  # caching is best-effort
@@ -7,82 +7,297 @@ Specific to SaaSForge's three-tier architecture (React → FastAPI → C++ gRPC)
 import re
 import sys
 import os
+import functools
+import importlib.util
+import pickle
+from collections import Counter
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict
-import yaml
+from typing import List, Dict, Optional
+
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _common
+from _common import PARALLEL_MIN_FILES, iter_source_files, load_config, map_in_workers, prefetched_sources, read_source
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from blake3 import blake3 as _content_hash  # optional: pip install blake3
+except ImportError:
+    from hashlib import blake2b as _content_hash
+
+
+_GRPC_CALL_RE = re.compile(r'stub\.(\w+)\(')
+
+# Layer of a path, tried in order (ui, then api, then services/cpp) so
+# precedence matches the original substring checks; lastindex picks the layer
+_LAYER_RE = re.compile(r'(?=(?:.*/)?(ui)/)|(?=(?:.*/)?(api)/)|(?=.*/(services)/cpp/)')
+_LAYER_NAMES = (None, 'ui', 'bff', 'service')
+
+# Paths on critical request paths (auth, payment, upload)
+_CRITICAL_PATH_RE = re.compile(r'auth|payment|upload')
+
+_SOURCE_EXTS = ('.cpp', '.h', '.hpp', '.py', '.ts', '.tsx')
+_SKIP_DIRS = frozenset({'build', 'node_modules', '__pycache__', 'dist', '.git'})
+
+_PARALLEL_CHUNKSIZE = 32
+# Issues carry an integer rank (sort key); icon and label are indexed by it
+_SEVERITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+_SEVERITY_ICONS = ('🔴', '🟠', '🟡', '🟢')
+_SEVERITY_LABELS = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')
+
+# Files at least this large are decoded straight from a memory map
+_MMAP_MIN_SIZE = 16 * 1024
+_read_source = functools.partial(read_source, mmap_min_size=_MMAP_MIN_SIZE)
+
+# Incremental review cache, relative to the directory holding config.yaml
+_CACHE_FILE = os.path.join('.cache', 'architect-review.bin')
+_UNIFIED_CACHE_FILE = os.path.join('.cache', 'architect-unified-review.bin')
+
+_MODES = ('architect', 'architecture', 'both')
+
+# Lowercase keywords consulted by the review checks. Each file is lowered once
+# and matched against all of them in a single pass; checks then test membership
+# in the resulting hit set instead of rescanning the content.
+_KEYWORDS = (
+    'grpc', 'stub', 'not implemented', 'calculate_', 'validate_payment', 'process_',
+    'state', 'tenant', 'psycopg', 'sqlalchemy', 'libpqxx', 'react', 'fastapi',
+    'queue', 'async', 'http', 'retry', 'backoff', 'stripe', 'twilio', 'circuit',
+    'breaker', 'timeout', 'logger', 'log', 'correlation_id', 'trace_id', 'metric',
+    'prometheus',
+)
+
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over _KEYWORDS (None if unavailable)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in _KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _keyword_hits(lower: str) -> set:
+    """Return the subset of _KEYWORDS present in already-lowered content"""
+    if _KEYWORD_AUTOMATON is not None:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(lower)}
+    return {keyword for keyword in _KEYWORDS if keyword in lower}
+
+
+@functools.lru_cache(maxsize=1)
+def _load_compliance_module():
+    """Import the sibling Architecture Compliance agent (architecture/review.py)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'architecture', 'review.py')
+    spec = importlib.util.spec_from_file_location('architecture_review', path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so its issues can be unpickled (pool results, cache)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _ruleset_version(config_path: str, sources: tuple) -> str:
+    """Hash of the agent sources and config; any change invalidates the cache"""
+    digest = _content_hash()
+    for path in (*sources, config_path):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class _ReviewCache:
+    """Per-file issue cache for repeat runs (CI, pre-commit).
+
+    Entries are keyed on the path as reviewed (issue locations embed it) and
+    hold (mtime_ns, size, content_hash, issues). An unchanged (mtime, size)
+    replays the stored issues; otherwise the content hash, when known, decides.
+    """
+
+    def __init__(self, cache_path: str, ruleset: str):
+        self.cache_path = cache_path
+        self.ruleset = ruleset
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(cache_path, 'rb') as f:
+                ruleset_stored, entries = pickle.load(f)
+            if ruleset_stored == ruleset:
+                self.entries = entries
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError,
+                pickle.UnpicklingError):
+            pass
+
+    def lookup(self, file_path: str):
+        """Return (issues, stamp); issues is None if the file must be reviewed"""
+        st = os.stat(file_path)
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return None, (st.st_mtime_ns, st.st_size, None)
+
+        mtime_ns, size, digest, issues = entry
+        if mtime_ns == st.st_mtime_ns and size == st.st_size:
+            return issues, entry[:3]
+
+        # Touched but possibly unchanged (checkout, rebase): compare content
+        with open(file_path, 'rb') as f:
+            current = _content_hash(f.read()).hexdigest()
+        stamp = (st.st_mtime_ns, st.st_size, current)
+        if current == digest:
+            self.store(file_path, stamp, issues)
+            return issues, stamp
+        return None, stamp
+
+    def store(self, file_path: str, stamp: tuple, issues: list):
+        self.entries[file_path] = (*stamp, issues)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((self.ruleset, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass  # caching is best-effort
+
+
+@dataclass(slots=True)
+class Issue:
+    """An architectural issue; the location is only formatted when reported"""
+    severity: int  # rank, see _SEVERITY_RANK
+    code: str
+    message: str
+    file: str
+    line: int
 
 
 class ArchitectReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
-            self.config = config.get('architect', {})
+    _cache_file = _CACHE_FILE
+
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        self.config_path = config_path
+        if config is None:
+            config = load_config(config_path)
+        self._full_config = config
+        self.config = config.get('architect', {})
         self.issues = []
         self.architecture_violations = []
 
     def review_codebase(self, path: str):
         """Review entire codebase for architectural compliance"""
         if os.path.isfile(path):
-            self._review_file(path)
+            file_paths = [path]
         else:
-            self._review_directory(path)
-
-    def _review_directory(self, path: str):
-        """Review directory structure and architectural boundaries"""
-        for root, dirs, files in os.walk(path):
-            # Skip non-code directories
-            dirs[:] = [d for d in dirs if d not in ['build', 'node_modules', '__pycache__', 'dist', '.git']]
+            file_paths = list(iter_source_files(path, _SOURCE_EXTS, _SKIP_DIRS))
+
+        cache = _ReviewCache(os.path.join(os.path.dirname(self.config_path), self._cache_file),
+                             _ruleset_version(self.config_path, self._ruleset_sources()))
+
+        # Replay cached results; only new or changed files are reviewed
+        per_file = []
+        pending = []
+        for file_path in file_paths:
+            issues, stamp = cache.lookup(file_path)
+            if issues is None:
+                pending.append((len(per_file), file_path, stamp))
+            per_file.append(issues)
+
+        reviewed = self._review_files([file_path for _, file_path, _ in pending])
+        for (index, file_path, stamp), issues in zip(pending, reviewed):
+            per_file[index] = issues
+            cache.store(file_path, stamp, issues)
+
+        for issues in per_file:
+            self._merge_file_issues(issues)
+        cache.save()
+
+    def _ruleset_sources(self) -> tuple:
+        """Source files whose rules determine the cached results"""
+        return (__file__, _common.__file__)
+
+    def _merge_file_issues(self, issues: list):
+        """Add the result of _review_file_isolated to the report"""
+        self.issues.extend(issues)
+
+    def _review_files(self, file_paths: List[str]):
+        """Yield the issues of each file, in order"""
+        if len(file_paths) < PARALLEL_MIN_FILES:
+            for file_path, content in prefetched_sources(file_paths, _read_source):
+                yield self._review_file_isolated(file_path, content)
+            return
+
+        # Files are reviewed independently, so fan them out across cores;
+        # map() keeps results in walk order for a stable report
+        yield from map_in_workers(self, '_review_file_isolated', file_paths, chunksize=_PARALLEL_CHUNKSIZE)
+
+    def _review_file_isolated(self, file_path: str, content: Optional[str] = None) -> list:
+        """Review a single file and return only its issues"""
+        issues, self.issues = self.issues, []
+        try:
+            self._review_file(file_path, content)
+            return self.issues
+        finally:
+            self.issues = issues
+
+    def _review_file(self, file_path: str, content: Optional[str] = None):
+        """Review individual file for architectural patterns"""
+        if content is None:
+            content = _read_source(file_path)
+        self._review_content(file_path, content, content.lower())
 
-            for file in files:
-                file_path = os.path.join(root, file)
-                if file.endswith(('.cpp', '.h', '.hpp', '.py', '.ts', '.tsx')):
-                    self._review_file(file_path)
+    def _review_content(self, file_path: str, content: str, lower: str):
+        """Run the architect checks on already-read (and lowered) content"""
+        hits = _keyword_hits(lower)
 
-    def _review_file(self, file_path: str):
-        """Review individual file for architectural patterns"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        path_lower = file_path.lower()
 
         # Determine layer
         layer = self._identify_layer(file_path)
 
         # Layer-specific reviews
         if layer == 'ui':
-            self._review_ui_layer(content, lines, file_path)
+            self._review_ui_layer(content, hits, file_path, path_lower)
         elif layer == 'bff':
-            self._review_bff_layer(content, lines, file_path)
+            self._review_bff_layer(content, hits, file_path, path_lower)
         elif layer == 'service':
-            self._review_service_layer(content, lines, file_path)
+            self._review_service_layer(content, hits, file_path, path_lower)
 
         # Cross-cutting concerns
-        self._review_separation_of_concerns(content, lines, file_path, layer)
-        self._review_communication_patterns(content, lines, file_path, layer)
-        self._review_resilience_patterns(content, lines, file_path)
-        self._review_observability(content, lines, file_path)
+        self._review_separation_of_concerns(content, hits, file_path, layer)
+        self._review_communication_patterns(content, hits, file_path, path_lower, layer)
+        self._review_resilience_patterns(content, hits, file_path, path_lower)
+        self._review_observability(content, hits, file_path, path_lower)
 
     def _identify_layer(self, file_path: str) -> str:
         """Identify which architectural layer the file belongs to"""
-        if '/ui/' in file_path or file_path.startswith('ui/'):
-            return 'ui'
-        elif '/api/' in file_path or file_path.startswith('api/'):
-            return 'bff'
-        elif '/services/cpp/' in file_path:
-            return 'service'
-        return 'unknown'
-
-    def _review_ui_layer(self, content: str, lines: List[str], file_path: str):
+        match = _LAYER_RE.match(file_path)
+        return _LAYER_NAMES[match.lastindex] if match else 'unknown'
+
+    def _review_ui_layer(self, content: str, hits: set, file_path: str, path_lower: str):
         """Review UI layer architectural patterns"""
         # UI should NOT directly call gRPC services
-        if 'grpc' in content.lower():
+        if 'grpc' in hits:
             self._add_issue('critical',
                           'UI layer bypassing BFF - direct gRPC call detected',
                           file_path, 0, 'ARCH-001')
 
         # UI should NOT have business logic
-        if any(keyword in content.lower() for keyword in ['calculate_', 'validate_payment', 'process_']):
+        if any(keyword in hits for keyword in ['calculate_', 'validate_payment', 'process_']):
             # Check if it's in a component (not a utility)
-            if 'component' in file_path.lower() or 'page' in file_path.lower():
+            if 'component' in path_lower or 'page' in path_lower:
                 self._add_issue('high',
                               'Business logic in UI component - move to BFF',
                               file_path, 0, 'ARCH-002')
@@ -104,26 +319,26 @@ class ArchitectReviewAgent:
                               'Direct fetch/axios call - use centralized API client',
                               file_path, 0, 'ARCH-004')
 
-    def _review_bff_layer(self, content: str, lines: List[str], file_path: str):
+    def _review_bff_layer(self, content: str, hits: set, file_path: str, path_lower: str):
         """Review BFF (Backend for Frontend) layer patterns"""
         # BFF should NOT have business logic - delegate to gRPC services
         if 'def process_' in content or 'async def calculate_' in content:
-            if 'grpc' not in content.lower() or 'stub' not in content.lower():
+            if 'grpc' not in hits or 'stub' not in hits:
                 self._add_issue('high',
                               'Business logic in BFF - delegate to gRPC service',
                               file_path, 0, 'ARCH-005')
 
         # BFF should NOT directly access database (use gRPC services)
         if 'SELECT' in content or 'execute(' in content or 'query(' in content:
-            if 'test' not in file_path.lower():
+            if 'test' not in path_lower:
                 self._add_issue('critical',
                               'BFF directly accessing database - use gRPC service',
                               file_path, 0, 'ARCH-006')
 
         # Check for proper gRPC client usage
-        if 'router' in file_path.lower():
-            if 'grpc' not in content.lower() and 'stub' not in content.lower():
-                if 'not implemented' not in content.lower():
+        if 'router' in path_lower:
+            if 'grpc' not in hits and 'stub' not in hits:
+                if 'not implemented' not in hits:
                     self._add_issue('medium',
                                   'Router endpoint not calling gRPC service',
                                   file_path, 0, 'ARCH-007')
@@ -132,15 +347,15 @@ class ArchitectReviewAgent:
         if 'async def' in content:
             # Good - async for parallel gRPC calls
             pass
-        elif 'def ' in content and 'grpc' in content.lower():
+        elif 'def ' in content and 'grpc' in hits:
             self._add_issue('low',
                           'BFF endpoint not async - consider parallelizing gRPC calls',
                           file_path, 0, 'ARCH-008')
 
-    def _review_service_layer(self, content: str, lines: List[str], file_path: str):
+    def _review_service_layer(self, content: str, hits: set, file_path: str, path_lower: str):
         """Review C++ gRPC service layer patterns"""
         # Services should be stateless
-        if 'static' in content and 'state' in content.lower():
+        if 'static' in content and 'state' in hits:
             if 'thread_local' not in content:
                 self._add_issue('high',
                               'Service has shared mutable state - violates stateless design',
@@ -148,14 +363,14 @@ class ArchitectReviewAgent:
 
         # Check for proper tenant context propagation
         if 'grpc::ServerContext' in content:
-            if 'tenant' not in content.lower():
+            if 'tenant' not in hits:
                 self._add_issue('high',
                               'gRPC handler missing tenant context extraction',
                               file_path, 0, 'ARCH-010')
 
         # Services should use repository pattern for data access
         if 'SELECT' in content or 'INSERT' in content:
-            if 'repository' not in file_path.lower() and 'dao' not in file_path.lower():
+            if 'repository' not in path_lower and 'dao' not in path_lower:
                 self._add_issue('medium',
                               'Direct SQL in service - use repository pattern',
                               file_path, 0, 'ARCH-011')
@@ -164,12 +379,12 @@ class ArchitectReviewAgent:
         if 'return grpc::Status' in content:
             # Good - proper gRPC status codes
             pass
-        elif 'throw' in content and 'service' in file_path.lower():
+        elif 'throw' in content and 'service' in path_lower:
             self._add_issue('medium',
                           'Service throwing exceptions - return grpc::Status instead',
                           file_path, 0, 'ARCH-012')
 
-    def _review_separation_of_concerns(self, content: str, lines: List[str], file_path: str, layer: str):
+    def _review_separation_of_concerns(self, content: str, hits: set, file_path: str, layer: str):
         """Review separation of concerns across layers"""
         # Check for cross-layer dependencies
         violations = {
@@ -180,17 +395,17 @@ class ArchitectReviewAgent:
 
         if layer in violations:
             for forbidden in violations[layer]:
-                if forbidden in content.lower():
+                if forbidden in hits:
                     self._add_issue('critical',
                                   f'{layer.upper()} layer using {forbidden} - violates separation',
                                   file_path, 0, 'ARCH-013')
 
-    def _review_communication_patterns(self, content: str, lines: List[str], file_path: str, layer: str):
+    def _review_communication_patterns(self, content: str, hits: set, file_path: str, path_lower: str, layer: str):
         """Review inter-service communication patterns"""
         # Check for synchronous vs asynchronous patterns
-        if layer == 'bff' and 'grpc' in content.lower():
+        if layer == 'bff' and 'grpc' in hits:
             # Count sequential gRPC calls
-            grpc_calls = re.findall(r'stub\.(\w+)\(', content)
+            grpc_calls = _GRPC_CALL_RE.findall(content)
             if len(grpc_calls) >= 3:
                 # Check if they're parallelized
                 if 'asyncio.gather' not in content and 'await.*await.*await' in content:
@@ -199,49 +414,49 @@ class ArchitectReviewAgent:
                                   file_path, 0, 'ARCH-014')
 
         # Check for event-driven patterns where appropriate
-        if 'notification' in file_path.lower() or 'webhook' in file_path.lower():
-            if 'queue' not in content.lower() and 'async' not in content.lower():
+        if 'notification' in path_lower or 'webhook' in path_lower:
+            if 'queue' not in hits and 'async' not in hits:
                 self._add_issue('low',
                               'Notification/webhook should be async/queued',
                               file_path, 0, 'ARCH-015')
 
-    def _review_resilience_patterns(self, content: str, lines: List[str], file_path: str):
+    def _review_resilience_patterns(self, content: str, hits: set, file_path: str, path_lower: str):
         """Review resilience and fault tolerance patterns"""
         # Check for retry logic
-        if 'grpc' in content.lower() or 'http' in content.lower():
-            if 'retry' not in content.lower() and 'backoff' not in content.lower():
-                if 'client' in file_path.lower():
+        if 'grpc' in hits or 'http' in hits:
+            if 'retry' not in hits and 'backoff' not in hits:
+                if 'client' in path_lower:
                     self._add_issue('medium',
                                   'External call without retry/backoff - add resilience',
                                   file_path, 0, 'ARCH-016')
 
         # Check for circuit breaker pattern
-        if 'stripe' in content.lower() or 'twilio' in content.lower():
-            if 'circuit' not in content.lower() and 'breaker' not in content.lower():
+        if 'stripe' in hits or 'twilio' in hits:
+            if 'circuit' not in hits and 'breaker' not in hits:
                 self._add_issue('low',
                               'External service call without circuit breaker',
                               file_path, 0, 'ARCH-017')
 
         # Check for timeout configuration
         if 'grpc.insecure_channel' in content or 'requests.get' in content:
-            if 'timeout' not in content.lower():
+            if 'timeout' not in hits:
                 self._add_issue('high',
                               'Network call without timeout - can cause thread exhaustion',
                               file_path, 0, 'ARCH-018')
 
-    def _review_observability(self, content: str, lines: List[str], file_path: str):
+    def _review_observability(self, content: str, hits: set, file_path: str, path_lower: str):
         """Review observability patterns (logging, metrics, tracing)"""
         # Check for structured logging
-        if 'logger' in content.lower() or 'log' in content.lower():
-            if 'correlation_id' not in content.lower() and 'trace_id' not in content.lower():
-                if 'middleware' not in file_path.lower():
+        if 'logger' in hits or 'log' in hits:
+            if 'correlation_id' not in hits and 'trace_id' not in hits:
+                if 'middleware' not in path_lower:
                     self._add_issue('low',
                                   'Logging without correlation_id - add for request tracing',
                                   file_path, 0, 'ARCH-019')
 
         # Check for metrics in critical paths
-        if any(keyword in file_path.lower() for keyword in ['auth', 'payment', 'upload']):
-            if 'metric' not in content.lower() and 'prometheus' not in content.lower():
+        if _CRITICAL_PATH_RE.search(path_lower):
+            if 'metric' not in hits and 'prometheus' not in hits:
                 if 'service.cpp' in file_path or 'router.py' in file_path:
                     self._add_issue('low',
                                   'Critical path missing metrics instrumentation',
@@ -249,7 +464,7 @@ class ArchitectReviewAgent:
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int, code: str):
         """Add an architectural issue"""
-        self.issues.append((severity, code, message, f"{file_path}:{line}"))
+        self.issues.append(Issue(_SEVERITY_RANK[severity], code, message, file_path, line))
 
     def report(self):
         """Generate architect review report"""
@@ -267,27 +482,28 @@ class ArchitectReviewAgent:
         print("=" * 80)
         print()
 
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        sorted_issues = sorted(self.issues, key=lambda x: severity_order[x[0]])
+        # Stable sort on rank only, keeping discovery order within a severity
+        sorted_issues = sorted(self.issues, key=attrgetter('severity'))
 
-        for severity, code, message, location in sorted_issues:
-            icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}[severity]
-            print(f"{icon} [{code}] [{severity.upper()}] {message}")
-            print(f"   Location: {location}")
+        for issue in sorted_issues:
+            print(f"{_SEVERITY_ICONS[issue.severity]} [{issue.code}] "
+                  f"[{_SEVERITY_LABELS[issue.severity]}] {issue.message}")
+            print(f"   Location: {issue.file}:{issue.line}")
             print()
 
         # Category breakdown
         categories = {}
-        for _, code, _, _ in self.issues:
-            category = code.split('-')[0]
+        for issue in self.issues:
+            category = issue.code.split('-')[0]
             categories[category] = categories.get(category, 0) + 1
 
         print(f"Summary by Category:")
         print(f"  ARCH: {categories.get('ARCH', 0)} architectural violations")
         print()
 
-        critical_count = sum(1 for s, _, _, _ in self.issues if s == 'critical')
-        high_count = sum(1 for s, _, _, _ in self.issues if s == 'high')
+        severity_counts = Counter(issue.severity for issue in self.issues)
+        critical_count = severity_counts[_SEVERITY_RANK['critical']]
+        high_count = severity_counts[_SEVERITY_RANK['high']]
 
         print(f"Total: {len(self.issues)} issues ({critical_count} critical, {high_count} high)")
         print()
@@ -309,18 +525,71 @@ class ArchitectReviewAgent:
         return 1 if critical_count > 0 or high_count > 0 else 0
 
 
+class UnifiedReviewAgent(ArchitectReviewAgent):
+    """Software Architect and Architecture Compliance checks in one pass
+
+    Each file is read and lowered once and fed to both agents; the two
+    reports are printed as before.
+    """
+    _cache_file = _UNIFIED_CACHE_FILE
+
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        super().__init__(config_path, config)
+        self._compliance_module = _load_compliance_module()
+        self.compliance = self._compliance_module.ArchitectureReviewAgent(config_path, self._full_config)
+
+    def _ruleset_sources(self) -> tuple:
+        return (__file__, _common.__file__, self._compliance_module.__file__)
+
+    def _review_content(self, file_path: str, content: str, lower: str):
+        super()._review_content(file_path, content, lower)
+        # Compliance only covers its own file types (no .hpp)
+        if file_path.endswith(self._compliance_module._SOURCE_EXTS):
+            self.compliance.review_file(file_path, content, lower)
+
+    def _review_file_isolated(self, file_path: str, content: Optional[str] = None) -> tuple:
+        compliance_issues, self.compliance.issues = self.compliance.issues, []
+        try:
+            issues = super()._review_file_isolated(file_path, content)
+            return issues, self.compliance.issues
+        finally:
+            self.compliance.issues = compliance_issues
+
+    def _merge_file_issues(self, issues: tuple):
+        architect_issues, compliance_issues = issues
+        self.issues.extend(architect_issues)
+        self.compliance.issues.extend(compliance_issues)
+
+    def report(self):
+        """Print the Software Architect report, then the compliance report"""
+        architect_code = super().report()
+        compliance_code = self.compliance.report()
+        return max(architect_code, compliance_code)
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python architect/review.py <file_or_directory>")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--mode=')]
+    modes = [arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--mode=')]
+    mode = modes[-1] if modes else 'architect'
+
+    if not args or mode not in _MODES:
+        print("Usage: python architect/review.py [--mode=architect|architecture|both] <file_or_directory>")
         print("\nSoftware Architect Agent - Reviews system architecture and design patterns")
         print("Specific to SaaSForge's three-tier architecture:")
         print("  - UI Layer (React): Presentation only, no business logic")
         print("  - BFF Layer (FastAPI): Aggregation, no business logic")
         print("  - Service Layer (C++ gRPC): Business logic, stateless")
+        print("\n--mode=both also runs the Architecture Compliance checks in the same pass")
         sys.exit(1)
 
-    path = sys.argv[1]
-    agent = ArchitectReviewAgent()
+    path = args[0]
+    if mode == 'architecture':
+        compliance = _load_compliance_module()
+        agent = compliance.ArchitectureReviewAgent()
+        compliance.review_path(agent, path)
+        sys.exit(agent.report())
+
+    agent = UnifiedReviewAgent() if mode == 'both' else ArchitectReviewAgent()
 
     print(f"🏗️  Reviewing architecture of: {path}")
     print()
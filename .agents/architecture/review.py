@@ -6,15 +6,100 @@ Validates adherence to SRS requirements and design patterns
 import re
 import sys
 import os
+from bisect import bisect_right
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
-import yaml
+from typing import List, Dict, Optional
+
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import iter_source_files, line_table, load_config, prefetched_sources, read_source
+
+try:
+    import numpy as np  # optional: pip install numba
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+_REQ_RE = re.compile(r'(?:Requirement|Req\.?)\s+([A-E]-\d+)', re.IGNORECASE)
+_ERR_CODE_RE = re.compile(r'["\']([A-Z_]+_\d{3})["\']')
+_VALID_ERR_PREFIXES = ('AUTH_', 'UP_', 'PAY_', 'NOTIF_', 'EMAIL_')
+
+_SOURCE_EXTS = ('.cpp', '.h', '.py', '.ts', '.tsx')
+_SKIP_DIRS = frozenset({'build', 'node_modules', '__pycache__'})
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _scan_lines_kernel(buf, pat):
+        """1-based numbers of the lines of buf that contain pat (no newlines)"""
+        n = buf.shape[0]
+        m = pat.shape[0]
+        line_count = 1
+        for c in buf:
+            if c == 10:
+                line_count += 1
+        out = np.empty(line_count, np.int64)
+        k = 0
+        line = 1
+        i = 0
+        while i <= n - m:
+            if buf[i] == 10:
+                line += 1
+                i += 1
+                continue
+            j = 0
+            while j < m and buf[i + j] == pat[j]:
+                j += 1
+            if j == m:
+                if k == 0 or out[k - 1] != line:
+                    out[k] = line
+                    k += 1
+                i += m
+            else:
+                i += 1
+        return out[:k]
+
+
+def _lines_containing(lower: str, needle: str) -> List[int]:
+    """1-based numbers of the lines of lower that contain needle"""
+    if njit is not None:
+        buf = np.frombuffer(lower.encode('utf-8'), dtype=np.uint8)
+        pat = np.frombuffer(needle.encode('utf-8'), dtype=np.uint8)
+        return _scan_lines_kernel(buf, pat).tolist()
+
+    numbers = []
+    line = 1
+    counted_to = 0
+    pos = lower.find(needle)
+    while pos != -1:
+        line += lower.count('\n', counted_to, pos)
+        numbers.append(line)
+        # Resume on the next line; one hit per line is enough
+        newline = lower.find('\n', pos)
+        if newline == -1:
+            break
+        line += 1
+        counted_to = newline + 1
+        pos = lower.find(needle, counted_to)
+    return numbers
+
+
+@dataclass(slots=True)
+class Issue:
+    """A compliance issue; the location is only formatted when reported"""
+    severity: str
+    message: str
+    file: str
+    line: int
 
 
 class ArchitectureReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)['architecture']
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        if config is None:
+            config = load_config(config_path)
+        self.config = config['architecture']
         self.issues = []
         self.requirements = self._load_requirements()
 
@@ -29,85 +114,110 @@ class ArchitectureReviewAgent:
             'E-': 'Email & Transaction Management'
         }
 
-    def review_file(self, file_path: str):
+    def review_file(self, file_path: str, content: Optional[str] = None, lower: Optional[str] = None):
         """Review file for architecture compliance"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        if content is None:
+            content = read_source(file_path)
+        if lower is None:
+            lower = content.lower()
+        path_lower = file_path.lower()
 
         ext = Path(file_path).suffix
 
         # Check requirement traceability
-        self._check_requirement_references(content, file_path)
+        self._check_requirement_references(content, lower, file_path, path_lower)
 
         # Check error code format
-        self._check_error_codes(lines, file_path)
+        self._check_error_codes(content, lower, file_path)
 
         # Check idempotency key usage
-        if 'payment' in file_path.lower() or 'subscription' in file_path.lower():
-            self._check_idempotency(content, lines, file_path)
+        if 'payment' in path_lower or 'subscription' in path_lower:
+            self._check_idempotency(content, lower, file_path)
 
         # Check multi-tenancy patterns
-        self._check_multi_tenancy(content, lines, file_path)
+        self._check_multi_tenancy(content, lower, file_path)
 
-    def _check_requirement_references(self, content: str, file_path: str):
+    def _check_requirement_references(self, content: str, lower: str, file_path: str, path_lower: str):
         """Check if code references SRS requirements"""
-        # Look for requirement references in comments (e.g., Requirement A-22)
-        req_pattern = r'(?:Requirement|Req\.?)\s+([A-E]-\d+)'
-        matches = re.findall(req_pattern, content, re.IGNORECASE)
+        # Only service/router/controller sources need traceability
+        if 'test' in path_lower:
+            return
+        if not any(keyword in path_lower for keyword in ['service', 'router', 'controller']):
+            return
 
-        if not matches and 'test' not in file_path.lower():
-            if any(keyword in file_path.lower() for keyword in ['service', 'router', 'controller']):
-                self._add_issue('low', 'Missing requirement traceability comments', file_path, 0)
+        # Look for requirement references in comments (e.g., Requirement A-22);
+        # every match contains 'req', so skip the regex when that is absent
+        if 'req' in lower and _REQ_RE.search(content):
+            return
 
-    def _check_error_codes(self, lines: List[str], file_path: str):
+        self._add_issue('low', 'Missing requirement traceability comments', file_path, 0)
+
+    def _check_error_codes(self, content: str, lower: str, file_path: str):
         """Validate error code format (AUTH_001, UP_001, etc.)"""
-        error_pattern = r'["\']([A-Z_]+_\d{3})["\']'
-
-        for i, line in enumerate(lines, 1):
-            if 'error' in line.lower() or 'exception' in line.lower():
-                matches = re.findall(error_pattern, line)
-                for code in matches:
-                    # Validate format
-                    valid_prefixes = ['AUTH_', 'UP_', 'PAY_', 'NOTIF_', 'EMAIL_']
-                    if not any(code.startswith(prefix) for prefix in valid_prefixes):
-                        self._add_issue('medium', f'Invalid error code format: {code}', file_path, i)
-
-    def _check_idempotency(self, content: str, lines: List[str], file_path: str):
+        # Codes only count on error/exception lines
+        if 'error' not in lower and 'exception' not in lower:
+            return
+
+        # One sweep over the whole buffer; line numbers are only resolved for
+        # codes with an invalid prefix, which are rare.
+        line_starts = None
+        for match in _ERR_CODE_RE.finditer(content):
+            code = match.group(1)
+            if code.startswith(_VALID_ERR_PREFIXES):
+                continue
+
+            if line_starts is None:
+                line_starts = line_table(content)
+            i = bisect_right(line_starts, match.start())
+            end = content.find('\n', match.end())
+            line_lower = content[line_starts[i - 1]:end if end != -1 else len(content)].lower()
+
+            # Only codes on error/exception lines are error codes
+            if 'error' in line_lower or 'exception' in line_lower:
+                self._add_issue('medium', f'Invalid error code format: {code}', file_path, i)
+
+    def _check_idempotency(self, content: str, lower: str, file_path: str):
         """Check idempotency key implementation"""
         if 'def create' in content or 'def process' in content or 'async def create' in content:
-            if 'idempotency' not in content.lower():
+            if 'idempotency' not in lower:
                 self._add_issue('high', 'Payment endpoint missing idempotency key handling', file_path, 0)
 
             # Check for Redis caching of idempotency results
-            if 'idempotency' in content.lower() and 'redis' not in content.lower():
+            if 'idempotency' in lower and 'redis' not in lower:
                 self._add_issue('medium', 'Idempotency implementation missing Redis cache', file_path, 0)
 
-    def _check_multi_tenancy(self, content: str, lines: List[str], file_path: str):
+    def _check_multi_tenancy(self, content: str, lower: str, file_path: str):
         """Validate multi-tenancy patterns"""
+        if 'tenant_id' not in lower:
+            return
+        # Both checks below only look at lines mentioning tenant_id; the
+        # content is only split into lines for files that get this far
+        tenant_lines = _lines_containing(lower, 'tenant_id')
+        lines = content.split('\n')
+
         # Check for tenant context extraction
-        if 'grpc' in content.lower() or 'request' in content.lower():
-            if 'tenant_id' in content.lower():
-                # Good - tenant_id is being used
-
-                # Check if it's being validated
-                for i, line in enumerate(lines, 1):
-                    if 'tenant_id' in line.lower():
-                        # Look for validation in surrounding lines
-                        context = '\n'.join(lines[max(0, i-5):min(len(lines), i+5)])
-                        if 'if' not in context and 'check' not in context.lower() and 'validate' not in context.lower():
-                            self._add_issue('medium', 'tenant_id extracted but not validated', file_path, i)
-                            break
+        if 'grpc' in lower or 'request' in lower:
+            # Good - tenant_id is being used
+
+            # Check if it's being validated
+            lines_lower = lower.split('\n')
+            for i in tenant_lines:
+                # Look for validation in surrounding lines (i is 1-based)
+                if not any('if' in lines[j] or 'check' in lines_lower[j] or 'validate' in lines_lower[j]
+                           for j in range(max(0, i - 5), min(len(lines), i + 5))):
+                    self._add_issue('medium', 'tenant_id extracted but not validated', file_path, i)
+                    break
 
         # Check for client-provided tenant_id (security issue)
-        for i, line in enumerate(lines, 1):
-            if 'request.' in line and 'tenant_id' in line.lower():
+        for i in tenant_lines:
+            line = lines[i - 1]
+            if 'request.' in line:
                 if 'body' in line or 'json' in line or 'form' in line:
                     self._add_issue('critical', 'tenant_id from request body (security risk - use JWT)', file_path, i)
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int):
         """Add an architecture issue"""
-        self.issues.append((severity, message, f"{file_path}:{line}"))
+        self.issues.append(Issue(severity, message, file_path, line))
 
     def report(self):
         """Generate architecture compliance report"""
@@ -118,14 +228,23 @@ class ArchitectureReviewAgent:
         print(f"\n🏗️  Architecture Compliance Report")
         print("=" * 80)
 
-        for severity, message, location in self.issues:
-            icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}[severity]
-            print(f"{icon} [{severity.upper()}] {message}")
-            print(f"   Location: {location}")
+        for issue in self.issues:
+            icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}[issue.severity]
+            print(f"{icon} [{issue.severity.upper()}] {issue.message}")
+            print(f"   Location: {issue.file}:{issue.line}")
             print()
 
         print(f"Total: {len(self.issues)} issues")
-        return 1 if any(s[0] in ['critical', 'high'] for s in self.issues) else 0
+        return 1 if any(issue.severity in ['critical', 'high'] for issue in self.issues) else 0
+
+
+def review_path(agent: ArchitectureReviewAgent, path: str):
+    """Review a single file or every source file under a directory"""
+    if os.path.isfile(path):
+        agent.review_file(path)
+    elif os.path.isdir(path):
+        for file_path, content in prefetched_sources(iter_source_files(path, _SOURCE_EXTS, _SKIP_DIRS)):
+            agent.review_file(file_path, content)
 
 
 def main():
@@ -135,16 +254,7 @@ def main():
 
     path = sys.argv[1]
     agent = ArchitectureReviewAgent()
-
-    if os.path.isfile(path):
-        agent.review_file(path)
-    elif os.path.isdir(path):
-        for root, dirs, files in os.walk(path):
-            dirs[:] = [d for d in dirs if d not in ['build', 'node_modules', '__pycache__']]
-            for file in files:
-                if file.endswith(('.cpp', '.h', '.py', '.ts', '.tsx')):
-                    agent.review_file(os.path.join(root, file))
-
+    review_path(agent, path)
     sys.exit(agent.report())
 
 
@@ -6,21 +6,194 @@ Validates GitHub Actions workflows, Kubernetes manifests, Dockerfiles, and deplo
 import re
 import sys
 import os
-from pathlib import Path
-from typing import List, Tuple
+import functools
+from bisect import bisect_right
+from enum import IntEnum
+from typing import List, Optional, Tuple
 import yaml
 
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# libyaml's C loader is the fastest safe loader available to us:
+# msgspec.yaml decodes through PyYAML itself before converting to structs,
+# and ruamel.yaml's C path is the same libyaml parser, so neither would
+# save any of the per-node allocation the manifest reviewers pay for.
+from _common import PARALLEL_MIN_FILES, SafeLoader, line_table, load_config, map_in_workers, read_source
+
+
+@functools.lru_cache(maxsize=128)
+def _load_yaml(content: str):
+    """Parse YAML content once; repeat reviews of the same content are free.
+
+    Results are shared between callers and must not be mutated.
+    """
+    return yaml.load(content, Loader=SafeLoader)
+
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+
+@functools.lru_cache(maxsize=128)
+def _load_manifests(content: str) -> tuple:
+    """(kind, metadata, spec) of each non-empty document of a manifest file
+
+    Every document is composed, so syntax errors anywhere still raise, but
+    only workload documents are built into Python objects in full. Other
+    kinds are only checked on kind and metadata, so their spec (often the
+    bulk of a ConfigMap or CRD) is never constructed and comes back empty.
+    Results are shared between callers and must not be mutated.
+    """
+    loader = SafeLoader(content)
+    try:
+        nodes = []
+        while loader.check_node():
+            nodes.append(loader.get_node())
+
+        manifests = []
+        for node in nodes:
+            fields = {}
+            if isinstance(node, yaml.MappingNode):
+                for key_node, value_node in node.value:
+                    if key_node.tag == _MERGE_TAG:
+                        fields = None  # merged keys; build the whole document
+                        break
+                    if key_node.tag == _STR_TAG and key_node.value in ('kind', 'metadata'):
+                        fields[key_node.value] = value_node
+
+            if fields is not None and node.value and 'kind' in fields:
+                kind = loader.construct_document(fields['kind'])
+                if kind not in _WORKLOAD_KINDS:
+                    metadata_node = fields.get('metadata')
+                    metadata = loader.construct_document(metadata_node) if metadata_node else {}
+                    manifests.append((kind, metadata, {}))
+                    continue
+
+            manifest = loader.construct_document(node)
+            if not manifest:
+                continue
+            manifests.append((manifest.get('kind', ''), manifest.get('metadata', {}), manifest.get('spec', {})))
+        return tuple(manifests)
+    finally:
+        loader.dispose()
+
+
+def _line_range(content: str, line_starts: List[int], first: int, last: int) -> str:
+    """Text of the 1-based lines first..last of content, clamped to the file"""
+    if first > len(line_starts):
+        return ''
+    end = line_starts[last] - 1 if last < len(line_starts) else len(content)
+    return content[line_starts[first - 1]:end]
+
+
+def _lines_containing(content: str, line_starts: List[int], needle: str) -> List[int]:
+    """1-based numbers of the lines of content that contain needle"""
+    numbers = []
+    pos = content.find(needle)
+    while pos != -1:
+        i = bisect_right(line_starts, pos)
+        numbers.append(i)
+        # Resume on the next line; one hit per line is enough
+        if i == len(line_starts):
+            break
+        pos = content.find(needle, line_starts[i])
+    return numbers
+
+
+def _mentions(node, needle: str, lower: bool = False) -> bool:
+    """Whether needle occurs in a string key or value anywhere in a parsed tree
+
+    Answers what `needle in str(node)` did without building the repr of
+    the whole subtree; with lower, strings are compared lowercased.
+    """
+    if isinstance(node, str):
+        return needle in (node.lower() if lower else node)
+    if isinstance(node, dict):
+        return any(_mentions(key, needle, lower) or _mentions(value, needle, lower)
+                   for key, value in node.items())
+    if isinstance(node, list):
+        return any(_mentions(item, needle, lower) for item in node)
+    return False
+
+
+def _first_hit_per_line(pattern: re.Pattern, content: str, line_starts: List[int]) -> list:
+    """(line, match) for the first match of pattern on each line, like a per-line search"""
+    hits = []
+    for match in pattern.finditer(content):
+        i = bisect_right(line_starts, match.start())
+        if not hits or hits[-1][0] != i:
+            hits.append((i, match))
+    return hits
+
+
+_SHA256_RE = re.compile(r'^[a-f0-9]{64}$')
+# Line-based workflow rules, each run once over the whole file. None of
+# them crosses a newline; 'bash' ends in 'sh', so '.*sh' covers both shells.
+_USES_RE = re.compile(r'uses:[^\S\n]*(?P<action>[^\s@]+)@(?P<version>\S+)')
+# Secret patterns run on lowercased text instead of with IGNORECASE
+_WORKFLOW_SECRET_RE = re.compile(r'(?:password|token|secret|api[_-]?key)[^\S\n]*:[^\S\n]*["\']?[a-z0-9]{20,}')
+_PIPE_TO_SHELL_RE = re.compile(r'(?:curl|wget).*\|.*sh')
+# Lowercase words every CICD-003 match contains one of
+_SECRET_ANCHORS = ('password', 'token', 'secret', 'api')
+# The Dockerfile and Kubernetes line rules below also run over the whole
+# file, so none of them may cross a newline either
+_LAYER_SECRET_RE = re.compile(r'(password|secret|token|api[_-]?key)[^\S\n]*=[^\S\n]*["\'][^"\'\n]+["\']')
+_HARDCODED_CONFIG_RE = re.compile(r'(DATABASE_URL|REDIS_URL|API_KEY)[^\S\n]*:[^\S\n]*["\'][^"\'\n]+["\']')
+_SECRET_NAMES = ('password', 'secret', 'token', 'key')
+# Lines any of the Dockerfile package-manager rules (CICD-027/028) look at
+_PACKAGE_CMD_RE = re.compile(r'apt-get (?:install|update)|apk add')
+# Dependency installs that a preceding COPY of the sources busts (CICD-029)
+_INSTALL_CMD_RE = re.compile(r'apt-get install|npm install|pip install|apk add')
+# Instructions at the start of a Dockerfile line (CICD-021/024/026, CICD-029)
+_FROM_LINE_RE = re.compile(r'^[^\S\n]*FROM', re.MULTILINE)
+_COPY_LINE_RE = re.compile(r'^[^\S\n]*COPY', re.MULTILINE)
+# USER anywhere on a line that is not a comment
+_USER_LINE_RE = re.compile(r'^(?![^\S\n]*#)[^\n]*USER', re.MULTILINE)
+_PRIVILEGED_RE = re.compile(r'--privileged|--cap-add=ALL')
+
+# Issues are bucketed by severity rank, most severe first
+_SEVERITIES = ('critical', 'high', 'medium', 'low')
+_SEVERITY_RANK = {severity: rank for rank, severity in enumerate(_SEVERITIES)}
+_SEVERITY_ICONS = ('🔴', '🟠', '🟡', '🟢')
+
+_PARALLEL_CHUNKSIZE = 8
+
+
+class Category(IntEnum):
+    """Kind of CI/CD file; indexes the reviewer dispatch table"""
+    WORKFLOW = 0
+    DOCKERFILE = 1
+    K8S = 2
+    COMPOSE = 3
+    KUSTOMIZE = 4
+
+
+_YAML_EXTS = ('.yml', '.yaml')
+# Workflow jobs that should not block the pipeline (CICD-010)
+_LINT_KEYWORDS = ('lint', 'format', 'scan')
+
+# Kubernetes kinds that carry a pod template
+_WORKLOAD_KINDS = frozenset({'Deployment', 'StatefulSet', 'DaemonSet', 'Pod'})
+# Kinds that should carry a tenant-id label (CICD-015)
+_TENANT_LABELED_KINDS = frozenset({'Deployment', 'StatefulSet', 'Service'})
+# Cluster-scoped kinds that take no namespace (CICD-017)
+_CLUSTER_SCOPED_KINDS = frozenset({'Namespace', 'ClusterRole', 'ClusterRoleBinding'})
+
 
 class CICDReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
-            self.config = config.get('cicd', {
-                'enabled': True,
-                'severity_threshold': 'medium',
-                'fail_on_critical': True
-            })
-        self.issues = []
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        if config is None:
+            config = load_config(config_path)
+        self.config_path = config_path
+        self._full_config = config
+        self.config = config.get('cicd', {
+            'enabled': True,
+            'severity_threshold': 'medium',
+            'fail_on_critical': True
+        })
+        # (message, file_path, line) per severity rank; the location string
+        # is only formatted when reported
+        self._by_sev = ([], [], [], [])
 
         # Vulnerable base images
         self.vulnerable_images = [
@@ -34,46 +207,68 @@ class CICDReviewAgent:
         # Trusted action publishers
         self.trusted_publishers = ['actions', 'github', 'docker', 'aws-actions', 'azure', 'google-github-actions']
 
-    def review_file(self, file_path: str) -> List[Tuple[str, str, int]]:
-        """Review a single file for CI/CD issues"""
-        if not os.path.exists(file_path):
-            print(f"Error: File not found: {file_path}")
-            return []
+        # One alternation finds every vulnerable image on a line; the
+        # lookahead keeps overlapping occurrences
+        self._vulnerable_image_re = re.compile(
+            '(?=(' + '|'.join(map(re.escape, self.vulnerable_images)) + '))')
 
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        self._dispatch = (self._review_github_workflow, self._review_dockerfile, self._review_kubernetes,
+                          self._review_docker_compose, self._review_kustomize)
 
-        file_name = Path(file_path).name
-        ext = Path(file_path).suffix
-
-        # GitHub Actions workflows
-        if '.github/workflows' in file_path and ext in ['.yml', '.yaml']:
-            self._review_github_workflow(content, lines, file_path)
+    def review_files(self, ci_files: List[Tuple[str, Category]]):
+        """Review classified files, fanning out to worker processes for large sets"""
+        if len(ci_files) < PARALLEL_MIN_FILES:
+            for file_path, category in ci_files:
+                self.review_file_typed(file_path, category)
+            return
 
-        # Dockerfiles
-        elif 'Dockerfile' in file_name or file_name.endswith('.Dockerfile'):
-            self._review_dockerfile(content, lines, file_path)
+        # Files are reviewed independently; map() keeps results in input
+        # order for a stable report
+        file_paths, categories = zip(*ci_files)
+        for by_sev in map_in_workers(self, '_review_file_isolated', file_paths, categories, chunksize=_PARALLEL_CHUNKSIZE):
+            for bucket, issues in zip(self._by_sev, by_sev):
+                bucket.extend(issues)
+
+    @property
+    def issues(self) -> List[Tuple[str, str, str]]:
+        """All issues as (severity, message, location), most severe first"""
+        return [(_SEVERITIES[rank], message, f"{file_path}:{line}")
+                for rank, bucket in enumerate(self._by_sev)
+                for message, file_path, line in bucket]
+
+    def _review_file_isolated(self, file_path: str, category: Category) -> tuple:
+        """Review a single file and return only its issue buckets"""
+        by_sev, self._by_sev = self._by_sev, ([], [], [], [])
+        try:
+            self.review_file_typed(file_path, category)
+            return self._by_sev
+        finally:
+            self._by_sev = by_sev
 
-        # Kubernetes manifests
-        elif ext in ['.yml', '.yaml'] and ('k8s/' in file_path or 'kubernetes/' in file_path):
-            self._review_kubernetes(content, lines, file_path)
+    def review_file(self, file_path: str) -> List[Tuple[str, str, str]]:
+        """Review a single file for CI/CD issues"""
+        if not os.path.exists(file_path):
+            print(f"Error: File not found: {file_path}")
+            return []
 
-        # Docker Compose
-        elif 'docker-compose' in file_name:
-            self._review_docker_compose(content, lines, file_path)
+        category = _classify(os.path.basename(file_path), *_dir_flags(os.path.dirname(file_path)))
+        if category is not None:
+            self.review_file_typed(file_path, category)
+        return self.issues
 
-        # Kustomize
-        elif file_name == 'kustomization.yaml':
-            self._review_kustomize(content, lines, file_path)
+    def review_file_typed(self, file_path: str, category: Category):
+        """Review a file already classified (as the directory walk does)"""
+        content = read_source(file_path)
+        if not content and category != Category.DOCKERFILE:
+            return  # an empty YAML file parses to None; nothing to review
 
-        return self.issues
+        self._dispatch[category](content, file_path)
 
-    def _review_github_workflow(self, content: str, lines: List[str], file_path: str):
+    def _review_github_workflow(self, content: str, file_path: str):
         """Review GitHub Actions workflow files"""
 
         try:
-            workflow = yaml.safe_load(content)
+            workflow = _load_yaml(content)
         except yaml.YAMLError:
             self._add_issue('high', 'Invalid YAML syntax in workflow', file_path, 0)
             return
@@ -89,25 +284,36 @@ class CICDReviewAgent:
                 if job.get('permissions') == 'write-all':
                     self._add_issue('critical', f'CICD-001: Job "{job_name}" has write-all permissions', file_path, 0)
 
+        # The line-based rules CICD-002/003/008 each scan the file once; a
+        # cheap substring test skips a scan whose anchor is absent
+        line_starts = line_table(content)
+
         # CICD-002: Check for unpinned third-party actions
-        for i, line in enumerate(lines, 1):
-            uses_match = re.search(r'uses:\s*([^\s@]+)@([^\s]+)', line)
-            if uses_match:
-                action = uses_match.group(1)
-                version = uses_match.group(2)
-                publisher = action.split('/')[0]
-
-                # Skip trusted publishers
-                if publisher not in self.trusted_publishers:
-                    # Check if pinned to SHA256
-                    if not re.match(r'^[a-f0-9]{64}$', version):
-                        self._add_issue('high', f'CICD-002: Unpinned third-party action "{action}" (use @sha256 instead of @{version})', file_path, i)
+        uses_hits = _first_hit_per_line(_USES_RE, content, line_starts) if 'uses:' in content else ()
+        for i, uses_match in uses_hits:
+            action = uses_match.group('action')
+            version = uses_match.group('version')
+            publisher = action.split('/')[0]
+
+            # Skip trusted publishers
+            if publisher not in self.trusted_publishers:
+                # Check if pinned to SHA256
+                if not _SHA256_RE.match(version):
+                    self._add_issue('high', f'CICD-002: Unpinned third-party action "{action}" (use @sha256 instead of @{version})', file_path, i)
 
         # CICD-003: Check for secrets in workflow files
-        for i, line in enumerate(lines, 1):
-            if re.search(r'(password|token|secret|api[_-]?key)\s*:\s*["\']?[a-zA-Z0-9]{20,}["\']?', line, re.IGNORECASE):
-                if '${{' not in line and 'secrets.' not in line:
-                    self._add_issue('critical', 'CICD-003: Hardcoded secret detected in workflow', file_path, i)
+        lower = content.lower()
+        if any(anchor in lower for anchor in _SECRET_ANCHORS):
+            # lower() rarely changes the length; when it does, offsets
+            # into it need their own line table
+            lower_starts = line_starts if len(lower) == len(content) else line_table(lower)
+            secret_hits = _first_hit_per_line(_WORKFLOW_SECRET_RE, lower, lower_starts)
+        else:
+            secret_hits = ()
+        for i, _ in secret_hits:
+            line = _line_range(content, line_starts, i, i)
+            if '${{' not in line and 'secrets.' not in line:
+                self._add_issue('critical', 'CICD-003: Hardcoded secret detected in workflow', file_path, i)
 
         # CICD-004: Check for missing timeout values
         jobs = workflow.get('jobs', {})
@@ -124,14 +330,14 @@ class CICDReviewAgent:
                     self._add_issue('critical', f'CICD-005: Job "{job_name}" uses self-hosted runner for PRs (security risk from untrusted code)', file_path, 0)
 
         # CICD-006: Check for pull_request_target without checkout safety
-        if 'pull_request_target' in str(workflow.get('on', {})):
-            checkout_found = False
-            for i, line in enumerate(lines, 1):
-                if 'actions/checkout' in line:
-                    # Check if ref is set to PR head
-                    next_10_lines = lines[i:i+10]
-                    if any('ref:' in l and 'github.event.pull_request.head.sha' in l for l in next_10_lines):
-                        checkout_found = True
+        if _mentions(workflow.get('on', {}), 'pull_request_target'):
+            # A checkout is safe when one of the 10 lines after it sets the
+            # ref to the PR head
+            safe_ref_lines = [j for j in _lines_containing(content, line_starts, 'github.event.pull_request.head.sha')
+                              if 'ref:' in _line_range(content, line_starts, j, j)]
+            checkout_found = any(i < j <= i + 10
+                                 for i in _lines_containing(content, line_starts, 'actions/checkout')
+                                 for j in safe_ref_lines)
 
             if not checkout_found:
                 self._add_issue('critical', 'CICD-006: pull_request_target without safe checkout (ref: github.event.pull_request.head.sha)', file_path, 0)
@@ -141,163 +347,193 @@ class CICDReviewAgent:
             self._add_issue('low', 'CICD-007: Missing concurrency control (parallel runs may conflict)', file_path, 0)
 
         # CICD-008: Check for dangerous commands (curl | sh)
-        for i, line in enumerate(lines, 1):
-            if re.search(r'curl.*\|.*sh|wget.*\|.*sh|curl.*\|.*bash', line):
-                self._add_issue('high', 'CICD-008: Dangerous pipe to shell detected (curl | sh)', file_path, i)
+        pipe_hits = _first_hit_per_line(_PIPE_TO_SHELL_RE, content, line_starts) if '|' in content else ()
+        for i, _ in pipe_hits:
+            self._add_issue('high', 'CICD-008: Dangerous pipe to shell detected (curl | sh)', file_path, i)
 
-        # CICD-009: Check for missing if conditions on deployment jobs
+        # CICD-009/010 share one walk over the jobs and one lowercased name
+        # (they report at different severities, so their order is unchanged)
         for job_name, job in jobs.items():
-            if 'deploy' in job_name.lower() or 'push' in str(job.get('steps', [])).lower():
+            job_name_lower = job_name.lower()
+
+            # CICD-009: Check for missing if conditions on deployment jobs
+            if 'deploy' in job_name_lower or _mentions(job.get('steps', []), 'push', lower=True):
                 if 'if' not in job and 'environment' not in job:
                     self._add_issue('medium', f'CICD-009: Deployment job "{job_name}" missing conditional execution or environment protection', file_path, 0)
 
-        # CICD-010: Check for missing continue-on-error for non-critical jobs
-        for job_name, job in jobs.items():
-            if any(keyword in job_name.lower() for keyword in ['lint', 'format', 'scan']):
+            # CICD-010: Check for missing continue-on-error for non-critical jobs
+            if any(keyword in job_name_lower for keyword in _LINT_KEYWORDS):
                 if 'continue-on-error' not in job:
                     self._add_issue('low', f'CICD-010: Non-critical job "{job_name}" should have continue-on-error: true', file_path, 0)
 
-    def _review_dockerfile(self, content: str, lines: List[str], file_path: str):
+    def _review_dockerfile(self, content: str, file_path: str):
         """Review Dockerfile for security and best practices"""
 
+        # The per-line rules below only pull out the lines their patterns
+        # hit; the file is never split into a list of lines
+        line_starts = line_table(content)
+        from_lines = [(i, _line_range(content, line_starts, i, i))
+                      for i, _ in _first_hit_per_line(_FROM_LINE_RE, content, line_starts)]
+        secret_lines = []
+        if '=' in content:
+            lower = content.lower()
+            lower_starts = line_starts if len(lower) == len(content) else line_table(lower)
+            secret_lines = [(i, _line_range(content, line_starts, i, i), _line_range(lower, lower_starts, i, i))
+                            for i, _ in _first_hit_per_line(_LAYER_SECRET_RE, lower, lower_starts)]
+        package_lines = [(i, _line_range(content, line_starts, i, i))
+                         for i, _ in _first_hit_per_line(_PACKAGE_CMD_RE, content, line_starts)]
+
         # CICD-021: Check for vulnerable base images
-        for i, line in enumerate(lines, 1):
-            if line.strip().startswith('FROM'):
-                for vulnerable in self.vulnerable_images:
-                    if vulnerable in line:
-                        self._add_issue('high', f'CICD-021: Vulnerable base image "{vulnerable}" detected', file_path, i)
+        for i, line in from_lines:
+            found = set(self._vulnerable_image_re.findall(line))
+            if not found:
+                continue
+            for vulnerable in self.vulnerable_images:
+                if vulnerable in found:
+                    self._add_issue('high', f'CICD-021: Vulnerable base image "{vulnerable}" detected', file_path, i)
 
         # CICD-022: Check for missing USER directive (running as root)
-        has_user = any('USER' in line for line in lines if line.strip() and not line.strip().startswith('#'))
+        has_user = 'USER' in content and _USER_LINE_RE.search(content) is not None
         if not has_user:
             self._add_issue('high', 'CICD-022: Dockerfile missing USER directive (will run as root)', file_path, 0)
 
         # CICD-023: Check for exposed secrets in layers
-        for i, line in enumerate(lines, 1):
-            if re.search(r'(password|secret|token|api[_-]?key)\s*=\s*["\'][^"\']+["\']', line, re.IGNORECASE):
-                if 'ARG' not in line and 'example' not in line.lower():
-                    self._add_issue('critical', 'CICD-023: Hardcoded secret in Dockerfile layer', file_path, i)
+        for i, line, line_lower in secret_lines:
+            if 'ARG' not in line and 'example' not in line_lower:
+                self._add_issue('critical', 'CICD-023: Hardcoded secret in Dockerfile layer', file_path, i)
 
         # CICD-024: Check for missing multi-stage build
-        from_count = sum(1 for line in lines if line.strip().startswith('FROM'))
-        if from_count == 1:
+        if len(from_lines) == 1:
             self._add_issue('medium', 'CICD-024: Single-stage build detected (consider multi-stage for smaller images)', file_path, 0)
 
         # CICD-025: Check for missing HEALTHCHECK
-        has_healthcheck = any('HEALTHCHECK' in line for line in lines)
-        if not has_healthcheck:
+        if 'HEALTHCHECK' not in content:
             self._add_issue('low', 'CICD-025: Missing HEALTHCHECK instruction', file_path, 0)
 
         # CICD-026: Check for using latest tag
-        for i, line in enumerate(lines, 1):
-            if line.strip().startswith('FROM') and ':latest' in line:
+        for i, line in from_lines:
+            if ':latest' in line:
                 self._add_issue('medium', 'CICD-026: Using :latest tag (use specific version for reproducibility)', file_path, i)
 
         # CICD-027: Check for apt-get install without --no-install-recommends
-        for i, line in enumerate(lines, 1):
+        for i, line in package_lines:
             if 'apt-get install' in line and '--no-install-recommends' not in line:
                 self._add_issue('low', 'CICD-027: apt-get install without --no-install-recommends (bloated images)', file_path, i)
 
         # CICD-028: Check for missing layer cleanup
-        for i, line in enumerate(lines, 1):
+        for i, line in package_lines:
             if 'apt-get update' in line or 'apk add' in line:
                 # Check if cleanup is in same RUN or next few lines
-                next_5_lines = lines[i:i+5]
-                has_cleanup = any('rm -rf' in l or 'clean' in l for l in next_5_lines)
+                next_5_lines = _line_range(content, line_starts, i + 1, i + 5)
+                has_cleanup = 'rm -rf' in next_5_lines or 'clean' in next_5_lines
                 if not has_cleanup:
                     self._add_issue('low', 'CICD-028: Package manager cache not cleaned up', file_path, i)
 
         # CICD-029: Check for COPY before dependency installation (cache busting)
-        copy_found = False
-        install_found = False
-        for line in lines:
-            if line.strip().startswith('COPY') and not 'package.json' in line and not 'requirements.txt' in line:
-                copy_found = True
-            if any(cmd in line for cmd in ['apt-get install', 'npm install', 'pip install', 'apk add']):
-                install_found = True
-                if copy_found:
-                    self._add_issue('medium', 'CICD-029: COPY before dependency installation (breaks layer cache)', file_path, 0)
+        # Only the first install after a source COPY matters, so stop there;
+        # files without any install command are skipped outright
+        if 'COPY' in content and _INSTALL_CMD_RE.search(content):
+            for i, _ in _first_hit_per_line(_COPY_LINE_RE, content, line_starts):
+                line = _line_range(content, line_starts, i, i)
+                if 'package.json' not in line and 'requirements.txt' not in line:
+                    # An install on this line or any later one comes too late
+                    if _INSTALL_CMD_RE.search(content, line_starts[i - 1]):
+                        self._add_issue('medium', 'CICD-029: COPY before dependency installation (breaks layer cache)', file_path, 0)
                     break
 
         # CICD-030: Check for privileged or dangerous capabilities
-        for i, line in enumerate(lines, 1):
-            if '--privileged' in line or '--cap-add=ALL' in line:
-                self._add_issue('critical', 'CICD-030: Privileged flag or ALL capabilities detected', file_path, i)
+        if '--privileged' in content or '--cap-add=ALL' in content:
+            privileged_lines = sorted({bisect_right(line_starts, match.start())
+                                       for match in _PRIVILEGED_RE.finditer(content)})
+        else:
+            privileged_lines = ()
+        for i in privileged_lines:
+            self._add_issue('critical', 'CICD-030: Privileged flag or ALL capabilities detected', file_path, i)
 
-    def _review_kubernetes(self, content: str, lines: List[str], file_path: str):
+    def _review_kubernetes(self, content: str, file_path: str):
         """Review Kubernetes manifest files"""
 
         try:
-            manifests = list(yaml.safe_load_all(content))
+            manifests = _load_manifests(content)
         except yaml.YAMLError:
             self._add_issue('high', 'Invalid YAML syntax in Kubernetes manifest', file_path, 0)
             return
 
-        for manifest in manifests:
-            if not manifest:
-                continue
-
-            kind = manifest.get('kind', '')
-            metadata = manifest.get('metadata', {})
-            spec = manifest.get('spec', {})
-
-            # CICD-011: Check for missing resource limits
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                containers = spec.get('template', {}).get('spec', {}).get('containers', [])
-                for container in containers:
-                    resources = container.get('resources', {})
-                    if 'limits' not in resources:
-                        self._add_issue('medium', f'CICD-011: Container "{container.get("name")}" missing resource limits', file_path, 0)
-                    if 'requests' not in resources:
-                        self._add_issue('medium', f'CICD-011: Container "{container.get("name")}" missing resource requests', file_path, 0)
-
-            # CICD-012: Check for missing health probes
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                containers = spec.get('template', {}).get('spec', {}).get('containers', [])
-                for container in containers:
-                    if 'livenessProbe' not in container:
-                        self._add_issue('high', f'CICD-012: Container "{container.get("name")}" missing livenessProbe', file_path, 0)
-                    if 'readinessProbe' not in container:
-                        self._add_issue('high', f'CICD-012: Container "{container.get("name")}" missing readinessProbe', file_path, 0)
-
-            # CICD-013: Check for privileged containers
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                containers = spec.get('template', {}).get('spec', {}).get('containers', [])
-                for container in containers:
-                    security_context = container.get('securityContext', {})
-                    if security_context.get('privileged') == True:
-                        self._add_issue('critical', f'CICD-013: Container "{container.get("name")}" running in privileged mode', file_path, 0)
+        # CICD-016 looks at the raw lines, which are the same for every
+        # manifest in the file, so find them once; files naming none of the
+        # keys skip the scan entirely
+        hardcoded_config_lines = []
+        if '_URL' in content or 'API_KEY' in content:
+            line_starts = line_table(content)
+            for i, _ in _first_hit_per_line(_HARDCODED_CONFIG_RE, content, line_starts):
+                line = _line_range(content, line_starts, i, i)
+                if 'secretKeyRef' not in line and 'configMapKeyRef' not in line:
+                    hardcoded_config_lines.append(i)
+
+        for kind, metadata, spec in manifests:
+            # Pod-level rules share one lookup of the pod template
+            is_workload = kind in _WORKLOAD_KINDS
+            if is_workload:
+                pod_spec = spec.get('template', {}).get('spec', {})
+                containers = pod_spec.get('containers', [])
+                volumes = pod_spec.get('volumes', [])
+                pod_security = pod_spec.get('securityContext', {})
+            else:
+                containers = volumes = ()
+
+            # CICD-011/012/013/020: Per-container checks in one walk; the
+            # imagePullPolicy findings (CICD-020) are reported last as before
+            missing_pull_policy = []
+            for container in containers:
+                name = container.get("name")
+
+                # CICD-011: Check for missing resource limits
+                resources = container.get('resources', {})
+                if 'limits' not in resources:
+                    self._add_issue('medium', f'CICD-011: Container "{name}" missing resource limits', file_path, 0)
+                if 'requests' not in resources:
+                    self._add_issue('medium', f'CICD-011: Container "{name}" missing resource requests', file_path, 0)
+
+                # CICD-012: Check for missing health probes
+                if 'livenessProbe' not in container:
+                    self._add_issue('high', f'CICD-012: Container "{name}" missing livenessProbe', file_path, 0)
+                if 'readinessProbe' not in container:
+                    self._add_issue('high', f'CICD-012: Container "{name}" missing readinessProbe', file_path, 0)
+
+                # CICD-013: Check for privileged containers
+                security_context = container.get('securityContext', {})
+                if security_context.get('privileged') == True:
+                    self._add_issue('critical', f'CICD-013: Container "{name}" running in privileged mode', file_path, 0)
+
+                # CICD-020: Check for missing image pull policy
+                if 'imagePullPolicy' not in container:
+                    missing_pull_policy.append(name)
 
             # CICD-014: Check for missing security context (runAsNonRoot)
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                pod_security = spec.get('template', {}).get('spec', {}).get('securityContext', {})
+            if is_workload:
                 if not pod_security.get('runAsNonRoot'):
                     self._add_issue('medium', 'CICD-014: Missing runAsNonRoot security context', file_path, 0)
 
             # CICD-015: Check for missing tenant isolation labels
-            if kind in ['Deployment', 'StatefulSet', 'Service']:
+            if kind in _TENANT_LABELED_KINDS:
                 labels = metadata.get('labels', {})
                 if 'tenant-id' not in labels and 'tenantId' not in labels:
                     if 'saasforge' in file_path:  # Only for SaaS app, not infra
                         self._add_issue('low', 'CICD-015: Missing tenant-id label for multi-tenancy', file_path, 0)
 
             # CICD-016: Check for hardcoded values instead of ConfigMaps
-            for i, line in enumerate(lines, 1):
-                if re.search(r'(DATABASE_URL|REDIS_URL|API_KEY)\s*:\s*["\'][^"\']+["\']', line):
-                    if 'secretKeyRef' not in line and 'configMapKeyRef' not in line:
-                        self._add_issue('high', 'CICD-016: Hardcoded configuration value (use ConfigMap/Secret)', file_path, i)
+            for i in hardcoded_config_lines:
+                self._add_issue('high', 'CICD-016: Hardcoded configuration value (use ConfigMap/Secret)', file_path, i)
 
             # CICD-017: Check for missing namespace
-            if kind not in ['Namespace', 'ClusterRole', 'ClusterRoleBinding']:
+            if kind not in _CLUSTER_SCOPED_KINDS:
                 if 'namespace' not in metadata:
                     self._add_issue('medium', 'CICD-017: Resource missing namespace specification', file_path, 0)
 
             # CICD-018: Check for hostPath volumes (security risk)
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                volumes = spec.get('template', {}).get('spec', {}).get('volumes', [])
-                for volume in volumes:
-                    if 'hostPath' in volume:
-                        self._add_issue('high', f'CICD-018: hostPath volume "{volume.get("name")}" detected (security risk)', file_path, 0)
+            for volume in volumes:
+                if 'hostPath' in volume:
+                    self._add_issue('high', f'CICD-018: hostPath volume "{volume.get("name")}" detected (security risk)', file_path, 0)
 
             # CICD-019: Check for missing pod disruption budget for critical services
             if kind == 'Deployment':
@@ -307,17 +543,14 @@ class CICDReviewAgent:
                     self._add_issue('low', 'CICD-019: Multi-replica deployment should have PodDisruptionBudget', file_path, 0)
 
             # CICD-020: Check for missing image pull policy
-            if kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                containers = spec.get('template', {}).get('spec', {}).get('containers', [])
-                for container in containers:
-                    if 'imagePullPolicy' not in container:
-                        self._add_issue('low', f'CICD-020: Container "{container.get("name")}" missing imagePullPolicy', file_path, 0)
+            for name in missing_pull_policy:
+                self._add_issue('low', f'CICD-020: Container "{name}" missing imagePullPolicy', file_path, 0)
 
-    def _review_docker_compose(self, content: str, lines: List[str], file_path: str):
+    def _review_docker_compose(self, content: str, file_path: str):
         """Review docker-compose.yml files"""
 
         try:
-            compose = yaml.safe_load(content)
+            compose = _load_yaml(content)
         except yaml.YAMLError:
             self._add_issue('high', 'Invalid YAML syntax in docker-compose', file_path, 0)
             return
@@ -333,8 +566,9 @@ class CICDReviewAgent:
             env = service.get('environment', [])
             if isinstance(env, list):
                 for i, var in enumerate(env):
-                    if '=' in str(var) and re.search(r'(password|secret|token|key)', str(var), re.IGNORECASE):
-                        if '${' not in str(var):
+                    var = str(var)
+                    if '=' in var and any(name in var.lower() for name in _SECRET_NAMES):
+                        if '${' not in var:
                             self._add_issue('high', f'CICD-032: Service "{service_name}" has hardcoded secret in environment', file_path, 0)
 
             # CICD-033: Check for missing health checks
@@ -346,11 +580,11 @@ class CICDReviewAgent:
             if ':latest' in image or ':' not in image:
                 self._add_issue('medium', f'CICD-034: Service "{service_name}" using latest tag or no tag', file_path, 0)
 
-    def _review_kustomize(self, content: str, lines: List[str], file_path: str):
+    def _review_kustomize(self, content: str, file_path: str):
         """Review Kustomize configuration files"""
 
         try:
-            kustomize = yaml.safe_load(content)
+            kustomize = _load_yaml(content)
         except yaml.YAMLError:
             self._add_issue('high', 'Invalid YAML syntax in kustomization', file_path, 0)
             return
@@ -367,48 +601,39 @@ class CICDReviewAgent:
         images = kustomize.get('images', [])
         for image in images:
             if 'digest' not in image and 'newTag' in image:
-                if not re.match(r'^[a-f0-9]{64}$', image.get('newTag', '')):
+                if not _SHA256_RE.match(image.get('newTag', '')):
                     self._add_issue('medium', f'CICD-037: Image "{image.get("name")}" using tag instead of digest', file_path, 0)
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int):
         """Add an issue to the report"""
-        self.issues.append((severity, message, f"{file_path}:{line}"))
+        self._by_sev[_SEVERITY_RANK[severity]].append((sys.intern(message), sys.intern(file_path), line))
 
     def report(self):
         """Generate final report"""
-        if not self.issues:
+        if not any(self._by_sev):
             print("✅ No CI/CD issues found!")
             return 0
 
-        severity_icons = {
-            'critical': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '🟢'
-        }
-
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        sorted_issues = sorted(self.issues, key=lambda x: severity_order[x[0]])
-
         print("\n" + "="*80)
         print("CI/CD REVIEW REPORT")
         print("="*80 + "\n")
 
-        counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
-        for severity, message, location in sorted_issues:
-            counts[severity] += 1
-            icon = severity_icons[severity]
-            print(f"{icon} [{severity.upper()}] {message}")
-            print(f"   Location: {location}\n")
+        # Buckets are already in severity order, so nothing needs sorting
+        for severity, icon, bucket in zip(_SEVERITIES, _SEVERITY_ICONS, self._by_sev):
+            label = severity.upper()
+            for message, file_path, line in bucket:
+                print(f"{icon} [{label}] {message}")
+                print(f"   Location: {file_path}:{line}\n")
 
+        critical, high, medium, low = map(len, self._by_sev)
         print("="*80)
-        print(f"Summary: {counts['critical']} critical, {counts['high']} high, "
-              f"{counts['medium']} medium, {counts['low']} low")
+        print(f"Summary: {critical} critical, {high} high, "
+              f"{medium} medium, {low} low")
         print("="*80 + "\n")
 
         # Determine exit code
         if self.config.get('fail_on_critical', True):
-            if counts['critical'] > 0 or counts['high'] > 0:
+            if critical > 0 or high > 0:
                 print("❌ CI/CD review failed (critical or high severity issues found)")
                 return 1
 
@@ -416,6 +641,54 @@ class CICDReviewAgent:
         return 0
 
 
+def _classify(name: str, in_workflows: bool, in_k8s: bool) -> Optional[Category]:
+    """Category of a file with this name in a directory so flagged, if any"""
+    if in_workflows and name.endswith(_YAML_EXTS):
+        return Category.WORKFLOW
+    if 'Dockerfile' in name or name.endswith('.Dockerfile'):
+        return Category.DOCKERFILE
+    if in_k8s and name.endswith(_YAML_EXTS):
+        return Category.K8S
+    if 'docker-compose' in name:
+        return Category.COMPOSE
+    if name == 'kustomization.yaml':
+        return Category.KUSTOMIZE
+    return None
+
+
+def _dir_flags(dir_path: str):
+    """(in_workflows, in_k8s) for files directly inside dir_path"""
+    dir_prefix = dir_path + '/'
+    return ('.github/workflows' in dir_path,
+            'k8s/' in dir_prefix or 'kubernetes/' in dir_prefix)
+
+
+def _iter_ci_files(root: str):
+    """Yield (path, category) for CI/CD files under root, top-down like os.walk
+
+    Hidden directories other than .github are pruned. Whether a directory
+    sits in a workflows or k8s tree is decided once per directory rather
+    than sniffed from every file path.
+    """
+    in_workflows, in_k8s = _dir_flags(root)
+    subdirs = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    if (name == '.github' or not name.startswith('.')) and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                else:
+                    category = _classify(name, in_workflows, in_k8s)
+                    if category is not None:
+                        yield entry.path, category
+    except OSError:
+        return  # unreadable directory; os.walk skipped these silently too
+    for subdir in subdirs:
+        yield from _iter_ci_files(subdir)
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python review.py <directory>")
@@ -424,34 +697,7 @@ def main():
     root_dir = sys.argv[1]
     agent = CICDReviewAgent()
 
-    # Find relevant files
-    ci_files = []
-    for root, dirs, files in os.walk(root_dir):
-        # Skip hidden directories except .github
-        dirs[:] = [d for d in dirs if d == '.github' or not d.startswith('.')]
-
-        for file in files:
-            file_path = os.path.join(root, file)
-
-            # GitHub Actions workflows
-            if '.github/workflows' in file_path and file.endswith(('.yml', '.yaml')):
-                ci_files.append(file_path)
-
-            # Dockerfiles
-            elif 'Dockerfile' in file or file.endswith('.Dockerfile'):
-                ci_files.append(file_path)
-
-            # Kubernetes manifests
-            elif file.endswith(('.yml', '.yaml')) and ('k8s/' in file_path or 'kubernetes/' in file_path):
-                ci_files.append(file_path)
-
-            # Docker Compose
-            elif 'docker-compose' in file:
-                ci_files.append(file_path)
-
-            # Kustomize
-            elif file == 'kustomization.yaml':
-                ci_files.append(file_path)
+    ci_files = list(_iter_ci_files(root_dir))
 
     if not ci_files:
         print("No CI/CD files found to review")
@@ -459,8 +705,7 @@ def main():
 
     print(f"Found {len(ci_files)} CI/CD files to review\n")
 
-    for file_path in ci_files:
-        agent.review_file(file_path)
+    agent.review_files(ci_files)
 
     exit_code = agent.report()
     sys.exit(exit_code)
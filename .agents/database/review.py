@@ -6,94 +6,155 @@ Validates migrations, indexes, and multi-tenancy compliance
 import re
 import sys
 import os
-import yaml
+from bisect import bisect_right
+from itertools import islice
+from typing import List, Optional
+
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import PARALLEL_MIN_FILES, line_table, load_config, map_in_workers
+
+
+# A table definition up to its opening parenthesis; the name may be
+# schema-qualified and either part double-quoted
+_CREATE_TABLE_RE = re.compile(r'CREATE TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:"?\w+"?\.)?"?(\w+)"?\s*\(', re.IGNORECASE)
+# Parentheses, skipping over single-quoted SQL literals ('' escapes a quote)
+_PAREN_RE = re.compile(r"[()]|'(?:[^']|'')*'")
+_FK_COLUMN_RE = re.compile(r'(\w+)\s+UUID.*?REFERENCES', re.IGNORECASE)
+_REFERENCES_NO_DELETE_RE = re.compile(r'REFERENCES\s+\w+\([^)]+\)(?!\s*ON\s+DELETE)', re.IGNORECASE)
+
+# Tables that don't need tenant_id
+_TENANT_EXEMPT_TABLES = frozenset({'tenants', 'sessions', 'migrations', 'alembic_version'})
+# Words marking audit/financial data that must carry timestamps
+_RETENTION_KEYWORDS = ('payment', 'invoice', 'transaction', 'audit')
+
+# The report lists issues in the order they were found; only the icon
+# depends on severity
+_SEVERITY_ICONS = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}
+
+_PARALLEL_CHUNKSIZE = 8
+
+
+def _closing_paren(content: str, start: int) -> int:
+    """Offset of the ')' closing a '(' that ends just before start, or -1"""
+    depth = 1
+    for match in _PAREN_RE.finditer(content, start):
+        token = match.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return -1
 
 
 class DatabaseReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)['database']
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        if config is None:
+            config = load_config(config_path)
+        self.config_path = config_path
+        self._full_config = config
+        self.config = config['database']
         self.issues = []
 
+    def review_migrations(self, file_paths: List[str]):
+        """Review many migration files, fanning out to worker processes for large sets"""
+        if len(file_paths) < PARALLEL_MIN_FILES:
+            for file_path in file_paths:
+                self.review_migration(file_path)
+            return
+
+        # Migrations are reviewed independently; map() keeps results in
+        # input order for a stable report
+        for issues in map_in_workers(self, '_review_migration_isolated', file_paths, chunksize=_PARALLEL_CHUNKSIZE):
+            self.issues.extend(issues)
+
+    def _review_migration_isolated(self, file_path: str) -> list:
+        """Review a single migration and return only its issues"""
+        issues, self.issues = self.issues, []
+        try:
+            self.review_migration(file_path)
+            return self.issues
+        finally:
+            self.issues = issues
+
     def review_migration(self, file_path: str):
         """Review SQL migration file"""
         with open(file_path, 'r') as f:
             content = f.read()
-            lines = content.split('\n')
+        # Case-folded copies are made once and shared by every check
+        lower = content.lower()
+        upper = content.upper()
+        line_starts = line_table(content)
 
         # Check tenant_id in all tables
-        self._check_tenant_id(content, lines, file_path)
+        self._check_tenant_id(content, file_path)
 
         # Check for missing indexes
-        self._check_indexes(content, lines, file_path)
+        self._check_indexes(content, lower, file_path)
 
         # Check foreign key constraints
-        self._check_foreign_keys(content, lines, file_path)
+        self._check_foreign_keys(content, line_starts, file_path)
 
         # Check for reversibility
-        self._check_reversibility(content, file_path)
+        self._check_reversibility(upper, file_path)
 
         # Check data retention compliance
-        self._check_retention(content, file_path)
+        self._check_retention(lower, file_path)
 
-    def _check_tenant_id(self, content: str, lines: List[str], file_path: str):
+    def _check_tenant_id(self, content: str, file_path: str):
         """Ensure all tables have tenant_id"""
-        create_table_pattern = r'CREATE TABLE\s+(\w+)'
-        tables = re.findall(create_table_pattern, content, re.IGNORECASE)
-
-        # Exceptions: these tables don't need tenant_id
-        exceptions = ['tenants', 'sessions', 'migrations', 'alembic_version']
-
-        for table in tables:
-            if table.lower() not in exceptions:
-                # Check if table definition includes tenant_id
-                table_def_pattern = f'CREATE TABLE\\s+{table}.*?\\);'
-                match = re.search(table_def_pattern, content, re.IGNORECASE | re.DOTALL)
-                if match:
-                    table_def = match.group(0)
-                    if 'tenant_id' not in table_def.lower():
-                        self._add_issue('critical', f'Table {table} missing tenant_id column', file_path, 0)
-
-    def _check_indexes(self, content: str, lines: List[str], file_path: str):
+        # One pass over the definitions; each one's column list runs to the
+        # parenthesis that closes the one after the table name
+        for match in _CREATE_TABLE_RE.finditer(content):
+            table = match.group(1)
+            if table.lower() in _TENANT_EXEMPT_TABLES:
+                continue
+
+            end = _closing_paren(content, match.end())
+            if end == -1:
+                continue  # unterminated definition; nothing to judge
+
+            if 'tenant_id' not in content[match.end():end].lower():
+                self._add_issue('critical', f'Table {table} missing tenant_id column', file_path, 0)
+
+    def _check_indexes(self, content: str, lower: str, file_path: str):
         """Check for missing indexes on foreign keys and common filters"""
         # Find all foreign key columns
-        fk_pattern = r'(\w+)\s+UUID.*?REFERENCES'
-        foreign_keys = re.findall(fk_pattern, content, re.IGNORECASE)
+        foreign_keys = _FK_COLUMN_RE.findall(content)
 
         for fk in foreign_keys:
             if f'idx_{fk}' not in content and f'INDEX.*{fk}' not in content:
                 self._add_issue('high', f'Missing index on foreign key: {fk}', file_path, 0)
 
         # Check for tenant_id indexes
-        if 'tenant_id' in content.lower():
-            if 'idx_.*tenant_id' not in content.lower() and 'index.*tenant_id' not in content.lower():
+        if 'tenant_id' in lower:
+            if 'idx_.*tenant_id' not in lower and 'index.*tenant_id' not in lower:
                 self._add_issue('high', 'Missing index on tenant_id', file_path, 0)
 
-    def _check_foreign_keys(self, content: str, lines: List[str], file_path: str):
+    def _check_foreign_keys(self, content: str, line_starts: List[int], file_path: str):
         """Validate foreign key constraints"""
         # Check for ON DELETE clauses
-        references_pattern = r'REFERENCES\s+\w+\([^)]+\)(?!\s*ON\s+DELETE)'
-        matches = list(re.finditer(references_pattern, content, re.IGNORECASE))
-
-        if matches:
-            for match in matches[:3]:  # Limit to first 3 to avoid spam
-                self._add_issue('medium', 'Foreign key missing ON DELETE clause', file_path,
-                              content[:match.start()].count('\n') + 1)
+        # Limit to first 3 to avoid spam; the scan stops there too
+        for match in islice(_REFERENCES_NO_DELETE_RE.finditer(content), 3):
+            self._add_issue('medium', 'Foreign key missing ON DELETE clause', file_path,
+                            bisect_right(line_starts, match.start()))
 
-    def _check_reversibility(self, content: str, file_path: str):
+    def _check_reversibility(self, upper: str, file_path: str):
         """Check if migration can be reversed"""
-        if 'DROP TABLE' in content.upper():
-            if 'IF EXISTS' not in content.upper():
+        if 'DROP TABLE' in upper:
+            if 'IF EXISTS' not in upper:
                 self._add_issue('medium', 'DROP TABLE without IF EXISTS (not reversible)', file_path, 0)
 
-        if 'ALTER TABLE' in content.upper() and 'DROP COLUMN' in content.upper():
+        if 'ALTER TABLE' in upper and 'DROP COLUMN' in upper:
             self._add_issue('low', 'ALTER TABLE DROP COLUMN is not reversible', file_path, 0)
 
-    def _check_retention(self, content: str, file_path: str):
+    def _check_retention(self, lower: str, file_path: str):
         """Check data retention compliance"""
         # Look for tables with audit/financial data
-        if any(keyword in content.lower() for keyword in ['payment', 'invoice', 'transaction', 'audit']):
-            if 'created_at' not in content.lower() and 'timestamp' not in content.lower():
+        if any(keyword in lower for keyword in _RETENTION_KEYWORDS):
+            if 'created_at' not in lower and 'timestamp' not in lower:
                 self._add_issue('medium', 'Financial/audit table missing timestamp columns', file_path, 0)
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int):
@@ -110,14 +171,12 @@ class DatabaseReviewAgent:
         print("=" * 80)
 
         for severity, message, location in self.issues:
-            icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}[severity]
-            print(f"{icon} [{severity.upper()}] {message}")
+            print(f"{_SEVERITY_ICONS[severity]} [{severity.upper()}] {message}")
             print(f"   Location: {location}")
             print()
 
         print(f"Total: {len(self.issues)} issues")
-        critical_count = sum(1 for s, _, _ in self.issues if s == 'critical')
-        return 1 if critical_count > 0 else 0
+        return 1 if any(s == 'critical' for s, _, _ in self.issues) else 0
 
 
 def main():
@@ -131,10 +190,10 @@ def main():
     if os.path.isfile(path):
         agent.review_migration(path)
     elif os.path.isdir(path):
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                if file.endswith('.sql'):
-                    agent.review_migration(os.path.join(root, file))
+        migrations = [os.path.join(root, file)
+                      for root, dirs, files in os.walk(path)
+                      for file in files if file.endswith('.sql')]
+        agent.review_migrations(migrations)
 
     sys.exit(agent.report())
 
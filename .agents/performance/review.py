@@ -6,91 +6,232 @@ Validates against NFR targets (JWT < 2ms, login < 500ms, etc.)
 import re
 import sys
 import os
-from pathlib import Path
-import yaml
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import (PARALLEL_MIN_FILES, ScanCache, iter_source_files, line_table, load_config,
+                     map_in_workers, read_source, ruleset_version)
+
+
+_WHERE_RE = re.compile(r'WHERE\s+(\w+)', re.IGNORECASE)
+# The column list of an index definition (CREATE INDEX ... ON t (a, b))
+_INDEX_COLUMNS_RE = re.compile(r'\bINDEX\b[^(;]*\(([^)]*)\)', re.IGNORECASE)
+
+# Each line-keyword set is one alternation, so a check finds its lines
+# in a single scan of the file instead of testing every line
+_LOOP_RE = re.compile(r'for|while')
+# A line that opens a loop (Python, C++ and TypeScript)
+_LOOP_STMT_RE = re.compile(r'[^\S\n]*(?:async[^\S\n]+)?(?:for|while)\b')
+# Lines that never close a block: blanks, comments and a lone opening brace
+_BLOCK_NEUTRAL_PREFIXES = ('#', '//', '/*', '*', '{')
+# Calls worth caching when they run per request (_check_caching)
+_EXPENSIVE_CALL_RE = re.compile(r'jwt\.decode|validate_token|check_permission')
+# Lines near such a call that show it is cached
+_CACHE_HINT_RE = re.compile(r'cache|redis')
+# Database calls, and the batching that excuses one in a loop (_check_n_plus_one)
+_QUERY_RE = re.compile(r'select|query|find|get')
+_BATCHED_QUERY_RE = re.compile(r'join|prefetch')
+
+_SOURCE_EXTS = ('.cpp', '.h', '.py', '.ts', '.sql')
+_SKIP_DIRS = frozenset({'build', 'node_modules', '__pycache__'})
+
+_PARALLEL_CHUNKSIZE = 8
+# Default for the max_file_size_mb setting; bigger files are generated or
+# vendored code and are skipped without being opened
+_MAX_FILE_SIZE_MB = 5
+
+_SEVERITY_ICONS = {'high': '🟠', 'medium': '🟡', 'low': '🟢'}
+
+# Scan-result cache, relative to the directory holding config.yaml
+_CACHE_FILE = os.path.join('.cache', 'performance-scan.bin')
+
+
+def _any_line_between(numbers: List[int], first: int, last: int) -> bool:
+    """Whether any of the sorted line numbers lies in first..last"""
+    k = bisect_left(numbers, first)
+    return k < len(numbers) and numbers[k] <= last
+
+
+def _matching_lines(pattern: re.Pattern, content: str, line_starts: List[int]) -> List[int]:
+    """1-based numbers of the lines of content on which pattern matches"""
+    numbers = []
+    for match in pattern.finditer(content):
+        i = bisect_right(line_starts, match.start())
+        if not numbers or numbers[-1] != i:
+            numbers.append(i)
+    return numbers
 
 
 class PerformanceReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)['performance']
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        if config is None:
+            config = load_config(config_path)
+        self.config_path = config_path
+        self._full_config = config
+        self.config = config['performance']
+        self.max_file_size = self.config.get('max_file_size_mb', _MAX_FILE_SIZE_MB) * 1024 * 1024
         self.issues = []
 
+    def review_files(self, file_paths: List[str]):
+        """Review many files, scanning each new file content only once"""
+        cache = ScanCache(os.path.join(os.path.dirname(self.config_path), _CACHE_FILE),
+                          ruleset_version(__file__, self.config_path))
+
+        # One stat per file; only files changed since the last run are
+        # read (to hash them), and only content not seen before is scanned
+        keyed = []
+        to_scan = {}
+        for file_path in file_paths:
+            st = os.stat(file_path)
+            # review_file skips these without reporting anything
+            if st.st_size == 0 or st.st_size > self.max_file_size:
+                continue
+            key = cache.content_key(file_path, (st.st_mtime_ns, st.st_size))
+            keyed.append((file_path, key))
+            if key not in cache.contents:
+                to_scan.setdefault(key, file_path)
+
+        for key, issues in zip(to_scan, self._scan_files(list(to_scan.values()))):
+            cache.store(key, [(severity, message, line) for severity, message, _, line in issues])
+
+        for file_path, key in keyed:
+            self.issues.extend((severity, message, file_path, line)
+                               for severity, message, line in cache.contents[key])
+        cache.save()
+
+    def _scan_files(self, file_paths: List[str]) -> List[list]:
+        """Issues of each file, fanning out to worker processes for large sets"""
+        if len(file_paths) < PARALLEL_MIN_FILES:
+            return [self._review_file_isolated(file_path) for file_path in file_paths]
+
+        # Files are reviewed independently; map() keeps results in input order
+        return list(map_in_workers(self, '_review_file_isolated', file_paths, chunksize=_PARALLEL_CHUNKSIZE))
+
+    def _review_file_isolated(self, file_path: str) -> list:
+        """Review a single file and return only its issues"""
+        issues, self.issues = self.issues, []
+        try:
+            self.review_file(file_path)
+            return self.issues
+        finally:
+            self.issues = issues
+
     def review_file(self, file_path: str):
         """Review file for performance issues"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        # Empty files have nothing to flag and oversized ones are not reviewed
+        size = os.path.getsize(file_path)
+        if size == 0 or size > self.max_file_size:
+            return
+
+        content = read_source(file_path)
+        # Lowercase once; the checks share both forms and map matches in
+        # either text back to lines through its line table
+        lower = content.lower()
+        line_starts = line_table(content)
+        # lower() rarely changes the length; when it does, offsets into it
+        # need their own line table
+        lower_starts = line_starts if len(lower) == len(content) else line_table(lower)
 
         # Check for N+1 queries
-        self._check_n_plus_one(lines, file_path)
+        self._check_n_plus_one(content, line_starts, lower, lower_starts, file_path)
 
         # Check for missing indexes hints
-        self._check_indexing(lines, file_path)
+        self._check_indexing(content, file_path)
 
         # Check for connection pooling
-        self._check_connection_pooling(content, file_path)
+        self._check_connection_pooling(lower, file_path)
 
         # Check for caching opportunities
-        self._check_caching(lines, file_path)
+        self._check_caching(lower, lower_starts, file_path)
 
         # Check for inefficient loops
-        self._check_loops(lines, file_path)
+        self._check_loops(content, file_path)
 
-    def _check_n_plus_one(self, lines: List[str], file_path: str):
+    def _check_n_plus_one(self, content: str, line_starts: List[int], lower: str, lower_starts: List[int],
+                          file_path: str):
         """Detect potential N+1 query problems"""
-        for i, line in enumerate(lines, 1):
-            # Look for queries inside loops
-            if 'for' in line or 'while' in line:
-                # Check next 10 lines for database queries
-                context = '\n'.join(lines[i:min(len(lines), i+10)])
-                if any(keyword in context.lower() for keyword in ['select', 'query', 'find', 'get']):
-                    if 'join' not in context.lower() and 'prefetch' not in context.lower():
-                        self._add_issue('high', 'Potential N+1 query: database call in loop', file_path, i)
-
-    def _check_indexing(self, lines: List[str], file_path: str):
+        # Look for queries inside loops
+        loop_lines = _matching_lines(_LOOP_RE, content, line_starts)
+        if not loop_lines:
+            return
+        # Each keyword set is searched once over the file; a loop's window
+        # is then checked by bisecting the lines it hit
+        query_lines = _matching_lines(_QUERY_RE, lower, lower_starts)
+        batched_lines = _matching_lines(_BATCHED_QUERY_RE, lower, lower_starts)
+        for i in loop_lines:
+            # Check next 10 lines for database queries
+            if _any_line_between(query_lines, i + 1, i + 10):
+                if not _any_line_between(batched_lines, i + 1, i + 10):
+                    self._add_issue('high', 'Potential N+1 query: database call in loop', file_path, i)
+
+    def _check_indexing(self, content: str, file_path: str):
         """Check if queries have proper indexing"""
         if not file_path.endswith('.sql'):
             return
 
-        for i, line in enumerate(lines, 1):
+        # Columns any index in the file covers, collected once; identifiers
+        # are compared case-insensitively like unquoted SQL names
+        indexed_columns = {word.lower()
+                           for match in _INDEX_COLUMNS_RE.finditer(content)
+                           for word in re.findall(r'\w+', match.group(1))}
+        # Whether an idx_<column> name appears, searched once per column
+        named_index = {}
+
+        for i, line in enumerate(content.split('\n'), 1):
             if 'WHERE' in line.upper():
                 # Extract column name
-                match = re.search(r'WHERE\s+(\w+)', line, re.IGNORECASE)
+                match = _WHERE_RE.search(line)
                 if match:
                     column = match.group(1)
                     # Check if there's a CREATE INDEX nearby
-                    full_content = '\n'.join(lines)
-                    if f'idx_{column}' not in full_content and f'INDEX.*{column}' not in full_content:
+                    if column not in named_index:
+                        named_index[column] = f'idx_{column}' in content
+                    if not named_index[column] and column.lower() not in indexed_columns:
                         self._add_issue('medium', f'Query on {column} may need index', file_path, i)
 
-    def _check_connection_pooling(self, content: str, file_path: str):
+    def _check_connection_pooling(self, lower: str, file_path: str):
         """Verify connection pooling is used"""
-        if 'postgres' in content.lower() or 'mysql' in content.lower() or 'redis' in content.lower():
-            if 'pool' not in content.lower() and 'connection' in content.lower():
+        if 'postgres' in lower or 'mysql' in lower or 'redis' in lower:
+            if 'pool' not in lower and 'connection' in lower:
                 self._add_issue('medium', 'Database connection without pooling', file_path, 0)
 
-    def _check_caching(self, lines: List[str], file_path: str):
+    def _check_caching(self, lower: str, lower_starts: List[int], file_path: str):
         """Identify caching opportunities"""
-        for i, line in enumerate(lines, 1):
-            # Look for expensive operations without caching
-            if any(keyword in line.lower() for keyword in ['jwt.decode', 'validate_token', 'check_permission']):
-                context = '\n'.join(lines[max(0, i-5):min(len(lines), i+5)])
-                if 'cache' not in context.lower() and 'redis' not in context.lower():
-                    self._add_issue('low', 'Expensive operation without caching', file_path, i)
-
-    def _check_loops(self, lines: List[str], file_path: str):
+        # Look for expensive operations without caching
+        call_lines = _matching_lines(_EXPENSIVE_CALL_RE, lower, lower_starts)
+        if not call_lines:
+            return
+        cached_lines = _matching_lines(_CACHE_HINT_RE, lower, lower_starts)
+        for i in call_lines:
+            if not _any_line_between(cached_lines, i - 4, i + 5):
+                self._add_issue('low', 'Expensive operation without caching', file_path, i)
+
+    def _check_loops(self, content: str, file_path: str):
         """Check for inefficient loops"""
-        for i, line in enumerate(lines, 1):
-            # Check for nested loops
-            if 'for' in line and i < len(lines) - 1:
-                next_10 = '\n'.join(lines[i:min(len(lines), i+10)])
-                if next_10.count('for') > 1:
-                    self._add_issue('medium', 'Nested loops detected - O(n²) complexity', file_path, i)
+        # One pass with a stack of the loops enclosing the current line; a
+        # line indented no deeper than a loop ends that loop's body
+        loop_stack = []
+        reported = set()
+        for i, line in enumerate(content.split('\n'), 1):
+            stripped = line.lstrip()
+            if not stripped or stripped.startswith(_BLOCK_NEUTRAL_PREFIXES):
+                continue
+            indent = len(line) - len(stripped)
+            while loop_stack and loop_stack[-1][1] >= indent:
+                loop_stack.pop()
+
+            if _LOOP_STMT_RE.match(line):
+                # Check for nested loops; report each outermost loop once
+                if loop_stack and loop_stack[0][0] not in reported:
+                    reported.add(loop_stack[0][0])
+                    self._add_issue('medium', 'Nested loops detected - O(n²) complexity', file_path, loop_stack[0][0])
+                loop_stack.append((i, indent))
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int):
         """Add a performance issue"""
-        self.issues.append((severity, message, f"{file_path}:{line}"))
+        self.issues.append((severity, message, file_path, line))
 
     def report(self):
         """Generate performance report"""
@@ -98,16 +239,16 @@ class PerformanceReviewAgent:
             print("✅ No performance issues found!")
             return 0
 
-        print(f"\n⚡ Performance Review Report")
-        print("=" * 80)
+        # The report is built in memory and written in one call
+        out = ["\n⚡ Performance Review Report", "=" * 80]
 
-        for severity, message, location in self.issues:
-            icon = {'high': '🟠', 'medium': '🟡', 'low': '🟢'}[severity]
-            print(f"{icon} [{severity.upper()}] {message}")
-            print(f"   Location: {location}")
-            print()
+        for severity, message, file_path, line in self.issues:
+            out.append(f"{_SEVERITY_ICONS[severity]} [{severity.upper()}] {message}")
+            out.append(f"   Location: {file_path}:{line}")
+            out.append("")
 
-        print(f"Total: {len(self.issues)} issues")
+        out.append(f"Total: {len(self.issues)} issues")
+        sys.stdout.write('\n'.join(out) + '\n')
         return 0  # Performance issues don't fail builds by default
 
 
@@ -122,11 +263,7 @@ def main():
     if os.path.isfile(path):
         agent.review_file(path)
     elif os.path.isdir(path):
-        for root, dirs, files in os.walk(path):
-            dirs[:] = [d for d in dirs if d not in ['build', 'node_modules', '__pycache__']]
-            for file in files:
-                if file.endswith(('.cpp', '.h', '.py', '.ts', '.sql')):
-                    agent.review_file(os.path.join(root, file))
+        agent.review_files(list(iter_source_files(path, _SOURCE_EXTS, _SKIP_DIRS)))
 
     sys.exit(agent.report())
 
@@ -2,8 +2,10 @@
 """
 Run all review agents on a file or directory
 """
+import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -17,6 +19,16 @@ AGENTS = [
 ]
 
 
+def run_agent(script: str, target: str, env: dict) -> subprocess.CompletedProcess:
+    """Run one agent to completion, capturing its output"""
+    return subprocess.run(
+        ["python3", script, target],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python .agents/run_all.py <file_or_directory>")
@@ -31,21 +43,29 @@ def main():
 
     exit_codes = []
 
-    for name, script in AGENTS:
-        print(f"\n{'=' * 80}")
-        print(f"Running {name}")
-        print(f"{'=' * 80}")
-
-        try:
-            result = subprocess.run(
-                ["python3", script, target],
-                capture_output=False,
-                text=True
-            )
-            exit_codes.append(result.returncode)
-        except Exception as e:
-            print(f"❌ Error running {name}: {e}")
-            exit_codes.append(1)
+    # The agents only read the tree, so they all run at once; each one's
+    # output is buffered and printed whole, in AGENTS order. Their worker
+    # pools split the CPUs between them instead of each taking all of them
+    env = dict(os.environ)
+    env.setdefault("AGENT_MAX_WORKERS", str(max(1, (os.cpu_count() or 1) // len(AGENTS))))
+
+    with ThreadPoolExecutor(max_workers=len(AGENTS)) as executor:
+        futures = [executor.submit(run_agent, script, target, env) for _, script in AGENTS]
+
+        for (name, _), future in zip(AGENTS, futures):
+            print(f"\n{'=' * 80}")
+            print(f"Running {name}")
+            print(f"{'=' * 80}")
+
+            try:
+                result = future.result()
+                sys.stdout.write(result.stdout)
+                sys.stdout.flush()
+                sys.stderr.write(result.stderr)
+                exit_codes.append(result.returncode)
+            except Exception as e:
+                print(f"❌ Error running {name}: {e}")
+                exit_codes.append(1)
 
     # Summary
     print(f"\n{'=' * 80}")
@@ -6,68 +6,231 @@ Validates JWT, mTLS, multi-tenancy, and OWASP compliance
 import re
 import sys
 import os
+import functools
+from bisect import bisect_right
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple
-import yaml
+from typing import List, Optional, Tuple
+
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import (PARALLEL_MIN_FILES, ScanCache, iter_source_files, line_table, load_config,
+                     map_in_workers, read_source, ruleset_version)
+
+try:
+    import hyperscan  # optional: pip install hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Line patterns run once over the whole file, so none may cross a newline
+_HARDCODED_SECRET_RE = re.compile(r'(password|secret|key|token)[^\S\n]*=[^\S\n]*["\'][^"\'\n]+["\']', re.IGNORECASE)
+_EVAL_EXEC_RE = re.compile(r'\b(eval|exec)[^\S\n]*\(')
+_EVAL_RE = re.compile(r'\beval[^\S\n]*\(')
+_SELECT_RE = re.compile(r'SELECT')
+# Every line the Python raw-SQL rules flag contains one of these
+_PY_SQL_RE = re.compile(r'execute|\.raw\(')
+_INNER_HTML_RE = re.compile(r'dangerouslySetInnerHTML')
+
+# Whole-file line rules of each reviewer, in the order it applies them
+_CPP_LINE_RULES = (_HARDCODED_SECRET_RE,)
+_PYTHON_LINE_RULES = (_PY_SQL_RE, _EVAL_EXEC_RE)
+_TYPESCRIPT_LINE_RULES = (_INNER_HTML_RE, _EVAL_RE)
+
+_SOURCE_EXTS = ('.cpp', '.h', '.hpp', '.py', '.ts', '.tsx', '.js', '.jsx')
+# Build and generated directories are not reviewed
+_SKIP_DIRS = frozenset({'build', 'node_modules', '__pycache__', 'generated'})
+
+_PARALLEL_CHUNKSIZE = 8
+# Default for the max_file_size_mb setting; bigger files are generated or
+# vendored code and are skipped without being opened
+_MAX_FILE_SIZE_MB = 5
+
+# Scan-result cache, relative to the directory holding config.yaml
+_CACHE_FILE = os.path.join('.cache', 'security-scan.bin')
+
+# Issues carry the severity as its rank so the report sorts on plain ints
+_SEVERITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+_SEVERITY_ICONS = ('🔴', '🟠', '🟡', '🟢')
+_SEVERITY_LABELS = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')
+
+
+def _line_at(content: str, line_starts: List[int], i: int) -> str:
+    """Text of the 1-based line i of content, without its newline"""
+    end = line_starts[i] - 1 if i < len(line_starts) else len(content)
+    return content[line_starts[i - 1]:end]
+
+
+def _matching_lines(pattern: re.Pattern, content: str, line_starts: List[int]) -> List[int]:
+    """1-based numbers of the lines of content on which pattern matches"""
+    numbers = []
+    for match in pattern.finditer(content):
+        i = bisect_right(line_starts, match.start())
+        if not numbers or numbers[-1] != i:
+            numbers.append(i)
+    return numbers
+
+
+if hyperscan is not None:
+    @functools.lru_cache(maxsize=None)
+    def _hyperscan_db(rules):
+        """One Hyperscan database matching every pattern in rules; ids are indexes"""
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[rule.pattern.encode('utf-8') for rule in rules],
+            ids=list(range(len(rules))),
+            elements=len(rules),
+            flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                   | (hyperscan.HS_FLAG_CASELESS if rule.flags & re.IGNORECASE else 0)
+                   for rule in rules],
+        )
+        return db
+
+
+def _rule_lines(rules, content: str, line_starts: List[int]) -> List[List[int]]:
+    """1-based line numbers each of rules matches on, in the order of rules
+
+    With Hyperscan every rule runs in a single pass over the UTF-8 bytes;
+    otherwise each rule is one re scan of the text.
+    """
+    if hyperscan is None:
+        return [_matching_lines(rule, content, line_starts) for rule in rules]
+
+    data = content.encode('utf-8')
+    byte_starts = line_starts
+    if len(data) != len(content):
+        byte_starts = [0] + [m.end() for m in re.finditer(b'\n', data)]
+    hits = [set() for _ in rules]
+
+    def on_match(rule_id, start, end, flags, context):
+        # No rule crosses a newline, so the last byte is on the match's line
+        hits[rule_id].add(bisect_right(byte_starts, end - 1))
+
+    _hyperscan_db(rules).scan(data, match_event_handler=on_match)
+    return [sorted(lines) for lines in hits]
 
 
 class SecurityReviewAgent:
-    def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)['security']
+    def __init__(self, config_path=".agents/config.yaml", config: Optional[dict] = None):
+        if config is None:
+            config = load_config(config_path)
+        self.config_path = config_path
+        self._full_config = config
+        self.config = config['security']
+        self.max_file_size = self.config.get('max_file_size_mb', _MAX_FILE_SIZE_MB) * 1024 * 1024
         self.issues = []
 
-    def review_file(self, file_path: str) -> List[Tuple[str, str, int]]:
+    def review_files(self, file_paths: List[str]):
+        """Review many files, scanning each new file content only once"""
+        cache = ScanCache(os.path.join(os.path.dirname(self.config_path), _CACHE_FILE),
+                          ruleset_version(__file__, self.config_path))
+
+        # One stat per file; only files changed since the last run are
+        # read (to hash them), and only content not seen before is scanned
+        keyed = []
+        to_scan = {}
+        for file_path in file_paths:
+            st = os.stat(file_path)
+            # review_file skips these without reporting anything
+            if st.st_size == 0 or st.st_size > self.max_file_size:
+                continue
+            key = cache.content_key(file_path, (st.st_mtime_ns, st.st_size))
+            keyed.append((file_path, key))
+            if key not in cache.contents:
+                to_scan.setdefault(key, file_path)
+
+        for key, issues in zip(to_scan, self._scan_files(list(to_scan.values()))):
+            cache.store(key, [(severity, message, line) for severity, message, _, line in issues])
+
+        for file_path, key in keyed:
+            self.issues.extend((severity, message, file_path, line)
+                               for severity, message, line in cache.contents[key])
+        cache.save()
+
+    def _scan_files(self, file_paths: List[str]) -> List[list]:
+        """Issues of each file, fanning out to worker processes for large sets"""
+        if len(file_paths) < PARALLEL_MIN_FILES:
+            return [self._review_file_isolated(file_path) for file_path in file_paths]
+
+        # Files are reviewed independently; map() keeps results in input order
+        return list(map_in_workers(self, '_review_file_isolated', file_paths, chunksize=_PARALLEL_CHUNKSIZE))
+
+    def _review_file_isolated(self, file_path: str) -> list:
+        """Review a single file and return only its issues"""
+        issues, self.issues = self.issues, []
+        try:
+            self.review_file(file_path)
+            return self.issues
+        finally:
+            self.issues = issues
+
+    def review_file(self, file_path: str) -> List[Tuple[int, str, str, int]]:
         """Review a single file for security issues"""
         if not os.path.exists(file_path):
             print(f"Error: File not found: {file_path}")
             return []
 
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        # Empty files have nothing to flag and oversized ones are not reviewed
+        size = os.path.getsize(file_path)
+        if size == 0 or size > self.max_file_size:
+            return self.issues
+
+        content = read_source(file_path)
+        # Lowercase once; the reviewers share both forms
+        lower = content.lower()
+        # Line rules scan the whole file once and map hits back to lines;
+        # only the lines they hit are ever sliced out
+        line_starts = line_table(content)
 
         ext = Path(file_path).suffix
 
         if ext in ['.cpp', '.h', '.hpp']:
-            self._review_cpp(content, lines, file_path)
+            self._review_cpp(content, lower, line_starts, file_path)
         elif ext in ['.py']:
-            self._review_python(content, lines, file_path)
+            self._review_python(content, lower, line_starts, file_path)
         elif ext in ['.ts', '.tsx', '.js', '.jsx']:
-            self._review_typescript(content, lines, file_path)
+            self._review_typescript(content, lower, line_starts, file_path)
 
         return self.issues
 
-    def _review_cpp(self, content: str, lines: List[str], file_path: str):
+    def _review_cpp(self, content: str, lower: str, line_starts: List[int], file_path: str):
         """Review C++ code for security issues"""
 
         # Check JWT algorithm whitelisting
         if 'jwt::decode' in content or 'jwt::verify' in content:
             if 'allow_algorithm' not in content:
                 self._add_issue('high', 'JWT decoder missing algorithm whitelist', file_path, 0)
-            elif 'jwt::algorithm::hs256' in content.lower():
+            elif 'jwt::algorithm::hs256' in lower:
                 self._add_issue('critical', 'HS256 algorithm detected (use RS256 only)', file_path, 0)
-            elif 'alg: none' in content.lower() or 'algorithm::none' in content.lower():
+            elif 'alg: none' in lower or 'algorithm::none' in lower:
                 self._add_issue('critical', 'Algorithm "none" vulnerability detected', file_path, 0)
 
         # Check for SQL injection vulnerabilities
-        for i, line in enumerate(lines, 1):
-            if 'SELECT' in line.upper() and ('+' in line or 'concat' in line.lower()):
-                if 'prepare' not in line.lower() and '$' not in line:
+        upper = content.upper()
+        # lower() and upper() can change the length; offsets into them then
+        # need their own line table
+        lower_starts = line_starts if len(lower) == len(content) else line_table(lower)
+        upper_starts = line_starts if len(upper) == len(content) else line_table(upper)
+        for i in _matching_lines(_SELECT_RE, upper, upper_starts):
+            line = _line_at(content, line_starts, i)
+            line_lower = _line_at(lower, lower_starts, i)
+            if '+' in line or 'concat' in line_lower:
+                if 'prepare' not in line_lower and '$' not in line:
                     self._add_issue('high', 'Possible SQL injection: string concatenation in query', file_path, i)
 
         # Check tenant_id in queries
-        if 'SELECT' in content.upper() or 'UPDATE' in content.upper() or 'DELETE' in content.upper():
-            if 'tenant_id' not in content.lower():
+        if 'SELECT' in upper or 'UPDATE' in upper or 'DELETE' in upper:
+            if 'tenant_id' not in lower:
                 self._add_issue('high', 'Query missing tenant_id isolation', file_path, 0)
 
         # Check for hardcoded secrets
-        for i, line in enumerate(lines, 1):
-            if re.search(r'(password|secret|key|token)\s*=\s*["\'][^"\']+["\']', line, re.IGNORECASE):
-                if 'example' not in line.lower() and 'test' not in line.lower():
-                    self._add_issue('critical', 'Hardcoded secret detected', file_path, i)
+        secret_lines, = _rule_lines(_CPP_LINE_RULES, content, line_starts)
+        for i in secret_lines:
+            line_lower = _line_at(lower, lower_starts, i)
+            if 'example' not in line_lower and 'test' not in line_lower:
+                self._add_issue('critical', 'Hardcoded secret detected', file_path, i)
 
-    def _review_python(self, content: str, lines: List[str], file_path: str):
+    def _review_python(self, content: str, lower: str, line_starts: List[int], file_path: str):
         """Review Python code for security issues"""
 
         # Check JWT validation
@@ -78,11 +241,13 @@ class SecurityReviewAgent:
                 self._add_issue('critical', 'HS256 algorithm detected (use RS256)', file_path, 0)
 
             # Check for blacklist verification
-            if 'redis' not in content.lower() and 'blacklist' not in content.lower():
+            if 'redis' not in lower and 'blacklist' not in lower:
                 self._add_issue('medium', 'JWT validation missing blacklist check', file_path, 0)
 
         # Check for SQL injection (ORM bypass)
-        for i, line in enumerate(lines, 1):
+        sql_lines, eval_lines = _rule_lines(_PYTHON_LINE_RULES, content, line_starts)
+        for i in sql_lines:
+            line = _line_at(content, line_starts, i)
             if 'execute' in line and 'f"' in line:
                 self._add_issue('critical', 'SQL injection via f-string formatting', file_path, i)
             if '.raw(' in line or 'executescript' in line:
@@ -94,36 +259,34 @@ class SecurityReviewAgent:
                 self._add_issue('high', 'Database query missing tenant_id filter', file_path, 0)
 
         # Check SSRF protection in webhook URLs
-        if 'webhook' in content.lower() and 'url' in content.lower():
+        if 'webhook' in lower and 'url' in lower:
             if '10.0.0.0' not in content and '192.168' not in content and '127.0.0' not in content:
                 self._add_issue('medium', 'Webhook URL validation may be missing SSRF protection', file_path, 0)
 
         # Check for eval/exec usage
-        for i, line in enumerate(lines, 1):
-            if re.search(r'\b(eval|exec)\s*\(', line):
-                self._add_issue('critical', 'Dangerous function (eval/exec) detected', file_path, i)
+        for i in eval_lines:
+            self._add_issue('critical', 'Dangerous function (eval/exec) detected', file_path, i)
 
-    def _review_typescript(self, content: str, lines: List[str], file_path: str):
+    def _review_typescript(self, content: str, lower: str, line_starts: List[int], file_path: str):
         """Review TypeScript/JavaScript code for security issues"""
 
         # Check for dangerouslySetInnerHTML
-        for i, line in enumerate(lines, 1):
-            if 'dangerouslySetInnerHTML' in line:
-                self._add_issue('high', 'XSS risk: dangerouslySetInnerHTML usage', file_path, i)
+        inner_html_lines, eval_lines = _rule_lines(_TYPESCRIPT_LINE_RULES, content, line_starts)
+        for i in inner_html_lines:
+            self._add_issue('high', 'XSS risk: dangerouslySetInnerHTML usage', file_path, i)
 
         # Check for localStorage with sensitive data
         if 'localStorage' in content:
-            if 'token' in content.lower() or 'password' in content.lower():
+            if 'token' in lower or 'password' in lower:
                 self._add_issue('medium', 'Sensitive data in localStorage (consider httpOnly cookies)', file_path, 0)
 
         # Check for eval usage
-        for i, line in enumerate(lines, 1):
-            if re.search(r'\beval\s*\(', line):
-                self._add_issue('critical', 'eval() detected - code injection risk', file_path, i)
+        for i in eval_lines:
+            self._add_issue('critical', 'eval() detected - code injection risk', file_path, i)
 
     def _add_issue(self, severity: str, message: str, file_path: str, line: int):
         """Add a security issue to the report"""
-        self.issues.append((severity, message, f"{file_path}:{line}"))
+        self.issues.append((_SEVERITY_RANK[severity], message, file_path, line))
 
     def report(self):
         """Generate security report"""
@@ -131,22 +294,22 @@ class SecurityReviewAgent:
             print("✅ No security issues found!")
             return 0
 
-        print(f"\n🔐 Security Review Report")
-        print("=" * 80)
+        # The report is built in memory and written in one call
+        out = ["\n🔐 Security Review Report", "=" * 80]
 
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        sorted_issues = sorted(self.issues, key=lambda x: severity_order[x[0]])
+        # Stable sort on the rank alone keeps discovery order within a severity
+        sorted_issues = sorted(self.issues, key=itemgetter(0))
 
-        for severity, message, location in sorted_issues:
-            icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}[severity]
-            print(f"{icon} [{severity.upper()}] {message}")
-            print(f"   Location: {location}")
-            print()
+        for rank, message, file_path, line in sorted_issues:
+            out.append(f"{_SEVERITY_ICONS[rank]} [{_SEVERITY_LABELS[rank]}] {message}")
+            out.append(f"   Location: {file_path}:{line}")
+            out.append("")
 
-        critical_count = sum(1 for s, _, _ in self.issues if s == 'critical')
-        high_count = sum(1 for s, _, _ in self.issues if s == 'high')
+        critical_count = sum(1 for issue in self.issues if issue[0] == _SEVERITY_RANK['critical'])
+        high_count = sum(1 for issue in self.issues if issue[0] == _SEVERITY_RANK['high'])
 
-        print(f"Total: {len(self.issues)} issues ({critical_count} critical, {high_count} high)")
+        out.append(f"Total: {len(self.issues)} issues ({critical_count} critical, {high_count} high)")
+        sys.stdout.write('\n'.join(out) + '\n')
 
         return 1 if critical_count > 0 or high_count > 0 else 0
 
@@ -162,14 +325,7 @@ def main():
     if os.path.isfile(path):
         agent.review_file(path)
     elif os.path.isdir(path):
-        for root, dirs, files in os.walk(path):
-            # Skip build and generated directories
-            dirs[:] = [d for d in dirs if d not in ['build', 'node_modules', '__pycache__', 'generated']]
-
-            for file in files:
-                if file.endswith(('.cpp', '.h', '.hpp', '.py', '.ts', '.tsx', '.js', '.jsx')):
-                    file_path = os.path.join(root, file)
-                    agent.review_file(file_path)
+        agent.review_files(list(iter_source_files(path, _SOURCE_EXTS, _SKIP_DIRS)))
     else:
         print(f"Error: {path} not found")
         sys.exit(1)
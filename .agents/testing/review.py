@@ -6,14 +6,16 @@ Validates test coverage of critical paths and security flows
 import re
 import sys
 import os
-import yaml
 from typing import List
 
+# The shared helpers live one directory up, in .agents/_common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import load_config
+
 
 class TestingCoverageAgent:
     def __init__(self, config_path=".agents/config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)['testing']
+        self.config = load_config(config_path)['testing']
         self.issues = []
         self.test_categories = {
             'auth': False,
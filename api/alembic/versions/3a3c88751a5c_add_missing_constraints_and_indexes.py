@@ -10,7 +10,7 @@ Phase 2 High Priority Fixes:
 3. Allow NULL for users.password_hash (OAuth-only users)
 4. Add deleted_at to sessions, oauth_accounts, webhooks (soft delete)
 5. Add updated_at triggers for upload_objects, payment_methods
-6. Add performance indexes for common queries
+6. Performance indexes: built concurrently in b7e2c4d91f08
 7. Add connection pool timeout handling (documented in code)
 
 """
@@ -100,56 +100,10 @@ def upgrade() -> None:
         EXECUTE FUNCTION update_updated_at_column();
     """)
 
-    # 6. Add performance indexes
-    # Index for subscriptions.payment_method_id lookups
-    op.create_index(
-        'idx_subscriptions_payment_method',
-        'subscriptions',
-        ['payment_method_id'],
-        postgresql_where=sa.text('payment_method_id IS NOT NULL')
-    )
-
-    # Index for upload_objects.checksum (duplicate detection)
-    op.create_index(
-        'idx_uploads_checksum',
-        'upload_objects',
-        ['checksum'],
-        postgresql_where=sa.text('checksum IS NOT NULL AND deleted_at IS NULL')
-    )
-
-    # Index for api_keys.expires_at (cleanup queries)
-    op.create_index(
-        'idx_api_keys_expires',
-        'api_keys',
-        ['expires_at'],
-        postgresql_where=sa.text('expires_at IS NOT NULL AND revoked_at IS NULL')
-    )
-
-    # Index for invoices.status + tenant_id (common dashboard query)
-    op.create_index(
-        'idx_invoices_tenant_status',
-        'invoices',
-        ['tenant_id', 'status']
-    )
-
-    # Index for notifications.created_at DESC (recent notifications query)
-    op.create_index(
-        'idx_notifications_created_desc',
-        'notifications',
-        [sa.text('created_at DESC')]
-    )
-
 
 def downgrade() -> None:
     """Rollback Phase 2 fixes"""
 
-    # Remove indexes
-    op.drop_index('idx_notifications_created_desc', table_name='notifications')
-    op.drop_index('idx_invoices_tenant_status', table_name='invoices')
-    op.drop_index('idx_api_keys_expires', table_name='api_keys')
-    op.drop_index('idx_uploads_checksum', table_name='upload_objects')
-    op.drop_index('idx_subscriptions_payment_method', table_name='subscriptions')
-
     # Remove triggers
     op.execute('DROP TRIGGER IF EXISTS trg_payment_methods_updated_at ON payment_methods')
     op.execute('DROP TRIGGER IF EXISTS trg_upload_objects_updated_at ON upload_objects')
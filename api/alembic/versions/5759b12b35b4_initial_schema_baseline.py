@@ -15,7 +15,7 @@ Creates complete SaaSForge schema from db/schema.sql:
 from typing import Sequence, Union
 import os
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 
@@ -39,7 +39,17 @@ def upgrade() -> None:
         schema_sql = f.read()
 
     # Execute the full schema
-    op.execute(schema_sql)
+    if context.is_offline_mode():
+        # --sql output has no connection; emit the script as-is
+        op.execute(schema_sql)
+    else:
+        # schema.sql is a trusted static file: pass it straight to the DBAPI
+        # cursor in one call, skipping SQLAlchemy's text() parsing and
+        # bind-parameter handling (no_parameters also keeps '%' literal)
+        op.get_bind().exec_driver_sql(
+            schema_sql,
+            execution_options={'no_parameters': True}
+        )
 
 
 def downgrade() -> None:
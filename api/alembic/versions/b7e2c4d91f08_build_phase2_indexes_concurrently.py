@@ -0,0 +1,118 @@
+"""build_phase2_indexes_concurrently
+
+Revision ID: b7e2c4d91f08
+Revises: 3a3c88751a5c
+Create Date: 2026-10-16 14:05:37.218406
+
+Phase 2 performance indexes, built with CREATE INDEX CONCURRENTLY so the
+builds do not lock out writes to these (large, hot) tables.
+
+Postgres refuses CONCURRENTLY inside a transaction, so the builds run in
+autocommit mode. They live in their own revision so the transactional
+Phase 2 DDL (3a3c88751a5c) is never half-committed by them: if a build
+fails, only this revision is re-run.
+
+A failed concurrent build leaves an INVALID index behind. Re-runs drop
+such leftovers and build them again; valid indexes (e.g. on databases
+that built them in 3a3c88751a5c before this revision existed) are kept.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4d91f08'
+down_revision: Union[str, None] = '3a3c88751a5c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# index name -> table
+INDEXES = {
+    'idx_subscriptions_payment_method': 'subscriptions',
+    'idx_uploads_checksum': 'upload_objects',
+    'idx_api_keys_expires': 'api_keys',
+    'idx_invoices_tenant_status': 'invoices',
+    'idx_notifications_created_desc': 'notifications',
+}
+
+
+def _drop_invalid_indexes() -> None:
+    """Drop indexes left INVALID by an earlier failed concurrent build"""
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = ANY(:names) AND NOT i.indisvalid"
+        ),
+        {'names': list(INDEXES)}
+    ).scalars().all()
+    for name in invalid:
+        op.drop_index(name, table_name=INDEXES[name], postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    """Build the Phase 2 performance indexes without blocking writes"""
+
+    with op.get_context().autocommit_block():
+        _drop_invalid_indexes()
+
+        # Index for subscriptions.payment_method_id lookups
+        op.create_index(
+            'idx_subscriptions_payment_method',
+            'subscriptions',
+            ['payment_method_id'],
+            postgresql_where=sa.text('payment_method_id IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Index for upload_objects.checksum (duplicate detection)
+        op.create_index(
+            'idx_uploads_checksum',
+            'upload_objects',
+            ['checksum'],
+            postgresql_where=sa.text('checksum IS NOT NULL AND deleted_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Index for api_keys.expires_at (cleanup queries)
+        op.create_index(
+            'idx_api_keys_expires',
+            'api_keys',
+            ['expires_at'],
+            postgresql_where=sa.text('expires_at IS NOT NULL AND revoked_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Index for invoices.status + tenant_id (common dashboard query);
+        # replaced by a covering index in d41f8a6c2e93
+        op.create_index(
+            'idx_invoices_tenant_status',
+            'invoices',
+            ['tenant_id', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+        # Index for notifications.created_at DESC (recent notifications query)
+        op.create_index(
+            'idx_notifications_created_desc',
+            'notifications',
+            [sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Drop the Phase 2 performance indexes"""
+
+    # CONCURRENTLY, outside a transaction, like they were built
+    with op.get_context().autocommit_block():
+        for name, table in reversed(INDEXES.items()):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
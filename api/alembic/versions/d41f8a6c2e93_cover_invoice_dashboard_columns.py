@@ -0,0 +1,77 @@
+"""cover_invoice_dashboard_columns
+
+Revision ID: d41f8a6c2e93
+Revises: b7e2c4d91f08
+Create Date: 2026-10-16 14:21:09.604117
+
+Replaces idx_invoices_tenant_status (tenant_id, status) with a covering
+index that also carries the columns the tenant invoice dashboard lists,
+so that query is answered by an index-only scan without heap fetches.
+
+The covering index is built under a new name and the old one dropped
+afterwards, both CONCURRENTLY, so databases that already have the plain
+index get the covering one too and invoices stays writable throughout.
+A leftover INVALID covering index from a failed build is dropped and
+built again on re-run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f8a6c2e93'
+down_revision: Union[str, None] = 'b7e2c4d91f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COVERING_INDEX = 'idx_invoices_tenant_status_covering'
+
+
+def _drop_if_invalid(name: str, table: str) -> None:
+    """Drop name if an earlier failed concurrent build left it INVALID"""
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {'name': name}
+    ).first()
+    if invalid is not None:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    """Swap idx_invoices_tenant_status for a covering index"""
+
+    with op.get_context().autocommit_block():
+        _drop_if_invalid(COVERING_INDEX, 'invoices')
+        op.create_index(
+            COVERING_INDEX,
+            'invoices',
+            ['tenant_id', 'status'],
+            postgresql_include=['amount_due', 'amount_paid', 'created_at', 'due_date'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index('idx_invoices_tenant_status', table_name='invoices',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Restore the plain (tenant_id, status) index"""
+
+    with op.get_context().autocommit_block():
+        _drop_if_invalid('idx_invoices_tenant_status', 'invoices')
+        op.create_index(
+            'idx_invoices_tenant_status',
+            'invoices',
+            ['tenant_id', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(COVERING_INDEX, table_name='invoices',
+                      postgresql_concurrently=True, if_exists=True)
@@ -1,9 +1,27 @@
 """gRPC client wrappers for SaaSForge services."""
 
-from .auth_client import AuthClient
-from .upload_client import UploadClient
-from .payment_client import PaymentClient
-from .notification_client import NotificationClient
+import os
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# The generated *_pb2 modules import each other as top-level modules, so
+# api/generated must be importable. It is added once here, before any
+# client module loads, and appended so other imports never scan it first
+_GENERATED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generated")
+if _GENERATED_DIR not in sys.path:
+    sys.path.append(_GENERATED_DIR)
+
+# The generated modules must run on protobuf's C (upb) backend, not the
+# pure-Python one. The backend is picked when google.protobuf is first
+# imported, normally by the first client module to load
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+if TYPE_CHECKING:
+    from .auth_client import AuthClient
+    from .upload_client import UploadClient
+    from .payment_client import PaymentClient
+    from .notification_client import NotificationClient
 
 __all__ = [
     "AuthClient",
@@ -11,3 +29,25 @@ __all__ = [
     "PaymentClient",
     "NotificationClient",
 ]
+
+# Each wrapper pulls in grpc and its generated stubs, so a client module is
+# only imported the first time its class is looked up (PEP 562)
+_CLIENT_MODULES = {
+    "AuthClient": ".auth_client",
+    "UploadClient": ".upload_client",
+    "PaymentClient": ".payment_client",
+    "NotificationClient": ".notification_client",
+}
+
+
+def __getattr__(name):
+    module = _CLIENT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,189 @@
+"""Process-wide gRPC channels shared by the service clients.
+
+Channels use the asyncio API (grpc.aio): one event-loop thread can have
+any number of RPCs in flight, where the blocking API ties up a thread per
+call. They are bound to the loop they are created on, so they must be
+opened from async code running on the application's loop.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Tuple
+
+from grpc import aio
+
+from ._mtls import load_credentials
+
+logger = logging.getLogger(__name__)
+
+# Channels per service address. Every channel is its own HTTP/2
+# connection, so concurrent RPCs do not all queue behind one connection's
+# flow-control window and stream limit
+_POOL_SIZE = int(os.getenv("GRPC_CHANNEL_POOL_SIZE", "4"))
+
+# Deadline (seconds) for every client RPC, so a hung service fails the
+# call instead of holding it open; calls also fail fast (wait_for_ready
+# off) while the channel cannot connect rather than queueing behind it
+DEFAULT_TIMEOUT = float(os.getenv("GRPC_TIMEOUT_SECONDS", "5.0"))
+
+# With GRPC_USE_UDS=1 a local sidecar proxy (Envoy, linkerd-proxy) owns
+# the mTLS to the services, and clients speak plaintext to it over a Unix
+# socket: no TLS work in the process and no TCP stack on the local hop
+_USE_UDS = os.getenv("GRPC_USE_UDS") == "1"
+_UDS_PATH = os.getenv("GRPC_UDS_PATH", "/var/run/grpc.sock")
+
+# When the services sit behind one mesh/ingress endpoint, every client
+# shares its pool: the four services' RPCs multiplex over the same HTTP/2
+# connections instead of each service holding its own
+_MESH_ENDPOINT = os.getenv("GRPC_MESH_ENDPOINT")
+
+# HTTP/2 settings for the long-lived service connections: keepalive pings
+# notice dead peers (and keep idle connections open through NATs/LBs)
+# instead of stalling the next RPC; BDP probing grows the flow-control
+# window past the default so large or bursty responses are not throttled.
+# The services accept pings this often (see their main.cpp). Channels never
+# go idle on their own, so a quiet spell does not drop the connections and
+# make the next request reconnect.
+GRPC_CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", 20000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.client_idle_timeout_ms", 2**31 - 1),
+    ("grpc.http2.bdp_probe", 1),
+    ("grpc.optimization_target", "throughput"),
+)
+
+
+class ChannelPool:
+    """Fixed set of channels to one address, handed out round-robin."""
+
+    def __init__(self, channels):
+        self.channels: Tuple[aio.Channel, ...] = tuple(channels)
+        # next() on itertools.count is atomic under the GIL, so threads
+        # rotate through the channels without a lock
+        self._counter = itertools.count()
+        # stub class -> one stub per channel; stubs build a multicallable
+        # per RPC, so they are made once per pool rather than per client
+        self._stubs: Dict[type, tuple] = {}
+        # method -> one pre-serialized-request callable per channel
+        self._raw_callables: Dict[str, tuple] = {}
+        # name -> helper sending on this pool (email batcher, stream caches).
+        # They live and close with the pool, so none outlives its channels
+        self._helpers: Dict[str, object] = {}
+
+    def next_index(self) -> int:
+        """Index of the channel the next RPC should use."""
+        return next(self._counter) % len(self.channels)
+
+    def stubs(self, stub_class) -> tuple:
+        """One stub_class instance per channel, shared by every client."""
+        stubs = self._stubs.get(stub_class)
+        if stubs is None:
+            stubs = self._stubs[stub_class] = tuple(stub_class(channel) for channel in self.channels)
+        return stubs
+
+    def raw_unary_unary(self, method: str, response_deserializer):
+        """Callable for method on the next channel, taking request bytes.
+
+        The request is sent as given (no serializer), so callers can reuse
+        bytes they serialized earlier instead of re-encoding a message.
+        """
+        callables = self._raw_callables.get(method)
+        if callables is None:
+            callables = self._raw_callables[method] = tuple(
+                channel.unary_unary(method, request_serializer=None,
+                                    response_deserializer=response_deserializer)
+                for channel in self.channels
+            )
+        return callables[self.next_index()]
+
+    def helper(self, name: str, factory: Callable[["ChannelPool"], object]):
+        """Helper built by factory(pool) on first use, shared by every client."""
+        helper = self._helpers.get(name)
+        if helper is None:
+            helper = self._helpers[name] = factory(self)
+        return helper
+
+    async def close(self):
+        helpers = list(self._helpers.values())
+        self._helpers.clear()
+        for helper in helpers:
+            close = getattr(helper, "close", None)
+            if close is not None:
+                close()
+        for channel in self.channels:
+            await channel.close()
+
+
+# One pool per service address, opened on first use and kept for the life
+# of the process; clients are cheap per-request wrappers around it
+_CHANNEL_CACHE: Dict[str, ChannelPool] = {}
+_channel_lock = threading.Lock()
+
+
+def _open_channel(address: str, index: int) -> aio.Channel:
+    """Open channel number index of the pool for address."""
+    # Distinct args and a local subchannel pool keep gRPC from folding the
+    # pool's channels back onto a single connection
+    options = [*GRPC_CHANNEL_OPTIONS, ("grpc.channel_id", index), ("grpc.use_local_subchannel_pool", 1)]
+    if _USE_UDS:
+        # The proxy routes on :authority, which still names the service
+        options.append(("grpc.default_authority", address))
+        return aio.insecure_channel(f"unix://{_UDS_PATH}", options=options)
+
+    credentials = load_credentials()
+    if credentials is not None:
+        return aio.secure_channel(address, credentials, options=options)
+    # Fallback to insecure channel for local development only
+    return aio.insecure_channel(address, options=options)
+
+
+def get_channel_pool(address: str) -> ChannelPool:
+    """Shared channel pool for address (mTLS when certs exist), created on first use."""
+    if _MESH_ENDPOINT:
+        address = _MESH_ENDPOINT
+    pool = _CHANNEL_CACHE.get(address)
+    if pool is not None:
+        return pool
+
+    with _channel_lock:
+        pool = _CHANNEL_CACHE.get(address)
+        if pool is None:
+            pool = ChannelPool(_open_channel(address, i) for i in range(max(1, _POOL_SIZE)))
+            _CHANNEL_CACHE[address] = pool
+    return pool
+
+
+async def warm_channels(addresses: Iterable[str], timeout: float = DEFAULT_TIMEOUT):
+    """Open the pools for addresses and connect every channel (application startup).
+
+    Channels otherwise connect on their first RPC, which then pays the TCP,
+    TLS and HTTP/2 handshakes. A service that is not up yet is logged and
+    left to connect on first use; startup does not fail.
+    """
+    # Addresses can share a pool (GRPC_MESH_ENDPOINT); connect each once
+    pools = {get_channel_pool(address): address for address in addresses}
+    channels = [(address, channel) for pool, address in pools.items() for channel in pool.channels]
+    results = await asyncio.gather(
+        *(asyncio.wait_for(channel.channel_ready(), timeout) for _, channel in channels),
+        return_exceptions=True,
+    )
+    failed = {}
+    for (address, _), result in zip(channels, results):
+        if isinstance(result, BaseException):
+            failed[address] = result
+    for address, error in failed.items():
+        logger.warning(f"gRPC channels to {address} not ready at startup: {error!r}")
+
+
+async def close_channels():
+    """Close every shared channel pool (application shutdown)."""
+    with _channel_lock:
+        pools = list(_CHANNEL_CACHE.values())
+        _CHANNEL_CACHE.clear()
+    for pool in pools:
+        await pool.close()
@@ -0,0 +1,48 @@
+"""Service addresses for the gRPC clients, read from the environment once."""
+
+import functools
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class GrpcConfig:
+    """Default host/port of each service (overridable per client)."""
+
+    auth_host: str
+    auth_port: int
+    upload_host: str
+    upload_port: int
+    payment_host: str
+    payment_port: int
+    notification_host: str
+    notification_port: int
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def load(cls) -> "GrpcConfig":
+        """Config from the environment, read on the first call only.
+
+        Clients are created per request; they take their defaults from
+        here rather than calling os.getenv each time.
+        """
+        return cls(
+            auth_host=os.getenv("AUTH_SERVICE_HOST", "localhost"),
+            auth_port=int(os.getenv("AUTH_SERVICE_PORT", "50051")),
+            upload_host=os.getenv("UPLOAD_SERVICE_HOST", "localhost"),
+            upload_port=int(os.getenv("UPLOAD_SERVICE_PORT", "50052")),
+            payment_host=os.getenv("PAYMENT_SERVICE_HOST", "localhost"),
+            payment_port=int(os.getenv("PAYMENT_SERVICE_PORT", "50053")),
+            notification_host=os.getenv("NOTIFICATION_SERVICE_HOST", "localhost"),
+            notification_port=int(os.getenv("NOTIFICATION_SERVICE_PORT", "50054")),
+        )
+
+    @property
+    def addresses(self) -> tuple:
+        """host:port of every service."""
+        return (
+            f"{self.auth_host}:{self.auth_port}",
+            f"{self.upload_host}:{self.upload_port}",
+            f"{self.payment_host}:{self.payment_port}",
+            f"{self.notification_host}:{self.notification_port}",
+        )
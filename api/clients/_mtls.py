@@ -0,0 +1,36 @@
+"""mTLS credentials for the service clients' channels."""
+
+import functools
+import os
+from typing import Optional
+
+import grpc
+
+
+@functools.lru_cache(maxsize=1)
+def load_credentials() -> Optional[grpc.ChannelCredentials]:
+    """mTLS credentials for service-to-service calls, read once per process.
+
+    Returns None when the certificates are missing (local development).
+    """
+    ca_cert_path = os.getenv("GRPC_CA_CERT_PATH", "certs/ca.crt")
+    client_cert_path = os.getenv("GRPC_CLIENT_CERT_PATH", "certs/client.crt")
+    client_key_path = os.getenv("GRPC_CLIENT_KEY_PATH", "certs/client.key")
+
+    try:
+        with open(ca_cert_path, "rb") as f:
+            ca_cert = f.read()
+        with open(client_cert_path, "rb") as f:
+            client_cert = f.read()
+        with open(client_key_path, "rb") as f:
+            client_key = f.read()
+    except FileNotFoundError as e:
+        print(f"WARNING: mTLS certs not found ({e}), using insecure channel")
+        return None
+
+    # Create SSL credentials with client certificate for mTLS
+    return grpc.ssl_channel_credentials(
+        root_certificates=ca_cert,
+        private_key=client_key,
+        certificate_chain=client_cert
+    )
@@ -0,0 +1,190 @@
+"""Unary-style calls multiplexed over long-lived bidirectional streams.
+
+Callers that issue the same RPC in a loop (usage metering, status polling)
+pay for HEADERS and END_STREAM frames on every unary call. The services'
+*Stream RPCs answer every request read from a stream with one result
+message carrying the code, message and response the unary call would have
+returned, in order, so one stream can serve any number of calls.
+
+A stream carries the access token it was opened with, so streams are short
+lived: one is closed after _IDLE_TIMEOUT without calls, and at the latest
+after _MAX_STREAM_AGE or when its token expires, and the next call opens a
+new one. The services also end streams older than their kMaxStreamAge.
+"""
+
+import asyncio
+import collections
+import time
+from typing import Callable, Optional, Tuple
+
+import grpc
+import jwt
+
+from ._channel import ChannelPool
+from .metadata import AUTHORIZATION_KEY, Metadata
+
+# Streams kept open per RPC and address, one per caller metadata (so per
+# access token); the least recently used is closed past this many
+_MAX_STREAMS = 256
+
+# Seconds a stream stays open without calls, and at most in total; the
+# age stays under the services' 5 minute kMaxStreamAge
+_IDLE_TIMEOUT = 30.0
+_MAX_STREAM_AGE = 240.0
+
+_STATUS_CODES = {code.value[0]: code for code in grpc.StatusCode}
+
+
+def result_error(code: int, details: str) -> grpc.aio.AioRpcError:
+    """RpcError for a failed stream/batch item, as the unary call would have raised"""
+    return grpc.aio.AioRpcError(
+        _STATUS_CODES.get(code, grpc.StatusCode.UNKNOWN),
+        grpc.aio.Metadata(),
+        grpc.aio.Metadata(),
+        details
+    )
+
+
+class CallStream:
+    """One open stream; each call() is answered by the next result read.
+
+    The stream closes itself after _IDLE_TIMEOUT without calls or once
+    max_age seconds have passed, then calls on_close(stream).
+    """
+
+    def __init__(self, open_call, max_age: float = _MAX_STREAM_AGE, on_close: Optional[Callable] = None):
+        self._requests = asyncio.Queue()
+        # Futures of the calls sent and not answered yet, in send order
+        self._waiters = collections.deque()
+        self.closed = False
+        self._on_close = on_close
+        self._loop = asyncio.get_running_loop()
+        self._last_used = self._loop.time()
+        self._expires_at = self._last_used + max_age
+        # One timer re-armed as it fires, rather than one per call
+        self._timer = self._loop.call_at(self._deadline(), self._expire)
+        self._call = open_call(self._request_iterator())
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def _request_iterator(self):
+        while True:
+            request = await self._requests.get()
+            if request is None:
+                return
+            yield request
+
+    def call(self, request) -> asyncio.Future:
+        future = self._loop.create_future()
+        self._waiters.append(future)
+        self._requests.put_nowait(request)
+        self._last_used = self._loop.time()
+        return future
+
+    def close(self):
+        """Stop sending; calls already queued are still answered."""
+        if not self.closed:
+            self._mark_closed()
+            self._requests.put_nowait(None)
+
+    def _deadline(self) -> float:
+        return min(self._last_used + _IDLE_TIMEOUT, self._expires_at)
+
+    def _expire(self):
+        deadline = self._deadline()
+        if self._loop.time() >= deadline:
+            self.close()
+        else:
+            self._timer = self._loop.call_at(deadline, self._expire)
+
+    def _mark_closed(self):
+        self.closed = True
+        self._timer.cancel()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    async def _read(self):
+        try:
+            async for result in self._call:
+                future = self._waiters.popleft()
+                if future.done():
+                    continue  # caller gave up
+                if result.code == grpc.StatusCode.OK.value[0]:
+                    future.set_result(result.response)
+                else:
+                    future.set_exception(result_error(result.code, result.message))
+            error = result_error(grpc.StatusCode.UNAVAILABLE.value[0], "Stream closed")
+        except grpc.RpcError as e:
+            error = e
+
+        if not self.closed:
+            self._mark_closed()
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+
+def _token_expiry(metadata: Metadata) -> Optional[float]:
+    """exp (epoch seconds) of the bearer token in metadata, None if it has none.
+
+    Only bounds how long a stream is kept; the services verify the token.
+    """
+    for key, value in metadata:
+        if key == AUTHORIZATION_KEY and value.startswith("Bearer "):
+            try:
+                exp = jwt.decode(value[7:], options={"verify_signature": False}).get("exp")
+            except jwt.PyJWTError:
+                return None
+            return float(exp) if isinstance(exp, (int, float)) else None
+    return None
+
+
+class StreamCache:
+    """Open CallStreams for one streaming RPC of one channel pool.
+
+    Calls are keyed by their metadata, since a stream carries one caller's
+    tenant/auth context. Streams leave the cache when they close (idle,
+    too old, token expired, failed or ended), so their metadata is not
+    kept; the next call with that metadata opens a new stream.
+    """
+
+    def __init__(self, pool: ChannelPool, methods: Tuple[Callable, ...]):
+        self._pool = pool
+        # The stubs' streaming multicallable, one per channel of the pool
+        self._methods = methods
+        self._streams: "collections.OrderedDict[Metadata, CallStream]" = collections.OrderedDict()
+
+    def get(self, metadata: Metadata) -> CallStream:
+        key = tuple(metadata or ())
+        stream = self._streams.get(key)
+        if stream is not None and not stream.closed:
+            self._streams.move_to_end(key)
+            return stream
+
+        max_age = _MAX_STREAM_AGE
+        exp = _token_expiry(key)
+        if exp is not None:
+            max_age = min(max_age, exp - time.time())
+
+        method = self._methods[self._pool.next_index()]
+        stream = self._streams[key] = CallStream(
+            lambda requests: method(requests, metadata=key),
+            max_age=max_age,
+            on_close=lambda closed: self._discard(key, closed)
+        )
+        self._streams.move_to_end(key)
+        if len(self._streams) > _MAX_STREAMS:
+            _, oldest = self._streams.popitem(last=False)
+            oldest.close()
+        return stream
+
+    def _discard(self, key: Metadata, stream: CallStream):
+        if self._streams.get(key) is stream:
+            del self._streams[key]
+
+    def close(self):
+        """Close every stream (the pool is closing)."""
+        streams = list(self._streams.values())
+        self._streams.clear()
+        for stream in streams:
+            stream.close()
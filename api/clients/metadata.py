@@ -0,0 +1,21 @@
+"""Call metadata passed to the service clients.
+
+Metadata is an immutable tuple of (key, value) pairs, so one tuple can be
+built once and handed to any number of RPCs without being copied.
+"""
+
+from typing import Tuple
+
+Metadata = Tuple[Tuple[str, str], ...]
+
+# gRPC metadata keys are lowercase ASCII str; grpc rejects bytes keys
+AUTHORIZATION_KEY = "authorization"
+
+
+def bearer_metadata(access_token: str) -> Metadata:
+    """Metadata carrying access_token.
+
+    Built per call rather than cached, so tokens are not kept in memory
+    past the request that carried them.
+    """
+    return ((AUTHORIZATION_KEY, f"Bearer {access_token}"),)
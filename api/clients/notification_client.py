@@ -1,56 +1,133 @@
 """gRPC client wrapper for Notification Service."""
 
+import asyncio
 import grpc
-import os
-from typing import List, Dict, Optional
-import sys
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generated'))
+import types
+from typing import List, Dict, Optional, Tuple
 
 from notification_pb2 import (
-    SendEmailRequest, SendSMSRequest, SendPushRequest,
+    SendEmailRequest, SendEmailBatchRequest, SendSMSRequest, SendPushRequest,
     TriggerWebhookRequest, GetNotificationStatusRequest,
     UpdatePreferencesRequest, RegisterWebhookRequest,
     NotificationResponse, PreferencesResponse, WebhookResponse
 )
 from notification_pb2_grpc import NotificationServiceStub
 
+from ._channel import DEFAULT_TIMEOUT, ChannelPool, get_channel_pool
+from ._config import GrpcConfig
+from ._stream import StreamCache, result_error
+from .metadata import Metadata
+
+_TRIGGER_WEBHOOK_METHOD = "/saasforge.notification.NotificationService/TriggerWebhook"
+
+# Shared read-only stand-in for a missing template_vars/data map, so calls
+# without one do not each allocate an empty dict for protobuf to copy
+_EMPTY_MAP = types.MappingProxyType({})
+
+# send_email_batched coalesces the calls made within this window (seconds)
+# into one SendEmailBatchRequest, flushing early at _EMAIL_BATCH_MAX items
+_EMAIL_BATCH_WINDOW = 0.001
+_EMAIL_BATCH_MAX = 256
+
+
+class _EmailBatcher:
+    """Packs concurrent send_email_batched calls into SendEmailBatch RPCs.
+
+    Pending requests are grouped by call metadata, since one stream carries
+    one caller's tenant/auth context. Each caller gets a future resolved
+    from its item of the batch result.
+    """
+
+    def __init__(self, pool: ChannelPool):
+        self._pool = pool
+        self._stubs = pool.stubs(NotificationServiceStub)
+        self._pending: Dict[tuple, List[Tuple[SendEmailRequest, asyncio.Future]]] = {}
+        self._flush_handle = None
+        # Strong references to in-flight batches until they complete
+        self._tasks = set()
+
+    def submit(self, request: SendEmailRequest, metadata: Metadata) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = tuple(metadata or ())
+        group = self._pending.setdefault(key, [])
+        group.append((request, future))
+        if len(group) >= _EMAIL_BATCH_MAX:
+            self._dispatch(key, self._pending.pop(key))
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(_EMAIL_BATCH_WINDOW, self._flush)
+        return future
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for key, group in pending.items():
+            self._dispatch(key, group)
+
+    def _dispatch(self, metadata: Metadata, group: list):
+        task = asyncio.ensure_future(self._send(metadata, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, metadata: Metadata, group: list):
+        stub = self._stubs[self._pool.next_index()]
+        try:
+            call = stub.SendEmailBatch(metadata=metadata, timeout=DEFAULT_TIMEOUT, wait_for_ready=False)
+            await call.write(SendEmailBatchRequest(items=[request for request, _ in group]))
+            await call.done_writing()
+            batch_response = await call.read()
+            results = list(batch_response.items) if batch_response is not grpc.aio.EOF else []
+        except grpc.RpcError as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(group, results):
+            if future.done():
+                continue  # caller gave up
+            if result.code == grpc.StatusCode.OK.value[0]:
+                future.set_result(result.response)
+            else:
+                future.set_exception(result_error(result.code, result.message))
+        for _, future in group[len(results):]:
+            if not future.done():
+                future.set_exception(result_error(grpc.StatusCode.INTERNAL.value[0], "Missing batch result"))
+
+
+def _status_streams(pool: ChannelPool) -> StreamCache:
+    return StreamCache(pool, tuple(stub.GetNotificationStatusStream for stub in pool.stubs(NotificationServiceStub)))
+
+
+# Names of the helpers kept on the channel pool: one batcher and one
+# GetNotificationStatusStream cache per pool, closed along with it
+_EMAIL_BATCHER = "notification.email_batcher"
+_STATUS_STREAMS = "notification.status_streams"
+
 
 class NotificationClient:
     """Client for Notification Service gRPC calls."""
 
+    # Instances are made per request; slots keep them small
+    __slots__ = ("host", "port", "address", "_pool", "_stubs")
+
     def __init__(self, host: str = None, port: int = None):
-        self.host = host or os.getenv("NOTIFICATION_SERVICE_HOST", "localhost")
-        self.port = port or int(os.getenv("NOTIFICATION_SERVICE_PORT", "50054"))
+        config = GrpcConfig.load()
+        self.host = host or config.notification_host
+        self.port = port or config.notification_port
         self.address = f"{self.host}:{self.port}"
 
-        # Load mTLS certificates for secure service-to-service communication
-        ca_cert_path = os.getenv("GRPC_CA_CERT_PATH", "certs/ca.crt")
-        client_cert_path = os.getenv("GRPC_CLIENT_CERT_PATH", "certs/client.crt")
-        client_key_path = os.getenv("GRPC_CLIENT_KEY_PATH", "certs/client.key")
+        # Channels (and the mTLS handshake) are shared by every client
+        # of the process rather than opened per instance
+        self._pool = get_channel_pool(self.address)
+        self._stubs = self._pool.stubs(NotificationServiceStub)
 
-        try:
-            with open(ca_cert_path, "rb") as f:
-                ca_cert = f.read()
-            with open(client_cert_path, "rb") as f:
-                client_cert = f.read()
-            with open(client_key_path, "rb") as f:
-                client_key = f.read()
-
-            credentials = grpc.ssl_channel_credentials(
-                root_certificates=ca_cert,
-                private_key=client_key,
-                certificate_chain=client_cert
-            )
-
-            self.channel = grpc.secure_channel(self.address, credentials)
-        except FileNotFoundError as e:
-            print(f"WARNING: mTLS certs not found ({e}), using insecure channel")
-            self.channel = grpc.insecure_channel(self.address)
-
-        self.stub = NotificationServiceStub(self.channel)
-
-    def send_email(
+    @property
+    def stub(self) -> NotificationServiceStub:
+        """Stub on the next channel of the pool (round-robin per RPC)."""
+        return self._stubs[self._pool.next_index()]
+
+    async def send_email(
         self,
         tenant_id: str,
         user_id: str,
@@ -60,31 +137,77 @@ class NotificationClient:
         body_text: Optional[str],
         template_id: Optional[str],
         template_vars: Dict[str, str],
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> NotificationResponse:
         """Send email notification."""
-        request = SendEmailRequest(
-            tenant_id=tenant_id,
-            user_id=user_id,
-            to=to,
-            subject=subject,
-            body_html=body_html,
-            template_vars=template_vars or {}
+        request = self._email_request(
+            tenant_id, user_id, to, subject, body_html, body_text, template_id, template_vars
+        )
+        return await self.stub.SendEmail(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
+
+    async def send_email_batched(
+        self,
+        tenant_id: str,
+        user_id: str,
+        to: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str],
+        template_id: Optional[str],
+        template_vars: Dict[str, str],
+        metadata: Metadata
+    ) -> NotificationResponse:
+        """Send email notification as part of a batch (bulk sends).
+
+        Calls made within about a millisecond of each other share one
+        SendEmailBatch message. Results and errors match send_email.
+        """
+        request = self._email_request(
+            tenant_id, user_id, to, subject, body_html, body_text, template_id, template_vars
+        )
+        batcher = self._pool.helper(_EMAIL_BATCHER, _EmailBatcher)
+        # The batch RPC itself carries the deadline (see _EmailBatcher._send)
+        return await batcher.submit(request, metadata)
+
+    @staticmethod
+    def _email_request(
+        tenant_id: str,
+        user_id: str,
+        to: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str],
+        template_id: Optional[str],
+        template_vars: Dict[str, str]
+    ) -> SendEmailRequest:
+        # Optional fields go into the constructor kwargs too, so the message
+        # is filled in one call instead of set field by field afterwards
+        fields = {
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "to": to,
+            "subject": subject,
+            "body_html": body_html,
+            "template_vars": template_vars if template_vars else _EMPTY_MAP
+        }
         if body_text:
-            request.body_text = body_text
+            fields["body_text"] = body_text
         if template_id:
-            request.template_id = template_id
-
-        return self.stub.SendEmail(request, metadata=metadata)
+            fields["template_id"] = template_id
+        return SendEmailRequest(**fields)
 
-    def send_sms(
+    async def send_sms(
         self,
         tenant_id: str,
         user_id: str,
         to: str,
         message: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> NotificationResponse:
         """Send SMS notification."""
         request = SendSMSRequest(
@@ -93,16 +216,21 @@ class NotificationClient:
             to=to,
             message=message
         )
-        return self.stub.SendSMS(request, metadata=metadata)
+        return await self.stub.SendSMS(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def send_push(
+    async def send_push(
         self,
         tenant_id: str,
         user_id: str,
         title: str,
         body: str,
         data: Dict[str, str],
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> NotificationResponse:
         """Send push notification."""
         request = SendPushRequest(
@@ -110,17 +238,22 @@ class NotificationClient:
             user_id=user_id,
             title=title,
             body=body,
-            data=data or {}
+            data=data if data else _EMPTY_MAP
+        )
+        return await self.stub.SendPush(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
-        return self.stub.SendPush(request, metadata=metadata)
 
-    def trigger_webhook(
+    async def trigger_webhook(
         self,
         tenant_id: str,
         webhook_id: str,
         event_type: str,
         payload: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> NotificationResponse:
         """Trigger webhook."""
         request = TriggerWebhookRequest(
@@ -129,22 +262,66 @@ class NotificationClient:
             event_type=event_type,
             payload=payload
         )
-        return self.stub.TriggerWebhook(request, metadata=metadata)
+        return await self.stub.TriggerWebhook(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def get_notification_status(
+    async def trigger_webhook_raw(self, request: bytes, metadata: Metadata) -> NotificationResponse:
+        """Trigger webhook from an already serialized TriggerWebhookRequest.
+
+        For callers that hold the encoded request (e.g. re-emitting an event
+        from a bus); the bytes are sent as-is rather than parsed and rebuilt.
+        """
+        trigger = self._pool.raw_unary_unary(_TRIGGER_WEBHOOK_METHOD, NotificationResponse.FromString)
+        return await trigger(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
+
+    async def get_notification_status(
         self,
         tenant_id: str,
         notification_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> NotificationResponse:
         """Get notification status."""
         request = GetNotificationStatusRequest(
             tenant_id=tenant_id,
             notification_id=notification_id
         )
-        return self.stub.GetNotificationStatus(request, metadata=metadata)
+        return await self.stub.GetNotificationStatus(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
+
+    async def get_notification_status_streamed(
+        self,
+        tenant_id: str,
+        notification_id: str,
+        metadata: Metadata
+    ) -> NotificationResponse:
+        """Get notification status over a long-lived GetNotificationStatusStream.
+
+        Same result as get_notification_status, but calls with the same
+        metadata share one stream instead of each being a unary RPC, which
+        suits status polling loops.
+        """
+        streams = self._pool.helper(_STATUS_STREAMS, _status_streams)
+        request = GetNotificationStatusRequest(
+            tenant_id=tenant_id,
+            notification_id=notification_id
+        )
+        # The stream is long-lived, so the deadline bounds each call instead
+        return await asyncio.wait_for(streams.get(metadata).call(request), DEFAULT_TIMEOUT)
 
-    def update_preferences(
+    async def update_preferences(
         self,
         tenant_id: str,
         user_id: str,
@@ -152,7 +329,7 @@ class NotificationClient:
         sms_enabled: bool,
         push_enabled: bool,
         marketing_emails: bool,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> PreferencesResponse:
         """Update notification preferences."""
         request = UpdatePreferencesRequest(
@@ -163,34 +340,48 @@ class NotificationClient:
             push_enabled=push_enabled,
             marketing_emails=marketing_emails
         )
-        return self.stub.UpdatePreferences(request, metadata=metadata)
+        return await self.stub.UpdatePreferences(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def register_webhook(
+    async def register_webhook(
         self,
         tenant_id: str,
         url: str,
         events: List[str],
         secret: Optional[str],
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> WebhookResponse:
         """Register webhook."""
-        request = RegisterWebhookRequest(
-            tenant_id=tenant_id,
-            url=url,
-            events=events
-        )
+        fields = {
+            "tenant_id": tenant_id,
+            "url": url,
+            "events": events
+        }
         if secret:
-            request.secret = secret
+            fields["secret"] = secret
 
-        return self.stub.RegisterWebhook(request, metadata=metadata)
+        return await self.stub.RegisterWebhook(
+            RegisterWebhookRequest(**fields),
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
     def close(self):
-        """Close gRPC channel."""
-        if self.channel:
-            self.channel.close()
+        """Release the client; the shared channel stays open for other clients."""
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,11 +1,7 @@
 """gRPC client wrapper for Payment Service."""
 
-import grpc
-import os
-from typing import List, Optional
-import sys
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generated'))
+import asyncio
+from typing import Optional
 
 from payment_pb2 import (
     CreateSubscriptionRequest, UpdateSubscriptionRequest,
@@ -18,42 +14,42 @@ from payment_pb2 import (
 )
 from payment_pb2_grpc import PaymentServiceStub
 
+from ._channel import DEFAULT_TIMEOUT, ChannelPool, get_channel_pool
+from ._config import GrpcConfig
+from ._stream import StreamCache
+from .metadata import Metadata
+
+def _usage_streams(pool: ChannelPool) -> StreamCache:
+    return StreamCache(pool, tuple(stub.RecordUsageStream for stub in pool.stubs(PaymentServiceStub)))
+
+
+# RecordUsageStream cache kept on the channel pool, closed along with it
+_USAGE_STREAMS = "payment.usage_streams"
+
 
 class PaymentClient:
     """Client for Payment Service gRPC calls."""
 
+    # Instances are made per request; slots keep them small
+    __slots__ = ("host", "port", "address", "_pool", "_stubs")
+
     def __init__(self, host: str = None, port: int = None):
-        self.host = host or os.getenv("PAYMENT_SERVICE_HOST", "localhost")
-        self.port = port or int(os.getenv("PAYMENT_SERVICE_PORT", "50053"))
+        config = GrpcConfig.load()
+        self.host = host or config.payment_host
+        self.port = port or config.payment_port
         self.address = f"{self.host}:{self.port}"
 
-        # Load mTLS certificates for secure service-to-service communication
-        ca_cert_path = os.getenv("GRPC_CA_CERT_PATH", "certs/ca.crt")
-        client_cert_path = os.getenv("GRPC_CLIENT_CERT_PATH", "certs/client.crt")
-        client_key_path = os.getenv("GRPC_CLIENT_KEY_PATH", "certs/client.key")
-
-        try:
-            with open(ca_cert_path, "rb") as f:
-                ca_cert = f.read()
-            with open(client_cert_path, "rb") as f:
-                client_cert = f.read()
-            with open(client_key_path, "rb") as f:
-                client_key = f.read()
-
-            credentials = grpc.ssl_channel_credentials(
-                root_certificates=ca_cert,
-                private_key=client_key,
-                certificate_chain=client_cert
-            )
-
-            self.channel = grpc.secure_channel(self.address, credentials)
-        except FileNotFoundError as e:
-            print(f"WARNING: mTLS certs not found ({e}), using insecure channel")
-            self.channel = grpc.insecure_channel(self.address)
-
-        self.stub = PaymentServiceStub(self.channel)
-
-    def create_subscription(
+        # Channels (and the mTLS handshake) are shared by every client
+        # of the process rather than opened per instance
+        self._pool = get_channel_pool(self.address)
+        self._stubs = self._pool.stubs(PaymentServiceStub)
+
+    @property
+    def stub(self) -> PaymentServiceStub:
+        """Stub on the next channel of the pool (round-robin per RPC)."""
+        return self._stubs[self._pool.next_index()]
+
+    async def create_subscription(
         self,
         tenant_id: str,
         plan_id: str,
@@ -61,47 +57,59 @@ class PaymentClient:
         quantity: int,
         trial_days: Optional[int],
         idempotency_key: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> SubscriptionResponse:
         """Create new subscription."""
-        request = CreateSubscriptionRequest(
-            tenant_id=tenant_id,
-            plan_id=plan_id,
-            payment_method_id=payment_method_id,
-            quantity=quantity,
-            idempotency_key=idempotency_key
-        )
+        # Optional fields go into the constructor kwargs too, so the message
+        # is filled in one call instead of set field by field afterwards
+        fields = {
+            "tenant_id": tenant_id,
+            "plan_id": plan_id,
+            "payment_method_id": payment_method_id,
+            "quantity": quantity,
+            "idempotency_key": idempotency_key
+        }
         if trial_days is not None:
-            request.trial_days = trial_days
+            fields["trial_days"] = trial_days
 
-        return self.stub.CreateSubscription(request, metadata=metadata)
+        return await self.stub.CreateSubscription(
+            CreateSubscriptionRequest(**fields),
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def update_subscription(
+    async def update_subscription(
         self,
         tenant_id: str,
         subscription_id: str,
         plan_id: Optional[str],
         quantity: Optional[int],
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> SubscriptionResponse:
         """Update existing subscription."""
-        request = UpdateSubscriptionRequest(
-            tenant_id=tenant_id,
-            subscription_id=subscription_id
-        )
+        fields = {
+            "tenant_id": tenant_id,
+            "subscription_id": subscription_id
+        }
         if plan_id:
-            request.plan_id = plan_id
+            fields["plan_id"] = plan_id
         if quantity is not None:
-            request.quantity = quantity
+            fields["quantity"] = quantity
 
-        return self.stub.UpdateSubscription(request, metadata=metadata)
+        return await self.stub.UpdateSubscription(
+            UpdateSubscriptionRequest(**fields),
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def cancel_subscription(
+    async def cancel_subscription(
         self,
         tenant_id: str,
         subscription_id: str,
         immediate: bool,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> SubscriptionResponse:
         """Cancel subscription."""
         request = CancelSubscriptionRequest(
@@ -109,68 +117,93 @@ class PaymentClient:
             subscription_id=subscription_id,
             immediate=immediate
         )
-        return self.stub.CancelSubscription(request, metadata=metadata)
+        return await self.stub.CancelSubscription(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def get_subscription(
+    async def get_subscription(
         self,
         tenant_id: str,
         subscription_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> SubscriptionResponse:
         """Get subscription details."""
         request = GetSubscriptionRequest(
             tenant_id=tenant_id,
             subscription_id=subscription_id
         )
-        return self.stub.GetSubscription(request, metadata=metadata)
+        return await self.stub.GetSubscription(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def add_payment_method(
+    async def add_payment_method(
         self,
         tenant_id: str,
         stripe_payment_method_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> PaymentMethodResponse:
         """Add payment method."""
         request = AddPaymentMethodRequest(
             tenant_id=tenant_id,
             stripe_payment_method_id=stripe_payment_method_id
         )
-        return self.stub.AddPaymentMethod(request, metadata=metadata)
+        return await self.stub.AddPaymentMethod(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def remove_payment_method(
+    async def remove_payment_method(
         self,
         tenant_id: str,
         payment_method_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> RemovePaymentMethodResponse:
         """Remove payment method."""
         request = RemovePaymentMethodRequest(
             tenant_id=tenant_id,
             payment_method_id=payment_method_id
         )
-        return self.stub.RemovePaymentMethod(request, metadata=metadata)
+        return await self.stub.RemovePaymentMethod(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def get_invoice(
+    async def get_invoice(
         self,
         tenant_id: str,
         invoice_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> InvoiceResponse:
         """Get invoice details."""
         request = GetInvoiceRequest(
             tenant_id=tenant_id,
             invoice_id=invoice_id
         )
-        return self.stub.GetInvoice(request, metadata=metadata)
+        return await self.stub.GetInvoice(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def record_usage(
+    async def record_usage(
         self,
         tenant_id: str,
         subscription_id: str,
         metric_name: str,
         quantity: int,
         timestamp: int,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> RecordUsageResponse:
         """Record usage for metered billing."""
         request = RecordUsageRequest(
@@ -180,15 +213,50 @@ class PaymentClient:
             quantity=quantity,
             timestamp=timestamp
         )
-        return self.stub.RecordUsage(request, metadata=metadata)
+        return await self.stub.RecordUsage(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
+
+    async def record_usage_streamed(
+        self,
+        tenant_id: str,
+        subscription_id: str,
+        metric_name: str,
+        quantity: int,
+        timestamp: int,
+        metadata: Metadata
+    ) -> RecordUsageResponse:
+        """Record usage over a long-lived RecordUsageStream.
+
+        Same result as record_usage, but calls with the same metadata share
+        one stream instead of each being a unary RPC, which suits metering
+        loops.
+        """
+        streams = self._pool.helper(_USAGE_STREAMS, _usage_streams)
+        request = RecordUsageRequest(
+            tenant_id=tenant_id,
+            subscription_id=subscription_id,
+            metric_name=metric_name,
+            quantity=quantity,
+            timestamp=timestamp
+        )
+        # The stream is long-lived, so the deadline bounds each call instead
+        return await asyncio.wait_for(streams.get(metadata).call(request), DEFAULT_TIMEOUT)
 
     def close(self):
-        """Close gRPC channel."""
-        if self.channel:
-            self.channel.close()
+        """Release the client; the shared channel stays open for other clients."""
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
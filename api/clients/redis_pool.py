@@ -0,0 +1,36 @@
+"""Process-wide asyncio Redis client shared by the middleware, auth and routers.
+
+One connection pool serves every async Redis user, so the process holds a
+bounded number of sockets and commands from different callers can share
+connections. Connections are opened on first use.
+"""
+
+import os
+
+import redis.asyncio as aioredis
+
+# Defaults to the REDIS_HOST/PORT settings when no URL is given. REDIS_DB
+# applies unless the URL names a database itself. The synchronous client
+# in dependencies/auth.py connects with the same two settings, so both
+# blacklist paths read the same database.
+REDIS_URL = os.getenv("REDIS_URL") or "redis://{}:{}".format(
+    os.getenv("REDIS_HOST", "localhost"),
+    os.getenv("REDIS_PORT", "6379"),
+)
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+
+# Callers beyond this many concurrent commands wait for a free connection
+# (up to the socket timeout) instead of failing with "Too many connections"
+_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+
+redis_async: aioredis.Redis = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool.from_url(
+        REDIS_URL,
+        db=REDIS_DB,
+        max_connections=_MAX_CONNECTIONS,
+        timeout=5,
+        decode_responses=True,
+        socket_connect_timeout=5,
+        socket_timeout=5,
+    )
+)
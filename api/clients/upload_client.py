@@ -1,12 +1,5 @@
 """gRPC client wrapper for Upload Service."""
 
-import grpc
-import os
-from typing import List
-import sys
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generated'))
-
 from upload_pb2 import (
     PresignedUrlRequest, PresignedUrlResponse,
     CompleteUploadRequest, CompleteUploadResponse,
@@ -16,47 +9,49 @@ from upload_pb2 import (
 )
 from upload_pb2_grpc import UploadServiceStub
 
+from ._channel import DEFAULT_TIMEOUT, get_channel_pool
+from ._config import GrpcConfig
+from .metadata import Metadata
+
+_GET_QUOTA_METHOD = "/saasforge.upload.UploadService/GetQuota"
+# The tenant comes from the call metadata, so every GetQuota request is
+# the same (empty) message; it is encoded once
+_GET_QUOTA_REQUEST = GetQuotaRequest().SerializeToString()
+
 
 class UploadClient:
-    """Client for Upload Service gRPC calls."""
+    """Client for Upload Service gRPC calls.
+
+    Only control messages go over gRPC. File bytes travel between the
+    browser and S3 on presigned URLs, and TransformObject works on stored
+    object IDs; no RPC here should ever carry file contents.
+    """
+
+    # Instances are made per request; slots keep them small
+    __slots__ = ("host", "port", "address", "_pool", "_stubs")
 
     def __init__(self, host: str = None, port: int = None):
-        self.host = host or os.getenv("UPLOAD_SERVICE_HOST", "localhost")
-        self.port = port or int(os.getenv("UPLOAD_SERVICE_PORT", "50052"))
+        config = GrpcConfig.load()
+        self.host = host or config.upload_host
+        self.port = port or config.upload_port
         self.address = f"{self.host}:{self.port}"
 
-        # Load mTLS certificates for secure service-to-service communication
-        ca_cert_path = os.getenv("GRPC_CA_CERT_PATH", "certs/ca.crt")
-        client_cert_path = os.getenv("GRPC_CLIENT_CERT_PATH", "certs/client.crt")
-        client_key_path = os.getenv("GRPC_CLIENT_KEY_PATH", "certs/client.key")
-
-        try:
-            with open(ca_cert_path, "rb") as f:
-                ca_cert = f.read()
-            with open(client_cert_path, "rb") as f:
-                client_cert = f.read()
-            with open(client_key_path, "rb") as f:
-                client_key = f.read()
-
-            credentials = grpc.ssl_channel_credentials(
-                root_certificates=ca_cert,
-                private_key=client_key,
-                certificate_chain=client_cert
-            )
-
-            self.channel = grpc.secure_channel(self.address, credentials)
-        except FileNotFoundError as e:
-            print(f"WARNING: mTLS certs not found ({e}), using insecure channel")
-            self.channel = grpc.insecure_channel(self.address)
-
-        self.stub = UploadServiceStub(self.channel)
-
-    def generate_presigned_url(
+        # Channels (and the mTLS handshake) are shared by every client
+        # of the process rather than opened per instance
+        self._pool = get_channel_pool(self.address)
+        self._stubs = self._pool.stubs(UploadServiceStub)
+
+    @property
+    def stub(self) -> UploadServiceStub:
+        """Stub on the next channel of the pool (round-robin per RPC)."""
+        return self._stubs[self._pool.next_index()]
+
+    async def generate_presigned_url(
         self,
         filename: str,
         content_length: int,
         content_type: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> PresignedUrlResponse:
         """Generate presigned URL for file upload."""
         request = PresignedUrlRequest(
@@ -64,55 +59,84 @@ class UploadClient:
             content_length=content_length,
             content_type=content_type
         )
-        return self.stub.GeneratePresignedUrl(request, metadata=metadata)
+        return await self.stub.GeneratePresignedUrl(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def complete_upload(
+    async def complete_upload(
         self,
         upload_id: str,
         etag: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> CompleteUploadResponse:
         """Mark upload as completed."""
         request = CompleteUploadRequest(
             upload_id=upload_id,
             etag=etag
         )
-        return self.stub.CompleteUpload(request, metadata=metadata)
+        return await self.stub.CompleteUpload(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def transform_object(
+    async def transform_object(
         self,
         object_id: str,
         profile_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> TransformResponse:
         """Transform uploaded object (resize, compress, etc)."""
         request = TransformRequest(
             object_id=object_id,
             profile_id=profile_id
         )
-        return self.stub.TransformObject(request, metadata=metadata)
+        return await self.stub.TransformObject(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def delete_object(
+    async def delete_object(
         self,
         object_id: str,
-        metadata: List[tuple]
+        metadata: Metadata
     ) -> DeleteObjectResponse:
         """Delete uploaded object."""
         request = DeleteObjectRequest(object_id=object_id)
-        return self.stub.DeleteObject(request, metadata=metadata)
+        return await self.stub.DeleteObject(
+            request,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
-    def get_quota(self, metadata: List[tuple]) -> GetQuotaResponse:
+    async def get_quota(self, metadata: Metadata) -> GetQuotaResponse:
         """Get storage quota for tenant."""
-        request = GetQuotaRequest()
-        return self.stub.GetQuota(request, metadata=metadata)
+        get_quota = self._pool.raw_unary_unary(_GET_QUOTA_METHOD, GetQuotaResponse.FromString)
+        return await get_quota(
+            _GET_QUOTA_REQUEST,
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
+        )
 
     def close(self):
-        """Close gRPC channel."""
-        if self.channel:
-            self.channel.close()
+        """Release the client; the shared channel stays open for other clients."""
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
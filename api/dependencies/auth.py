@@ -22,9 +22,18 @@ from fastapi import Depends, HTTPException, status, Header
 from typing import Optional
 from pydantic import BaseModel
 import jwt
+import functools
+import json
 import os
 import logging
 import redis
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from clients.redis_pool import REDIS_DB, REDIS_URL, redis_async
+
+from .blacklist import BlacklistBatcher, blacklist_key, blacklist_prefilter
+from .jwt_header import token_header
+from .token_cache import VerifiedTokenCache
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +41,62 @@ logger = logging.getLogger(__name__)
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")  # Use RS256 in production
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")  # For HS256
 JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")  # For RS256 verification
+JWT_PUBLIC_KEYS = os.getenv("JWT_PUBLIC_KEYS")  # Optional JSON {kid: PEM} for key rotation
 JWT_PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")  # For RS256 signing
 
-# Redis Configuration for token blacklist
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-REDIS_DB = int(os.getenv("REDIS_DB", 0))
+# Algorithm whitelist and jwt.decode arguments, built once (jwt.decode
+# only reads them)
+_ALLOWED_ALGORITHMS = frozenset({"RS256", "HS256"})
+_JWT_ALGS = [JWT_ALGORITHM]  # Explicit algorithm whitelist
+_JWT_OPTIONS = {
+    "verify_signature": True,  # ✅ CRITICAL: Always verify signature in production
+    "verify_exp": True,  # Verify expiration
+    "verify_iat": True,  # Verify issued-at
+    "require": ["exp", "sub"],  # Require expiration and subject claims
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _rs256_public_key(pem: str):
+    """
+    Parse the RS256 public key once.
+
+    jwt.decode given a PEM string re-parses it on every call; passing the
+    parsed key object skips that on the per-request path.
+    """
+    return load_pem_public_key(pem.encode())
+
 
-# Initialize Redis client (lazy initialization)
+@functools.lru_cache(maxsize=1)
+def _rs256_public_keys_by_kid(keys_json: Optional[str]) -> dict:
+    """
+    Parse the JWT_PUBLIC_KEYS rotation map once.
+
+    Tokens whose kid is in the map are verified with that key; all others
+    use JWT_PUBLIC_KEY.
+    """
+    if not keys_json:
+        return {}
+    return {kid: load_pem_public_key(pem.encode()) for kid, pem in json.loads(keys_json).items()}
+
+
+@functools.lru_cache(maxsize=1)
+def _hs256_secret(secret: str) -> bytes:
+    """HS256 secret as the bytes the HMAC is keyed with"""
+    return secret.encode()
+
+
+# Initialize Redis client for the token blacklist (lazy initialization),
+# on the same REDIS_URL/REDIS_DB as the shared asyncio pool
 _redis_client: Optional[redis.Redis] = None
 
+# Batcher for the per-request blacklist check (lazy), on the shared
+# asyncio Redis pool
+_blacklist_batcher: Optional[BlacklistBatcher] = None
+
+# Recently verified tokens (see validate_jwt_token)
+_token_cache = VerifiedTokenCache()
+
 
 def get_redis_client() -> redis.Redis:
     """
@@ -53,9 +108,8 @@ def get_redis_client() -> redis.Redis:
     global _redis_client
     if _redis_client is None:
         try:
-            _redis_client = redis.Redis(
-                host=REDIS_HOST,
-                port=REDIS_PORT,
+            _redis_client = redis.Redis.from_url(
+                REDIS_URL,
                 db=REDIS_DB,
                 decode_responses=True,
                 socket_connect_timeout=5,
@@ -63,7 +117,8 @@ def get_redis_client() -> redis.Redis:
             )
             # Test connection
             _redis_client.ping()
-            logger.info(f"Redis connected: {REDIS_HOST}:{REDIS_PORT}")
+            connection = _redis_client.connection_pool.connection_kwargs
+            logger.info(f"Redis connected: {connection.get('host')}:{connection.get('port')}/{connection.get('db')}")
         except redis.ConnectionError as e:
             logger.error(f"Redis connection failed: {e}")
             # Continue without Redis (blacklist checks will be skipped with warning)
@@ -71,6 +126,19 @@ def get_redis_client() -> redis.Redis:
     return _redis_client
 
 
+def get_blacklist_batcher() -> BlacklistBatcher:
+    """
+    Get the batcher that coalesces blacklist lookups into shared MGETs.
+
+    Returns:
+        BlacklistBatcher: Batcher on the shared asyncio Redis client
+    """
+    global _blacklist_batcher
+    if _blacklist_batcher is None:
+        _blacklist_batcher = BlacklistBatcher(redis_async, blacklist_prefilter)
+    return _blacklist_batcher
+
+
 class UserContext(BaseModel):
     """
     User context extracted from validated JWT token.
@@ -114,7 +182,7 @@ def extract_token_from_header(authorization: Optional[str] = Header(None)) -> st
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return authorization.replace("Bearer ", "")
+    return authorization[7:]  # len("Bearer "), checked above
 
 
 def check_token_blacklist(jti: Optional[str]) -> bool:
@@ -130,21 +198,57 @@ def check_token_blacklist(jti: Optional[str]) -> bool:
     if not jti:
         return False  # No JTI claim, cannot check blacklist
 
+    # In-process Bloom filter rules out almost every jti without Redis
+    if not blacklist_prefilter.might_contain(jti):
+        return False
+
     redis_client = get_redis_client()
     if not redis_client:
         logger.warning("Redis unavailable - token blacklist check skipped")
         return False  # Fail open (security risk, but prevents downtime)
 
     try:
-        blacklist_key = f"blacklist:{jti}"
-        is_blacklisted = redis_client.exists(blacklist_key)
+        is_blacklisted = redis_client.exists(blacklist_key(jti))
         return bool(is_blacklisted)
     except Exception as e:
         logger.error(f"Redis blacklist check failed: {e}")
         return False  # Fail open
 
 
-def validate_jwt_token(token: str) -> dict:
+async def check_token_blacklist_async(jti: Optional[str]) -> bool:
+    """
+    Check if token is blacklisted (revoked), batched with concurrent checks.
+
+    Same result and fail-open policy as check_token_blacklist, but lookups
+    from concurrent requests share one Redis round-trip.
+
+    Args:
+        jti: JWT ID from token claims
+
+    Returns:
+        bool: True if token is blacklisted, False otherwise
+    """
+    if not jti:
+        return False  # No JTI claim, cannot check blacklist
+
+    try:
+        return await get_blacklist_batcher().is_blacklisted(jti)
+    except Exception as e:
+        logger.error(f"Redis blacklist check failed: {e}")
+        return False  # Fail open
+
+
+def raise_token_revoked(jti: Optional[str]):
+    """Reject a request whose token has been revoked"""
+    logger.warning(f"Blacklisted token used: jti={jti}")
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def validate_jwt_token(token: str, check_blacklist: bool = True) -> dict:
     """
     Validate JWT token with RS256/HS256 signature verification.
 
@@ -157,6 +261,8 @@ def validate_jwt_token(token: str) -> dict:
 
     Args:
         token: JWT token string
+        check_blacklist: Run step 5 here; async callers pass False and
+            await check_token_blacklist_async instead
 
     Returns:
         dict: Decoded JWT payload with claims
@@ -166,16 +272,14 @@ def validate_jwt_token(token: str) -> dict:
     """
     try:
         # Step 1: Explicitly whitelist algorithms to prevent algorithm confusion attacks
-        allowed_algorithms = ["RS256", "HS256"]
-
-        if JWT_ALGORITHM not in allowed_algorithms:
+        if JWT_ALGORITHM not in _ALLOWED_ALGORITHMS:
             logger.error(f"Unsafe JWT algorithm configured: {JWT_ALGORITHM}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="JWT algorithm configuration error"
             )
 
-        # Step 2: Determine verification key based on algorithm
+        # Step 2: Check the verification key for the algorithm is configured
         if JWT_ALGORITHM == "RS256":
             if not JWT_PUBLIC_KEY:
                 logger.error("JWT_PUBLIC_KEY not configured for RS256 verification")
@@ -183,7 +287,6 @@ def validate_jwt_token(token: str) -> dict:
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="JWT public key not configured"
                 )
-            verification_key = JWT_PUBLIC_KEY
         else:  # HS256
             if not JWT_SECRET_KEY:
                 logger.error("JWT_SECRET_KEY not configured for HS256 verification")
@@ -191,30 +294,39 @@ def validate_jwt_token(token: str) -> dict:
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="JWT secret key not configured"
                 )
-            verification_key = JWT_SECRET_KEY
-
-        # Step 3: Decode and verify JWT with signature validation
-        payload = jwt.decode(
-            token,
-            verification_key,
-            algorithms=[JWT_ALGORITHM],  # Explicit algorithm whitelist
-            options={
-                "verify_signature": True,  # ✅ CRITICAL: Always verify signature in production
-                "verify_exp": True,  # Verify expiration
-                "verify_iat": True,  # Verify issued-at
-                "require": ["exp", "sub"],  # Require expiration and subject claims
-            }
-        )
 
-        # Step 4: Check token blacklist (revoked tokens)
-        jti = payload.get("jti")
-        if check_token_blacklist(jti):
-            logger.warning(f"Blacklisted token used: jti={jti}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
+        # Step 3: Decode and verify JWT with signature validation. Tokens
+        # verified in the last few seconds are served from the cache (expiry
+        # is re-checked there); the blacklist below is checked either way
+        cache_key = VerifiedTokenCache.key(token)
+        payload = _token_cache.get(cache_key)
+        if payload is None:
+            # Reject a wrong algorithm from the (cached) header alone, and
+            # pick the verification key by kid, before entering jwt.decode
+            header = token_header(token)
+            if header.get("alg") != JWT_ALGORITHM:
+                raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+
+            if JWT_ALGORITHM == "RS256":
+                verification_key = _rs256_public_keys_by_kid(JWT_PUBLIC_KEYS).get(
+                    header.get("kid")
+                ) or _rs256_public_key(JWT_PUBLIC_KEY)
+            else:
+                verification_key = _hs256_secret(JWT_SECRET_KEY)
+
+            payload = jwt.decode(
+                token,
+                verification_key,
+                algorithms=_JWT_ALGS,
+                options=_JWT_OPTIONS
             )
+            _token_cache.put(cache_key, payload)
+
+        # Step 4: Check token blacklist (revoked tokens)
+        if check_blacklist:
+            jti = payload.get("jti")
+            if check_token_blacklist(jti):
+                raise_token_revoked(jti)
 
         return payload
 
@@ -256,7 +368,7 @@ def validate_jwt_token(token: str) -> dict:
         )
 
 
-def get_current_user(authorization: Optional[str] = Header(None)) -> UserContext:
+async def get_current_user(authorization: Optional[str] = Header(None)) -> UserContext:
     """
     FastAPI dependency to extract and validate current user from JWT token.
 
@@ -279,9 +391,29 @@ def get_current_user(authorization: Optional[str] = Header(None)) -> UserContext
     # Extract token from header
     token = extract_token_from_header(authorization)
 
-    # Validate token and get payload
-    payload = validate_jwt_token(token)
+    # Validate token and get payload; the blacklist lookup is awaited so
+    # concurrent requests share one Redis round-trip
+    payload = validate_jwt_token(token, check_blacklist=False)
+    jti = payload.get("jti")
+    if await check_token_blacklist_async(jti):
+        raise_token_revoked(jti)
+
+    return user_context_from_payload(payload)
+
+
+def user_context_from_payload(payload: dict) -> UserContext:
+    """
+    Build the user context from validated JWT claims.
 
+    Args:
+        payload: Decoded JWT payload
+
+    Returns:
+        UserContext: User context
+
+    Raises:
+        HTTPException: If required claims are missing
+    """
     # Extract required user context
     user_id = payload.get("sub") or payload.get("user_id")
     tenant_id = payload.get("tenant_id")
@@ -326,5 +458,6 @@ def extract_user_from_jwt(authorization: str) -> tuple[str, str, str]:
     Raises:
         HTTPException: If token validation fails
     """
-    user_context = get_current_user(authorization)
+    token = extract_token_from_header(authorization)
+    user_context = user_context_from_payload(validate_jwt_token(token))
     return user_context.user_id, user_context.tenant_id, user_context.email
@@ -0,0 +1,176 @@
+"""
+@file        blacklist.py
+@brief       Batched Redis lookups of revoked JWT IDs
+@copyright   (c) 2025 FtsCoDe GmbH. All rights reserved.
+@author      Heinstein F.
+@date        2025-11-15
+
+@details
+Every authenticated request checks its token's jti against the Redis
+blacklist. One round-trip per request serializes concurrent requests on
+Redis latency, so lookups made within a short window are coalesced into a
+single MGET and each caller is answered from its key's slot.
+
+Revoked tokens are a tiny fraction of traffic, so a Bloom filter of the
+blacklisted jtis, rebuilt from Redis every few seconds, answers the common
+"not revoked" case in process. Only possible hits go to Redis. A token
+revoked after the last rebuild is caught at the next one; until the filter
+has loaded, or when it is stale, every lookup goes to Redis.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Lookups made within this window (seconds) share one MGET, flushed early
+# at _BLACKLIST_BATCH_MAX distinct jtis
+_BLACKLIST_BATCH_WINDOW = 0.001
+_BLACKLIST_BATCH_MAX = 64
+
+# Seconds between prefilter rebuilds; a filter not rebuilt for three
+# intervals (Redis unreachable) is no longer trusted
+_PREFILTER_REFRESH_SECONDS = float(os.getenv("BLACKLIST_PREFILTER_REFRESH_SECONDS", "2.0"))
+_PREFILTER_MIN_CAPACITY = 10000
+_PREFILTER_ERROR_RATE = 0.001
+
+
+def blacklist_key(jti: str) -> str:
+    """Redis key marking jti as revoked (written by the auth service)"""
+    return f"blacklist:{jti}"
+
+
+class _BloomFilter:
+    """Fixed-size Bloom filter of strings (k positions by double hashing)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self._size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._size for i in range(self._hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistPrefilter:
+    """
+    In-process "maybe revoked" test in front of the Redis blacklist.
+
+    No false negatives as of the last rebuild: a jti the filter rejects was
+    not blacklisted then.
+    """
+
+    def __init__(self, refresh_seconds: float = _PREFILTER_REFRESH_SECONDS):
+        self._refresh_seconds = refresh_seconds
+        self._filter: Optional[_BloomFilter] = None
+        self._fresh_until = 0.0
+
+    def might_contain(self, jti: str) -> bool:
+        """False only if jti is known not to be blacklisted"""
+        if self._filter is None or time.monotonic() > self._fresh_until:
+            return True
+        return jti in self._filter
+
+    def load(self, jtis: Iterable[str]):
+        """Replace the filter with one holding exactly jtis"""
+        jtis = list(jtis)
+        bloom = _BloomFilter(max(2 * len(jtis), _PREFILTER_MIN_CAPACITY), _PREFILTER_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+        self._fresh_until = time.monotonic() + 3 * self._refresh_seconds
+
+    async def refresh(self, redis_client: aioredis.Redis):
+        """Rebuild from the blacklist keys currently in Redis"""
+        prefix = blacklist_key("")
+        jtis = [key[len(prefix):] async for key in redis_client.scan_iter(match=f"{prefix}*", count=1000)]
+        self.load(jtis)
+
+    async def run(self, redis_client: aioredis.Redis):
+        """Rebuild every refresh interval until cancelled (application lifespan)"""
+        while True:
+            try:
+                await self.refresh(redis_client)
+            except Exception as e:
+                logger.warning(f"Blacklist prefilter refresh failed: {e}")
+            await asyncio.sleep(self._refresh_seconds)
+
+
+# Shared by every blacklist check in the process; refreshed by main.lifespan
+blacklist_prefilter = BlacklistPrefilter()
+
+
+class BlacklistBatcher:
+    """
+    Coalesces concurrent blacklist checks into one MGET per batch.
+
+    Redis errors are raised to every caller of the failed batch, so each
+    caller keeps its own fail-open/fail-closed policy. jtis the prefilter
+    rules out are answered without Redis.
+    """
+
+    def __init__(self, redis_client: aioredis.Redis, prefilter: Optional[BlacklistPrefilter] = None):
+        self._redis = redis_client
+        self._prefilter = prefilter
+        # jti -> futures of the callers waiting on it (a token used by
+        # concurrent requests is looked up once)
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle = None
+        # Strong references to in-flight lookups until they complete
+        self._tasks = set()
+
+    async def is_blacklisted(self, jti: str) -> bool:
+        """True if jti has been revoked"""
+        if self._prefilter is not None and not self._prefilter.might_contain(jti):
+            return False
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(jti, []).append(future)
+        if len(self._pending) >= _BLACKLIST_BATCH_MAX:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(_BLACKLIST_BATCH_WINDOW, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._lookup(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _lookup(self, batch: Dict[str, List[asyncio.Future]]):
+        try:
+            values = await self._redis.mget([blacklist_key(jti) for jti in batch])
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for futures, value in zip(batch.values(), values):
+            for future in futures:
+                if not future.done():
+                    future.set_result(value is not None)
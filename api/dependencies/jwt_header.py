@@ -0,0 +1,44 @@
+"""
+@file        jwt_header.py
+@brief       Cached parsing of the unverified JWT header
+@copyright   (c) 2025 FtsCoDe GmbH. All rights reserved.
+@author      Heinstein F.
+@date        2025-11-15
+
+@details
+The header ({"alg", "typ", "kid"}) is enough to reject a token signed with
+the wrong algorithm, and to pick the verification key, before paying for
+jwt.decode. Every token from one issuer and key carries the same header
+segment, so parses are cached on that segment alone; the cache never sees
+the payload or signature.
+"""
+
+import functools
+import json
+
+import jwt
+from jwt.utils import base64url_decode
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_header_segment(segment: str) -> dict:
+    try:
+        header = json.loads(base64url_decode(segment))
+    except (ValueError, TypeError) as e:
+        raise jwt.DecodeError(f"Invalid header: {e}") from e
+    if not isinstance(header, dict):
+        raise jwt.DecodeError("Invalid header: must be a JSON object")
+    return header
+
+
+def token_header(token: str) -> dict:
+    """
+    Unverified header of token. Do not trust it beyond choosing how to verify.
+
+    Raises:
+        jwt.DecodeError: If the header segment is not base64url-encoded JSON
+    """
+    segment, dot, _ = token.partition(".")
+    if not dot:
+        raise jwt.DecodeError("Not enough segments")
+    return _parse_header_segment(segment)
@@ -0,0 +1,67 @@
+"""
+@file        token_cache.py
+@brief       Short-lived cache of verified JWT payloads
+@copyright   (c) 2025 FtsCoDe GmbH. All rights reserved.
+@author      Heinstein F.
+@date        2025-11-15
+
+@details
+Signature verification (RS256) is the dominant cost of authenticating a
+request, and a client sends the same bearer token on every request. The
+cache keeps the decoded claims of recently verified tokens for a few
+seconds so repeat requests skip jwt.decode.
+
+Only the signature and claim checks are cached: a hit re-checks expiry
+here, and callers still consult the revocation blacklist on every request.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Optional
+
+import jwt
+from cachetools import TTLCache
+
+# Defaults: entries live this many seconds, at most this many tokens
+TOKEN_CACHE_TTL = 5.0
+TOKEN_CACHE_MAXSIZE = 10000
+
+
+class VerifiedTokenCache:
+    """
+    Bounded TTL cache of decoded JWT payloads, keyed by SHA-256 of the token.
+
+    Tokens are hashed so the cache never holds usable credentials.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_MAXSIZE, ttl: float = TOKEN_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # TTLCache is not thread-safe; sync dependencies run on a threadpool
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        """Cache key for token"""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        """
+        Payload cached under key, or None on a miss.
+
+        Raises:
+            jwt.ExpiredSignatureError: If the cached token has expired since
+                it was verified (as jwt.decode would)
+        """
+        with self._lock:
+            payload = self._cache.get(key)
+        if payload is not None:
+            exp = payload.get("exp")
+            if exp is not None and exp <= time.time():
+                raise jwt.ExpiredSignatureError("Signature has expired")
+        return payload
+
+    def put(self, key: bytes, payload: dict):
+        """Cache the payload of a token that passed verification"""
+        with self._lock:
+            self._cache[key] = payload
@@ -7,12 +7,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from routers import auth, upload, payment, notification, oauth, email
-from middleware.jwt_middleware import JWTMiddleware
-from middleware.rate_limit_middleware import RateLimitMiddleware
-from middleware.logging_middleware import LoggingMiddleware
+from middleware.request_middleware import RequestMiddleware
+from clients._channel import close_channels, warm_channels
+from clients._config import GrpcConfig
+from clients.redis_pool import redis_async
+from dependencies.blacklist import blacklist_prefilter
 
 
 @asynccontextmanager
@@ -21,9 +24,15 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting FastAPI BFF on port 8000...")
     print("gRPC backends: auth:50051, upload:50052, payment:50053, notification:50054")
+    # Connect the shared channel pools now, not on each pool's first request
+    await warm_channels(GrpcConfig.load().addresses)
+    # Keep the in-process blacklist prefilter in step with Redis
+    prefilter_task = asyncio.create_task(blacklist_prefilter.run(redis_async))
     yield
     # Shutdown
     print("Shutting down FastAPI BFF...")
+    prefilter_task.cancel()
+    await close_channels()
 
 
 app = FastAPI(
@@ -59,10 +68,8 @@ if "*" not in allowed_hosts:  # Only restrict if not wildcard
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
 
 # Custom middleware (executes in REVERSE order - last added = first executed)
-# Execution order: JWT → RateLimit → Logging
-app.add_middleware(LoggingMiddleware)       # 3rd: Logs all requests (authenticated + metadata)
-app.add_middleware(RateLimitMiddleware)      # 2nd: Rate limit authenticated users
-app.add_middleware(JWTMiddleware)            # 1st: Validate JWT FIRST (skip for public endpoints)
+# One pure ASGI layer runs JWT → RateLimit → Logging (see request_middleware)
+app.add_middleware(RequestMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix="/v1/auth", tags=["authentication"])
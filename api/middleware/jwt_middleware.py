@@ -2,8 +2,7 @@
 JWT validation middleware
 Validates access tokens and extracts user context
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException, status
 from typing import Optional
 import jwt
 import redis
@@ -11,6 +10,11 @@ import os
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 
+from clients.redis_pool import redis_async
+from dependencies.blacklist import BlacklistBatcher, blacklist_prefilter
+from dependencies.jwt_header import token_header
+from dependencies.token_cache import VerifiedTokenCache
+
 # Public endpoints that don't require authentication
 PUBLIC_PATHS = [
     "/health",
@@ -23,11 +27,28 @@ PUBLIC_PATHS = [
     "/redoc"
 ]
 
+# str.startswith takes a tuple: one C-level call checks every prefix
+_PUBLIC_PREFIXES = tuple(PUBLIC_PATHS)
+
+# jwt.decode arguments, built once (jwt.decode only reads them)
+_JWT_ALGS = ["RS256"]  # Explicitly whitelist RS256 only
+_JWT_OPTIONS = {
+    "verify_signature": True,
+    "verify_exp": True,
+    "verify_iat": True,
+    "verify_iss": True,
+    "verify_aud": True,
+}
+
 
-class JWTMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
+class JWTAuthenticator:
+    """
+    JWT validation step of RequestMiddleware.
 
+    Rejections are raised as HTTPException; the middleware renders them.
+    """
+
+    def __init__(self):
         # Load RS256 public key from environment
         jwt_public_key_path = os.getenv("JWT_PUBLIC_KEY_PATH", "certs/jwt_rsa.pub")
         try:
@@ -47,21 +68,31 @@ class JWTMiddleware(BaseHTTPMiddleware):
             else:
                 raise RuntimeError("JWT_PUBLIC_KEY_PATH or JWT_PUBLIC_KEY must be set")
 
-        # Initialize Redis connection for blacklist checking
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+        # Shared asyncio Redis pool for blacklist checking
+        self.redis_client = redis_async
+        # Concurrent requests' lookups share one MGET round-trip; jtis the
+        # prefilter rules out skip Redis entirely
+        self.blacklist = BlacklistBatcher(self.redis_client, blacklist_prefilter)
 
         # JWT validation parameters
         self.issuer = os.getenv("JWT_ISSUER", "saasforge")
         self.audience = os.getenv("JWT_AUDIENCE", "saasforge-api")
 
-    async def dispatch(self, request: Request, call_next):
+        # Payloads of recently verified tokens
+        self.token_cache = VerifiedTokenCache()
+
+    async def authenticate(self, path: str, auth_header: Optional[str]) -> Optional[dict]:
+        """
+        Validate the request's access token.
+
+        Returns:
+            The user context for request.state, or None for public paths
+        """
         # Skip authentication for public paths
-        if any(request.url.path.startswith(path) for path in PUBLIC_PATHS):
-            return await call_next(request)
+        if path.startswith(_PUBLIC_PREFIXES):
+            return None
 
-        # Extract Authorization header
-        auth_header = request.headers.get("Authorization")
+        # Check Authorization header
         if not auth_header or not auth_header.startswith("Bearer "):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,29 +100,32 @@ class JWTMiddleware(BaseHTTPMiddleware):
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        token = auth_header.split(" ")[1]
+        token = auth_header[7:]  # len("Bearer "), checked above
 
         try:
-            # Validate JWT signature with RS256 only (security: prevent algorithm confusion)
-            payload = jwt.decode(
-                token,
-                self.public_key,
-                algorithms=["RS256"],  # Explicitly whitelist RS256 only
-                issuer=self.issuer,
-                audience=self.audience,
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_iss": True,
-                    "verify_aud": True,
-                }
-            )
+            # Validate JWT signature with RS256 only (security: prevent algorithm confusion).
+            # Tokens verified in the last few seconds skip the signature check
+            # (expiry is re-checked); the blacklist below is checked either way
+            cache_key = VerifiedTokenCache.key(token)
+            payload = self.token_cache.get(cache_key)
+            if payload is None:
+                # Reject other algorithms from the (cached) header alone
+                if token_header(token).get("alg") != "RS256":
+                    raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+                payload = jwt.decode(
+                    token,
+                    self.public_key,
+                    algorithms=_JWT_ALGS,
+                    issuer=self.issuer,
+                    audience=self.audience,
+                    options=_JWT_OPTIONS
+                )
+                self.token_cache.put(cache_key, payload)
 
             # Check Redis blacklist for revoked tokens
             jti = payload.get("jti")
             if jti:
-                blacklisted = self.redis_client.exists(f"blacklist:{jti}")
+                blacklisted = await self.blacklist.is_blacklisted(jti)
                 if blacklisted:
                     raise HTTPException(
                         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -99,21 +133,6 @@ class JWTMiddleware(BaseHTTPMiddleware):
                         headers={"WWW-Authenticate": "Bearer"}
                     )
 
-            # Extract user context and attach to request state
-            request.state.user_id = payload.get("sub")
-            request.state.tenant_id = payload.get("tenant_id")
-            request.state.email = payload.get("email")
-            request.state.roles = payload.get("roles", [])
-            request.state.jti = jti  # Store for potential logout
-
-            # Validate required claims
-            if not request.state.user_id or not request.state.tenant_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token missing required claims (sub, tenant_id)",
-                    headers={"WWW-Authenticate": "Bearer"}
-                )
-
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -168,5 +187,21 @@ class JWTMiddleware(BaseHTTPMiddleware):
                 print(f"WARN: Redis blacklist check failed in {environment}: {e}")
                 # Continue with request (token validated, but blacklist not checked)
 
-        response = await call_next(request)
-        return response
+        # Extract user context for request state
+        user = {
+            "user_id": payload.get("sub"),
+            "tenant_id": payload.get("tenant_id"),
+            "email": payload.get("email"),
+            "roles": payload.get("roles", []),
+            "jti": payload.get("jti"),  # Store for potential logout
+        }
+
+        # Validate required claims
+        if not user["user_id"] or not user["tenant_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token missing required claims (sub, tenant_id)",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        return user
@@ -1,53 +0,0 @@
-"""
-Logging middleware
-Logs all requests with correlation ID
-"""
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-import time
-import uuid
-import logging
-
-logger = logging.getLogger(__name__)
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Generate correlation ID
-        correlation_id = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
-        request.state.correlation_id = correlation_id
-
-        start_time = time.time()
-
-        # Log request
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={
-                "correlation_id": correlation_id,
-                "method": request.method,
-                "path": request.url.path,
-                "client_ip": request.client.host
-            }
-        )
-
-        response = await call_next(request)
-
-        # Calculate duration
-        duration = time.time() - start_time
-
-        # Log response
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} - {response.status_code}",
-            extra={
-                "correlation_id": correlation_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration * 1000, 2)
-            }
-        )
-
-        # Add correlation ID to response headers
-        response.headers["X-Correlation-ID"] = correlation_id
-
-        return response
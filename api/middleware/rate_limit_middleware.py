@@ -2,20 +2,64 @@
 Rate limiting middleware
 Implements token bucket algorithm with Redis
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException, status
+from typing import Optional, Tuple
 import redis.asyncio as redis
+import math
 import time
 import os
 
+from clients.redis_pool import redis_async
+
+
+# Atomic token bucket: refill by elapsed time, then take `cost` tokens.
+# KEYS[1] = bucket hash {tokens, ts}
+# ARGV = now_ms, rate (tokens per ms), burst (capacity), cost
+# Returns {allowed, remaining, retry_after_ms}
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+
+-- Refill for the time since the last request, capped at the bucket size
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+-- An idle bucket is full again after burst / rate ms; drop it by then
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate))
+
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+
+class RateLimiter:
+    """
+    Rate limiting step of RequestMiddleware.
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
+    Rejections are raised as HTTPException; the middleware renders them.
+    """
 
-        # Initialize Redis connection
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+    def __init__(self):
+        # Shared asyncio Redis pool
+        self.redis_client = redis_async
 
         # Rate limit configuration
         self.default_rate = int(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))  # requests per minute
@@ -23,15 +67,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self.user_rate = int(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "1000"))  # authenticated users get higher limit
         self.window_seconds = 60  # 1 minute window
 
-    async def dispatch(self, request: Request, call_next):
+        # Sent once with SCRIPT LOAD, then run by SHA (EVALSHA) on every
+        # request; reloaded automatically if Redis answers NOSCRIPT
+        self._bucket_script = self.redis_client.register_script(TOKEN_BUCKET_LUA)
+
+    async def check(self, path: str, client_ip: str, user_id: Optional[str]):
+        """Reject the request if its user (or IP, when anonymous) is over the limit"""
         # Skip rate limiting for health check
-        if request.url.path == "/health":
-            return await call_next(request)
+        if path == "/health":
+            return
 
         # Determine rate limit key (by IP or user)
-        client_ip = request.client.host if request.client else "unknown"
-        user_id = getattr(request.state, "user_id", None)
-
         if user_id:
             rate_key = f"ratelimit:user:{user_id}"
             rate_limit = self.user_rate
@@ -41,12 +87,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         # Check rate limit
         try:
-            allowed = await self.check_rate_limit(rate_key, rate_limit)
+            allowed, retry_after = await self.check_rate_limit(rate_key, rate_limit)
             if not allowed:
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail="Rate limit exceeded. Try again later.",
-                    headers={"Retry-After": "60"}
+                    headers={"Retry-After": str(retry_after)}
                 )
         except redis.RedisError as e:
             # If Redis fails, log but allow request (fail open for availability)
@@ -54,59 +100,27 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             print(f"WARNING: Rate limit check failed (Redis error): {e}")
             # Continue without rate limiting
 
-        response = await call_next(request)
-        return response
-
-    async def check_rate_limit(self, key: str, limit: int) -> bool:
+    async def check_rate_limit(self, key: str, limit: int) -> Tuple[bool, int]:
         """
         Check if request is within rate limit using token bucket algorithm
 
         Token bucket algorithm:
-        - Each user/IP has a bucket with N tokens
+        - Each user/IP has a bucket holding up to burst_size tokens
         - Each request consumes 1 token
-        - Tokens refill at rate R per second
+        - Tokens refill at `limit` per minute
         - If bucket is empty, request is denied
+
+        The whole check is one EVALSHA round-trip.
+
+        Returns:
+            (allowed, seconds until a token is available)
         """
-        current_time = int(time.time())
+        now_ms = int(time.time() * 1000)
+        rate_per_ms = limit / (self.window_seconds * 1000)
 
-        try:
-            # Use Redis Lua script for atomic token bucket check
-            lua_script = """
-            local key = KEYS[1]
-            local limit = tonumber(ARGV[1])
-            local window = tonumber(ARGV[2])
-            local current_time = tonumber(ARGV[3])
-
-            -- Get current count
-            local current = redis.call('GET', key)
-
-            if current and tonumber(current) >= limit then
-                -- Rate limit exceeded
-                return 0
-            else
-                -- Increment counter
-                local new_count = redis.call('INCR', key)
-
-                -- Set expiry on first request
-                if new_count == 1 then
-                    redis.call('EXPIRE', key, window)
-                end
-
-                return 1
-            end
-            """
-
-            result = await self.redis_client.eval(
-                lua_script,
-                1,  # number of keys
-                key,  # KEYS[1]
-                limit,  # ARGV[1]
-                self.window_seconds,  # ARGV[2]
-                current_time  # ARGV[3]
-            )
-
-            return result == 1
+        allowed, _remaining, retry_after_ms = await self._bucket_script(
+            keys=[key],
+            args=[now_ms, rate_per_ms, self.burst_size, 1]
+        )
 
-        except redis.RedisError as e:
-            # Re-raise to be handled by caller
-            raise
+        return allowed == 1, max(1, math.ceil(retry_after_ms / 1000))
@@ -38,6 +38,12 @@ class PresignedUploadResponse(BaseModel):
     headers: Dict[str, str]
 
 
+class UploadCompleteRequest(BaseModel):
+    """Notification that a presigned single-part PUT has finished"""
+    object_key: str = Field(..., min_length=1)
+    etag: Optional[str] = None  # ETag returned by S3 for the PUT
+
+
 class MultipartUploadInitRequest(BaseModel):
     """Request to initiate multipart upload"""
     filename: str = Field(..., min_length=1, max_length=255)
@@ -24,15 +24,18 @@ from models.auth import (
     OTPRequest, OTPVerifyRequest,
     ApiKeyCreateRequest, ApiKeyResponse
 )
+from clients._channel import DEFAULT_TIMEOUT
 from clients.auth_client import AuthClient
+from clients.metadata import bearer_metadata
 from services.email_service import get_email_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_auth_client() -> AuthClient:
+async def get_auth_client() -> AuthClient:
     """Dependency to get AuthClient instance"""
+    # Async so it runs on the event loop its grpc.aio channels are bound to
     return AuthClient()
 
 
@@ -47,12 +50,14 @@ async def register(request: RegisterRequest, auth_client: AuthClient = Depends(g
     """
     try:
         # Call gRPC AuthService.Register
-        response = auth_client.stub.Register(
+        response = await auth_client.stub.Register(
             auth_client.stub.RegisterRequest(
                 email=request.email,
                 password=request.password,
                 full_name=request.full_name
-            )
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         # Send welcome email asynchronously
@@ -96,7 +101,7 @@ async def login(request: LoginRequest, auth_client: AuthClient = Depends(get_aut
     If 2FA is enabled, returns HTTP 403 with requires_2fa flag.
     """
     try:
-        response = auth_client.login(
+        response = await auth_client.login(
             email=request.email,
             password=request.password,
             totp_code=request.totp_code
@@ -152,7 +157,7 @@ async def refresh_token(request: RefreshTokenRequest, auth_client: AuthClient =
     Detects token reuse attacks.
     """
     try:
-        response = auth_client.refresh_token(request.refresh_token)
+        response = await auth_client.refresh_token(request.refresh_token)
 
         return RefreshTokenResponse(
             access_token=response.access_token,
@@ -194,7 +199,7 @@ async def logout(
     """
     try:
         if request.refresh_token:
-            auth_client.logout(request.refresh_token)
+            await auth_client.logout(request.refresh_token)
 
         return None  # 204 No Content
 
@@ -218,13 +223,15 @@ async def totp_enroll(
     """
     try:
         # Extract JWT from Authorization header
-        access_token = authorization.replace("Bearer ", "")
+        access_token = authorization.removeprefix("Bearer ")
 
         # Call gRPC with token in metadata
-        metadata = [("authorization", f"Bearer {access_token}")]
-        response = auth_client.stub.TOTPEnroll(
+        metadata = bearer_metadata(access_token)
+        response = await auth_client.stub.TOTPEnroll(
             auth_client.stub.TOTPEnrollRequest(),
-            metadata=metadata
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return TOTPEnrollResponse(
@@ -254,12 +261,14 @@ async def totp_verify(
     Enables 2FA for the account.
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        response = auth_client.stub.TOTPVerify(
+        response = await auth_client.stub.TOTPVerify(
             auth_client.stub.TOTPVerifyRequest(code=request.code),
-            metadata=metadata
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return TOTPVerifyResponse(backup_codes=list(response.backup_codes))
@@ -290,12 +299,14 @@ async def totp_disable(
     Removes TOTP secret and backup codes.
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        auth_client.stub.TOTPDisable(
+        await auth_client.stub.TOTPDisable(
             auth_client.stub.TOTPDisableRequest(),
-            metadata=metadata
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return None
@@ -319,12 +330,14 @@ async def regenerate_backup_codes(
     Invalidates old backup codes and generates new ones.
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        response = auth_client.stub.RegenerateBackupCodes(
+        response = await auth_client.stub.RegenerateBackupCodes(
             auth_client.stub.RegenerateBackupCodesRequest(),
-            metadata=metadata
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return TOTPVerifyResponse(backup_codes=list(response.backup_codes))
@@ -345,11 +358,13 @@ async def two_factor_verify(request: TwoFactorVerifyRequest, auth_client: AuthCl
     Completes authentication after successful 2FA verification.
     """
     try:
-        response = auth_client.stub.TwoFactorVerify(
+        response = await auth_client.stub.TwoFactorVerify(
             auth_client.stub.TwoFactorVerifyRequest(
                 temp_token=request.temp_token,
                 code=request.code
-            )
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return LoginResponse(
@@ -378,11 +393,13 @@ async def two_factor_backup_code(request: TwoFactorBackupCodeRequest, auth_clien
     Backup code is consumed after use.
     """
     try:
-        response = auth_client.stub.TwoFactorBackupCode(
+        response = await auth_client.stub.TwoFactorBackupCode(
             auth_client.stub.TwoFactorBackupCodeRequest(
                 temp_token=request.temp_token,
                 code=request.code
-            )
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return LoginResponse(
@@ -497,11 +514,13 @@ async def password_reset_confirm(request: PasswordResetConfirmRequest, auth_clie
     try:
         # Call gRPC password reset
         # Note: gRPC service should also validate the token independently
-        auth_client.stub.PasswordReset(
+        await auth_client.stub.PasswordReset(
             auth_client.stub.PasswordResetRequest(
                 token=request.token,
                 new_password=request.new_password
-            )
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return {"message": "Password reset successful"}
@@ -526,15 +545,17 @@ async def password_change(
     Requires current password for verification.
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        auth_client.stub.PasswordChange(
+        await auth_client.stub.PasswordChange(
             auth_client.stub.PasswordChangeRequest(
                 current_password=request.current_password,
                 new_password=request.new_password
             ),
-            metadata=metadata
+            metadata=metadata,
+            timeout=DEFAULT_TIMEOUT,
+            wait_for_ready=False
         )
 
         return {"message": "Password changed successfully"}
@@ -713,10 +734,10 @@ async def create_api_key(
     Returns plaintext key (only shown once).
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        response = auth_client.create_api_key(
+        response = await auth_client.create_api_key(
             name=request.name,
             scopes=request.scopes,
             metadata=metadata
@@ -752,10 +773,10 @@ async def revoke_api_key(
     Marks key as revoked in database.
     """
     try:
-        access_token = authorization.replace("Bearer ", "")
-        metadata = [("authorization", f"Bearer {access_token}")]
+        access_token = authorization.removeprefix("Bearer ")
+        metadata = bearer_metadata(access_token)
 
-        auth_client.revoke_api_key(key_id=key_id, metadata=metadata)
+        await auth_client.revoke_api_key(key_id=key_id, metadata=metadata)
 
         return None
 
@@ -7,7 +7,6 @@ from starlette.config import Config
 import os
 import secrets
 from typing import Optional
-import redis.asyncio as redis
 import asyncpg
 from cryptography.fernet import Fernet
 import jwt
@@ -15,6 +14,7 @@ from datetime import datetime, timedelta
 import logging
 
 from clients.auth_client import AuthClient
+from clients.redis_pool import redis_async
 
 router = APIRouter(prefix="/oauth", tags=["oauth"])
 logger = logging.getLogger(__name__)
@@ -64,18 +64,13 @@ oauth.register(
     }
 )
 
-# Redis for state storage
-redis_client = None
+# Postgres pool and cipher (lazy)
 db_pool = None
 cipher_suite = None
 
 async def get_redis():
-    """Get Redis client for state storage."""
-    global redis_client
-    if redis_client is None:
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        redis_client = await redis.from_url(redis_url, decode_responses=True)
-    return redis_client
+    """Get the shared Redis client for state storage."""
+    return redis_async
 
 async def get_db():
     """Get PostgreSQL connection pool."""
@@ -8,6 +8,7 @@
 @details
 Handles:
 - Presigned URL generation for uploads
+- Upload completion after the client's direct PUT to S3
 - Multipart upload support for large files
 - Presigned download URLs
 - Storage quota checking
@@ -18,6 +19,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Header
 from typing import Optional
 from models.upload import (
     PresignedUploadRequest, PresignedUploadResponse,
+    UploadCompleteRequest,
     MultipartUploadInitRequest, MultipartUploadInitResponse,
     MultipartPartUrlsResponse,
     MultipartUploadCompleteRequest, MultipartUploadCompleteResponse,
@@ -103,6 +105,57 @@ async def generate_presigned_upload(
         )
 
 
+@router.post("/complete", response_model=ObjectMetadataResponse)
+async def complete_upload(
+    request: UploadCompleteRequest,
+    user: UserContext = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """
+    Confirm a direct-to-S3 upload made with a URL from /presign
+
+    File bytes never pass through the API or the gRPC services: the client
+    PUTs them to S3, then calls this endpoint with the object key so the
+    server only handles the small control messages.
+
+    **Flow:**
+    1. Validate JWT and object ownership
+    2. HEAD the object to confirm the PUT landed (and matches the ETag)
+    3. Return the stored object's metadata
+    """
+    user_id, tenant_id = user.user_id, user.tenant_id
+
+    # Verify object belongs to user ({folder}/{tenant_id}/{user_id}/..., any
+    # folder /presign accepts)
+    folder, _, rest = request.object_key.partition("/")
+    if folder not in ("uploads", "avatars", "documents", "temp") or not rest.startswith(f"{tenant_id}/{user_id}/"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    try:
+        metadata = await s3_service.get_object_metadata(request.object_key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete upload: {str(e)}"
+        )
+
+    if request.etag and request.etag.strip('"') != (metadata['etag'] or '').strip('"'):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Uploaded object does not match the given ETag"
+        )
+
+    return ObjectMetadataResponse(**metadata)
+
+
 @router.post("/multipart/init", response_model=MultipartUploadInitResponse)
 async def initiate_multipart_upload(
     request: MultipartUploadInitRequest,
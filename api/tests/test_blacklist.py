@@ -0,0 +1,101 @@
+"""
+Tests for batched JWT blacklist lookups
+"""
+import asyncio
+import os
+
+import pytest
+import redis
+
+from clients.redis_pool import redis_async
+from dependencies import auth
+from dependencies.blacklist import BlacklistBatcher, BlacklistPrefilter
+
+
+class FakeRedis:
+    """Async Redis stand-in recording each MGET"""
+
+    def __init__(self, store):
+        self.store = store
+        self.mget_calls = []
+
+    async def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        return [self.store.get(key) for key in keys]
+
+    async def scan_iter(self, match, count):
+        for key in self.store:
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+
+async def test_concurrent_lookups_share_one_mget():
+    """Checks made together are answered from a single MGET"""
+    redis_client = FakeRedis({"blacklist:revoked": '{"reason":"logout"}'})
+    batcher = BlacklistBatcher(redis_client)
+
+    results = await asyncio.gather(
+        batcher.is_blacklisted("revoked"),
+        batcher.is_blacklisted("valid"),
+        batcher.is_blacklisted("revoked"),
+    )
+
+    assert results == [True, False, True]
+    assert redis_client.mget_calls == [["blacklist:revoked", "blacklist:valid"]]
+
+
+async def test_redis_error_reaches_every_caller():
+    """A failed MGET is raised to each caller of the batch"""
+    class FailingRedis:
+        async def mget(self, keys):
+            raise ConnectionError("redis down")
+
+    batcher = BlacklistBatcher(FailingRedis())
+
+    results = await asyncio.gather(
+        batcher.is_blacklisted("a"),
+        batcher.is_blacklisted("b"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_prefilter_answers_unlisted_jtis_without_redis():
+    """Only jtis the Bloom filter may contain are looked up in Redis"""
+    redis_client = FakeRedis({"blacklist:revoked": '{"reason":"logout"}', "session:x": "1"})
+    prefilter = BlacklistPrefilter()
+    await prefilter.refresh(redis_client)
+    batcher = BlacklistBatcher(redis_client, prefilter)
+
+    assert await batcher.is_blacklisted("valid") is False
+    assert redis_client.mget_calls == []
+
+    assert await batcher.is_blacklisted("revoked") is True
+    assert redis_client.mget_calls == [["blacklist:revoked"]]
+
+
+def test_prefilter_defers_to_redis_until_loaded_and_when_stale():
+    """An unloaded or stale filter never rules a jti out"""
+    prefilter = BlacklistPrefilter(refresh_seconds=60)
+    assert prefilter.might_contain("valid")
+
+    prefilter.load([])
+    assert not prefilter.might_contain("valid")
+
+    stale = BlacklistPrefilter(refresh_seconds=0)
+    stale.load([])
+    assert stale.might_contain("valid")
+
+
+def test_sync_and_async_clients_use_the_same_database(monkeypatch):
+    """check_token_blacklist and check_token_blacklist_async read one Redis DB"""
+    monkeypatch.setattr(auth, "_redis_client", None)
+    monkeypatch.setattr(redis.Redis, "ping", lambda self: True)
+
+    sync_kwargs = auth.get_redis_client().connection_pool.connection_kwargs
+    async_kwargs = redis_async.connection_pool.connection_kwargs
+
+    for key in ("host", "port", "db"):
+        assert sync_kwargs.get(key) == async_kwargs.get(key)
+    assert sync_kwargs.get("db") == int(os.environ.get("REDIS_DB", "0"))
@@ -0,0 +1,218 @@
+"""
+Tests for unary-style calls multiplexed over long-lived streams
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import grpc
+import jwt
+import pytest
+
+from clients import _stream, notification_client, payment_client
+from clients._channel import close_channels
+from clients._stream import CallStream, StreamCache
+
+METADATA_A = (("authorization", "Bearer a"),)
+METADATA_B = (("authorization", "Bearer b"),)
+
+
+class FakeStreamCall:
+    """Bidirectional call answering each request in order.
+
+    "denied" gets a failed result, "end" ends the stream, and "break"
+    fails the whole call with an RpcError.
+    """
+
+    def __init__(self, requests, metadata=None):
+        self.requests = requests
+        self.metadata = metadata
+
+    def __aiter__(self):
+        return self._results()
+
+    async def _results(self):
+        async for request in self.requests:
+            if request == "end":
+                return
+            if request == "break":
+                raise grpc.RpcError("connection reset")
+            if request == "denied":
+                yield SimpleNamespace(code=grpc.StatusCode.PERMISSION_DENIED.value[0], message="denied", response=None)
+            else:
+                yield SimpleNamespace(code=grpc.StatusCode.OK.value[0], message="", response=f"ok:{request}")
+
+
+class FakePool:
+    """Channel pool with one channel"""
+
+    def next_index(self):
+        return 0
+
+
+class RecordingMethod:
+    """Streaming multicallable recording the calls it opens"""
+
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, requests, metadata=None):
+        call = FakeStreamCall(requests, metadata)
+        self.opened.append(call)
+        return call
+
+
+async def test_calls_are_answered_in_order():
+    """Each call gets the result read for its request"""
+    stream = CallStream(FakeStreamCall)
+
+    results = await asyncio.gather(stream.call("a"), stream.call("b"), stream.call("c"))
+
+    assert results == ["ok:a", "ok:b", "ok:c"]
+
+
+async def test_failed_result_raises_for_its_call_only():
+    """A non-OK result becomes that call's RpcError; the stream stays open"""
+    stream = CallStream(FakeStreamCall)
+
+    with pytest.raises(grpc.RpcError) as exc_info:
+        await stream.call("denied")
+
+    assert exc_info.value.code() == grpc.StatusCode.PERMISSION_DENIED
+    assert await stream.call("a") == "ok:a"
+    assert not stream.closed
+
+
+async def test_stream_end_fails_unanswered_calls():
+    """Calls still waiting when the stream ends get UNAVAILABLE"""
+    stream = CallStream(FakeStreamCall)
+
+    results = await asyncio.gather(stream.call("a"), stream.call("end"), return_exceptions=True)
+
+    assert results[0] == "ok:a"
+    assert results[1].code() == grpc.StatusCode.UNAVAILABLE
+    assert stream.closed
+
+
+async def test_rpc_error_reaches_unanswered_calls():
+    """A failed stream raises its error to every waiting call"""
+    stream = CallStream(FakeStreamCall)
+
+    results = await asyncio.gather(stream.call("break"), stream.call("a"), return_exceptions=True)
+
+    assert all(isinstance(result, grpc.RpcError) for result in results)
+    assert stream.closed
+
+
+async def test_close_answers_queued_calls():
+    """Closing stops sending but calls already queued are still answered"""
+    stream = CallStream(FakeStreamCall)
+    pending = stream.call("a")
+    stream.close()
+
+    assert stream.closed
+    assert await pending == "ok:a"
+
+
+async def test_cache_reuses_stream_per_metadata():
+    """Calls with the same metadata share a stream opened with it"""
+    method = RecordingMethod()
+    cache = StreamCache(FakePool(), (method,))
+
+    assert cache.get(METADATA_A) is cache.get(METADATA_A)
+    assert cache.get(METADATA_B) is not cache.get(METADATA_A)
+    assert [call.metadata for call in method.opened] == [METADATA_A, METADATA_B]
+
+
+async def test_cache_replaces_closed_stream():
+    """A stream that ended is replaced on the next call"""
+    cache = StreamCache(FakePool(), (RecordingMethod(),))
+    stream = cache.get(METADATA_A)
+    stream.close()
+
+    replacement = cache.get(METADATA_A)
+
+    assert replacement is not stream
+    assert await replacement.call("a") == "ok:a"
+
+
+async def test_cache_closes_least_recently_used_stream(monkeypatch):
+    """Past the stream limit the least recently used stream is closed"""
+    monkeypatch.setattr(_stream, "_MAX_STREAMS", 2)
+    cache = StreamCache(FakePool(), (RecordingMethod(),))
+    stream_a = cache.get(METADATA_A)
+    stream_b = cache.get(METADATA_B)
+    cache.get(METADATA_A)  # A is now the most recently used
+
+    cache.get((("authorization", "Bearer c"),))
+
+    assert stream_b.closed
+    assert not stream_a.closed
+    assert cache.get(METADATA_A) is stream_a
+
+
+async def test_idle_stream_closes_and_leaves_the_cache(monkeypatch):
+    """A stream without calls for _IDLE_TIMEOUT is closed and dropped"""
+    monkeypatch.setattr(_stream, "_IDLE_TIMEOUT", 0.01)
+    cache = StreamCache(FakePool(), (RecordingMethod(),))
+    stream = cache.get(METADATA_A)
+    assert await stream.call("a") == "ok:a"
+
+    await asyncio.sleep(0.05)
+
+    assert stream.closed
+    assert cache.get(METADATA_A) is not stream
+
+
+async def test_calls_keep_a_stream_open_until_its_max_age(monkeypatch):
+    """Calls reset the idle timer, but not past the stream's max age"""
+    monkeypatch.setattr(_stream, "_IDLE_TIMEOUT", 0.05)
+    stream = CallStream(FakeStreamCall, max_age=0.1)
+
+    for _ in range(3):
+        await asyncio.sleep(0.03)
+        assert not stream.closed
+        await stream.call("a")
+    await asyncio.sleep(0.05)
+
+    assert stream.closed
+
+
+async def test_stream_closes_when_its_token_expires():
+    """A stream is not kept past the exp of the bearer token it carries"""
+    token = jwt.encode({"sub": "user", "exp": int(time.time()) + 1}, "test-secret-key-of-at-least-32-bytes", algorithm="HS256")
+    metadata = (("authorization", f"Bearer {token}"),)
+    cache = StreamCache(FakePool(), (RecordingMethod(),))
+    stream = cache.get(metadata)
+
+    await asyncio.sleep(1.1)
+
+    assert stream.closed
+    assert cache.get(metadata) is not stream
+
+
+async def test_client_streamed_methods_call_through_the_cache(monkeypatch):
+    """record_usage_streamed and get_notification_status_streamed use the stream cache"""
+    payment = payment_client.PaymentClient(host="payment.test", port=1)
+    notification = notification_client.NotificationClient(host="notification.test", port=1)
+    monkeypatch.setitem(payment._pool._helpers, payment_client._USAGE_STREAMS, StreamCache(FakePool(), (RecordingMethod(),)))
+    monkeypatch.setitem(notification._pool._helpers, notification_client._STATUS_STREAMS, StreamCache(FakePool(), (RecordingMethod(),)))
+
+    usage = await payment.record_usage_streamed("tenant", "sub", "api_calls", 1, 0, METADATA_A)
+    status = await notification.get_notification_status_streamed("tenant", "notification-1", METADATA_A)
+
+    assert usage.startswith("ok:")
+    assert status.startswith("ok:")
+
+
+async def test_close_channels_closes_the_streams():
+    """Streams go with their channel pool; a new pool gets a new cache"""
+    client = payment_client.PaymentClient(host="payment.test", port=1)
+    streams = client._pool.helper(payment_client._USAGE_STREAMS, lambda pool: StreamCache(pool, (RecordingMethod(),)))
+    stream = streams.get(METADATA_A)
+
+    await close_channels()
+
+    assert stream.closed
+    reopened = payment_client.PaymentClient(host="payment.test", port=1)
+    assert reopened._pool.helper(payment_client._USAGE_STREAMS, payment_client._usage_streams) is not streams
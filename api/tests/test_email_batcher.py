@@ -0,0 +1,183 @@
+"""
+Tests for coalescing send_email_batched calls into SendEmailBatch RPCs
+"""
+import asyncio
+from types import SimpleNamespace
+
+import grpc
+
+from clients import notification_client
+from clients._channel import close_channels
+from clients.notification_client import _EmailBatcher
+from notification_pb2 import SendEmailRequest
+
+METADATA_A = (("authorization", "Bearer a"),)
+METADATA_B = (("authorization", "Bearer b"),)
+
+
+class FakeBatchCall:
+    """SendEmailBatch stream answering each item by its recipient"""
+
+    def __init__(self, stub, metadata, drop_last):
+        self.stub = stub
+        self.metadata = metadata
+        self.drop_last = drop_last
+        self.items = None
+
+    async def write(self, request):
+        self.items = list(request.items)
+
+    async def done_writing(self):
+        pass
+
+    async def read(self):
+        self.stub.batches.append((self.metadata, [item.to for item in self.items]))
+        items = self.items[:-1] if self.drop_last else self.items
+        return SimpleNamespace(items=[
+            SimpleNamespace(code=grpc.StatusCode.PERMISSION_DENIED.value[0], message="denied", response=None)
+            if item.to == "denied" else
+            SimpleNamespace(code=grpc.StatusCode.OK.value[0], message="", response=f"sent:{item.to}")
+            for item in items
+        ])
+
+
+class FakeStub:
+    """Stand-in for NotificationServiceStub recording each batch sent"""
+
+    def __init__(self, fail=False, drop_last=False):
+        self.fail = fail
+        self.drop_last = drop_last
+        self.batches = []
+
+    def SendEmailBatch(self, metadata=None, **kwargs):
+        if self.fail:
+            raise grpc.RpcError("unavailable")
+        return FakeBatchCall(self, metadata, self.drop_last)
+
+
+class FakePool:
+    """Channel pool with one channel, handing out the given stub"""
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    def stubs(self, stub_class):
+        return (self.stub,)
+
+    def next_index(self):
+        return 0
+
+
+def email(to):
+    return SendEmailRequest(to=to)
+
+
+async def test_concurrent_sends_share_one_batch():
+    """Calls with the same metadata are sent together and answered in order"""
+    stub = FakeStub()
+    batcher = _EmailBatcher(FakePool(stub))
+
+    results = await asyncio.gather(*(batcher.submit(email(to), METADATA_A) for to in ["a", "b", "c"]))
+
+    assert results == ["sent:a", "sent:b", "sent:c"]
+    assert stub.batches == [(METADATA_A, ["a", "b", "c"])]
+
+
+async def test_batches_are_grouped_by_metadata():
+    """Each caller context gets its own SendEmailBatch call"""
+    stub = FakeStub()
+    batcher = _EmailBatcher(FakePool(stub))
+
+    results = await asyncio.gather(
+        batcher.submit(email("a1"), METADATA_A),
+        batcher.submit(email("b1"), METADATA_B),
+        batcher.submit(email("a2"), METADATA_A),
+    )
+
+    assert results == ["sent:a1", "sent:b1", "sent:a2"]
+    assert sorted(stub.batches) == [(METADATA_A, ["a1", "a2"]), (METADATA_B, ["b1"])]
+
+
+async def test_full_batch_is_sent_without_waiting_for_the_window(monkeypatch):
+    """A group reaching the batch limit is dispatched immediately"""
+    monkeypatch.setattr(notification_client, "_EMAIL_BATCH_WINDOW", 60)
+    monkeypatch.setattr(notification_client, "_EMAIL_BATCH_MAX", 3)
+    stub = FakeStub()
+    batcher = _EmailBatcher(FakePool(stub))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(email(to), METADATA_A) for to in ["a", "b", "c"])),
+        timeout=1,
+    )
+
+    assert results == ["sent:a", "sent:b", "sent:c"]
+    assert stub.batches == [(METADATA_A, ["a", "b", "c"])]
+
+
+async def test_failed_item_raises_for_its_caller_only():
+    """A non-OK item result becomes that caller's RpcError"""
+    batcher = _EmailBatcher(FakePool(FakeStub()))
+
+    results = await asyncio.gather(
+        batcher.submit(email("a"), METADATA_A),
+        batcher.submit(email("denied"), METADATA_A),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "sent:a"
+    assert isinstance(results[1], grpc.RpcError)
+    assert results[1].code() == grpc.StatusCode.PERMISSION_DENIED
+
+
+async def test_missing_results_fail_the_unanswered_callers():
+    """Callers left without an item in a short response get INTERNAL"""
+    batcher = _EmailBatcher(FakePool(FakeStub(drop_last=True)))
+
+    results = await asyncio.gather(
+        batcher.submit(email("a"), METADATA_A),
+        batcher.submit(email("b"), METADATA_A),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "sent:a"
+    assert isinstance(results[1], grpc.RpcError)
+    assert results[1].code() == grpc.StatusCode.INTERNAL
+    assert results[1].details() == "Missing batch result"
+
+
+async def test_rpc_error_reaches_every_caller():
+    """A failed SendEmailBatch call is raised to each caller of the batch"""
+    batcher = _EmailBatcher(FakePool(FakeStub(fail=True)))
+
+    results = await asyncio.gather(
+        batcher.submit(email("a"), METADATA_A),
+        batcher.submit(email("b"), METADATA_A),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, grpc.RpcError) for result in results)
+
+
+async def test_send_email_batched_goes_through_the_batcher(monkeypatch):
+    """NotificationClient.send_email_batched submits to the address's batcher"""
+    stub = FakeStub()
+    client = notification_client.NotificationClient(host="notification.test", port=1)
+    monkeypatch.setitem(client._pool._helpers, notification_client._EMAIL_BATCHER, _EmailBatcher(FakePool(stub)))
+
+    result = await client.send_email_batched(
+        "tenant", "user", "a", "Subject", "<p>Hi</p>", None, None, {}, METADATA_A
+    )
+
+    assert result == "sent:a"
+    assert stub.batches == [(METADATA_A, ["a"])]
+
+
+async def test_close_channels_drops_the_batcher():
+    """After shutdown a new client's pool gets a batcher on its own channels"""
+    client = notification_client.NotificationClient(host="notification.test", port=1)
+    batcher = client._pool.helper(notification_client._EMAIL_BATCHER, _EmailBatcher)
+
+    await close_channels()
+
+    reopened = notification_client.NotificationClient(host="notification.test", port=1)
+    assert reopened._pool.helper(notification_client._EMAIL_BATCHER, _EmailBatcher) is not batcher
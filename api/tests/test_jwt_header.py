@@ -0,0 +1,28 @@
+"""
+Tests for cached JWT header parsing
+"""
+import jwt
+import pytest
+
+from dependencies.jwt_header import token_header
+
+
+def test_returns_unverified_header():
+    """The header is read without verifying the signature"""
+    token = jwt.encode({"sub": "user-1"}, "secret", algorithm="HS256", headers={"kid": "k1"})
+
+    assert token_header(token) == {"alg": "HS256", "kid": "k1", "typ": "JWT"}
+
+
+def test_alg_none_is_visible_before_decode():
+    """An unsigned token's alg is reported so callers can reject it early"""
+    token = jwt.encode({"sub": "user-1"}, None, algorithm="none")
+
+    assert token_header(token)["alg"] == "none"
+
+
+@pytest.mark.parametrize("token", ["not-a-jwt", "!!!.payload.sig", "WzFd.payload.sig"])
+def test_malformed_header_raises_decode_error(token):
+    """Garbage headers fail like jwt.decode would"""
+    with pytest.raises(jwt.DecodeError):
+        token_header(token)
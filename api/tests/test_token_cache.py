@@ -0,0 +1,45 @@
+"""
+Tests for the verified JWT payload cache
+"""
+import time
+
+import jwt
+import pytest
+
+from dependencies.token_cache import VerifiedTokenCache
+
+
+def test_miss_returns_none():
+    """Unknown tokens are a miss"""
+    cache = VerifiedTokenCache()
+    assert cache.get(VerifiedTokenCache.key("token")) is None
+
+
+def test_hit_returns_cached_payload():
+    """A verified token's payload is served from the cache"""
+    cache = VerifiedTokenCache()
+    payload = {"sub": "user-1", "exp": time.time() + 60}
+    cache.put(VerifiedTokenCache.key("token"), payload)
+
+    assert cache.get(VerifiedTokenCache.key("token")) == payload
+    assert cache.get(VerifiedTokenCache.key("other-token")) is None
+
+
+def test_hit_rechecks_expiry():
+    """A token that expired after it was cached is rejected like jwt.decode would"""
+    cache = VerifiedTokenCache()
+    key = VerifiedTokenCache.key("token")
+    cache.put(key, {"sub": "user-1", "exp": time.time() - 1})
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        cache.get(key)
+
+
+def test_entries_expire_after_ttl():
+    """Entries are dropped after the TTL, forcing re-verification"""
+    cache = VerifiedTokenCache(ttl=0.05)
+    key = VerifiedTokenCache.key("token")
+    cache.put(key, {"sub": "user-1", "exp": time.time() + 60})
+
+    time.sleep(0.1)
+    assert cache.get(key) is None
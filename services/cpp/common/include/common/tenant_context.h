@@ -1,5 +1,6 @@
 #pragma once
 
+#include <chrono>
 #include <string>
 #include <grpcpp/grpcpp.h>
 #include <memory>
@@ -18,6 +19,11 @@ struct TenantContext {
     bool validated;  // Indicates if tenant_id was validated against JWT
 };
 
+// Streaming RPCs extract the tenant context once, when the stream opens.
+// Past this age a stream is ended so the client reopens it with its
+// current credentials instead of riding on a logged-out or expired token
+constexpr std::chrono::minutes kMaxStreamAge{5};
+
 class TenantContextInterceptor : public grpc::experimental::Interceptor {
 public:
     explicit TenantContextInterceptor(grpc::experimental::ServerRpcInfo* info);
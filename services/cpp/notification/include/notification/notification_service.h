@@ -5,6 +5,7 @@
 #include "notification.grpc.pb.h"
 #include "common/redis_client.h"
 #include "common/db_pool.h"
+#include "common/tenant_context.h"
 
 namespace saasforge {
 namespace notification {
@@ -62,6 +63,16 @@ public:
         WebhookResponse* response
     ) override;
 
+    grpc::Status SendEmailBatch(
+        grpc::ServerContext* context,
+        grpc::ServerReaderWriter<SendEmailBatchResponse, SendEmailBatchRequest>* stream
+    ) override;
+
+    grpc::Status GetNotificationStatusStream(
+        grpc::ServerContext* context,
+        grpc::ServerReaderWriter<GetNotificationStatusResult, GetNotificationStatusRequest>* stream
+    ) override;
+
 private:
     std::shared_ptr<common::RedisClient> redis_client_;
     std::shared_ptr<common::DbPool> db_pool_;
@@ -71,6 +82,12 @@ private:
     std::string fcm_server_key_;
 
     // Helper methods
+    grpc::Status SendOneEmail(const common::TenantContext& tenant_ctx,
+                              const SendEmailRequest& request,
+                              NotificationResponse* response);
+    grpc::Status GetOneNotificationStatus(const common::TenantContext& tenant_ctx,
+                                          const GetNotificationStatusRequest& request,
+                                          NotificationResponse* response);
     bool CheckUserPreferences(const std::string& user_id, NotificationChannel channel);
     std::string QueueNotification(const std::string& tenant_id, const std::string& user_id,
                                    NotificationChannel channel, const std::string& payload);
@@ -38,6 +38,11 @@ void RunServer() {
 
     ServerBuilder builder;
 
+    // Accept the API gateway's HTTP/2 keepalive pings (every 20s, also on
+    // idle connections) instead of closing the connection with too_many_pings
+    builder.AddChannelArgument(GRPC_ARG_KEEPALIVE_PERMIT_WITHOUT_CALLS, 1);
+    builder.AddChannelArgument(GRPC_ARG_HTTP2_MIN_RECV_PING_INTERVAL_WITHOUT_DATA_MS, 10000);
+
     // Setup mTLS
     const char* ca_cert_path_env = std::getenv("CA_CERT_PATH");
     const char* server_cert_path_env = std::getenv("SERVER_CERT_PATH");
@@ -103,23 +103,75 @@ grpc::Status NotificationServiceImpl::SendEmail(
             return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
         }
 
+        return SendOneEmail(tenant_ctx, *request, response);
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Send email failed: ") + e.what());
+    }
+}
+
+grpc::Status NotificationServiceImpl::SendEmailBatch(
+    grpc::ServerContext* context,
+    grpc::ServerReaderWriter<SendEmailBatchResponse, SendEmailBatchRequest>* stream
+) {
+    try {
+        // One stream carries one caller's metadata, so the tenant context is
+        // extracted once for every batch on it, for at most kMaxStreamAge
+        auto tenant_ctx = common::TenantContextInterceptor::ExtractFromMetadata(context);
+
+        if (tenant_ctx.tenant_id.empty()) {
+            return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
+        }
+
+        SendEmailBatchRequest batch;
+        const auto stream_deadline = std::chrono::steady_clock::now() + common::kMaxStreamAge;
+        while (stream->Read(&batch)) {
+            if (std::chrono::steady_clock::now() > stream_deadline) {
+                return grpc::Status(grpc::StatusCode::UNAVAILABLE, "Stream expired, reopen it");
+            }
+            SendEmailBatchResponse results;
+            for (const auto& item : batch.items()) {
+                // A failed item is reported in its result; the rest still go out
+                auto* result = results.add_items();
+                grpc::Status status = SendOneEmail(tenant_ctx, item, result->mutable_response());
+                result->set_code(status.error_code());
+                result->set_message(status.error_message());
+            }
+            if (!stream->Write(results)) {
+                break;  // Client went away
+            }
+        }
+
+        return grpc::Status::OK;
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Send email batch failed: ") + e.what());
+    }
+}
+
+grpc::Status NotificationServiceImpl::SendOneEmail(
+    const common::TenantContext& tenant_ctx,
+    const SendEmailRequest& request,
+    NotificationResponse* response
+) {
+    try {
         // Check user preferences
-        if (!CheckUserPreferences(request->user_id(), NotificationChannel::EMAIL)) {
+        if (!CheckUserPreferences(request.user_id(), NotificationChannel::EMAIL)) {
             return grpc::Status(grpc::StatusCode::PERMISSION_DENIED, "Email notifications disabled for user");
         }
 
         // Mock email sending (in production, call SendGrid API)
-        std::cout << "Mock: Sending email to " << request->to() << std::endl;
+        std::cout << "Mock: Sending email to " << request.to() << std::endl;
 
         // Queue notification
         std::stringstream payload;
-        payload << "{\"to\":\"" << request->to() << "\","
-                << "\"subject\":\"" << request->subject() << "\","
-                << "\"body_html\":\"" << request->body_html() << "\"}";
+        payload << "{\"to\":\"" << request.to() << "\","
+                << "\"subject\":\"" << request.subject() << "\","
+                << "\"body_html\":\"" << request.body_html() << "\"}";
 
         std::string notification_id = QueueNotification(
             tenant_ctx.tenant_id,
-            request->user_id(),
+            request.user_id(),
             NotificationChannel::EMAIL,
             payload.str()
         );
@@ -322,6 +374,55 @@ grpc::Status NotificationServiceImpl::GetNotificationStatus(
             return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
         }
 
+        return GetOneNotificationStatus(tenant_ctx, *request, response);
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Get notification status failed: ") + e.what());
+    }
+}
+
+grpc::Status NotificationServiceImpl::GetNotificationStatusStream(
+    grpc::ServerContext* context,
+    grpc::ServerReaderWriter<GetNotificationStatusResult, GetNotificationStatusRequest>* stream
+) {
+    try {
+        // One stream carries one caller's metadata, so the tenant context is
+        // extracted once for every request on it, for at most kMaxStreamAge
+        auto tenant_ctx = common::TenantContextInterceptor::ExtractFromMetadata(context);
+
+        if (tenant_ctx.tenant_id.empty()) {
+            return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
+        }
+
+        GetNotificationStatusRequest request;
+        const auto stream_deadline = std::chrono::steady_clock::now() + common::kMaxStreamAge;
+        while (stream->Read(&request)) {
+            if (std::chrono::steady_clock::now() > stream_deadline) {
+                return grpc::Status(grpc::StatusCode::UNAVAILABLE, "Stream expired, reopen it");
+            }
+            // A failed lookup is reported in its result; the stream stays open
+            GetNotificationStatusResult result;
+            grpc::Status status = GetOneNotificationStatus(tenant_ctx, request, result.mutable_response());
+            result.set_code(status.error_code());
+            result.set_message(status.error_message());
+            if (!stream->Write(result)) {
+                break;  // Client went away
+            }
+        }
+
+        return grpc::Status::OK;
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Get notification status stream failed: ") + e.what());
+    }
+}
+
+grpc::Status NotificationServiceImpl::GetOneNotificationStatus(
+    const common::TenantContext& tenant_ctx,
+    const GetNotificationStatusRequest& request,
+    NotificationResponse* response
+) {
+    try {
         auto conn_guard = db_pool_->AcquireConnection();
         pqxx::work txn(*conn_guard);
 
@@ -332,7 +433,7 @@ grpc::Status NotificationServiceImpl::GetNotificationStatus(
             "EXTRACT(EPOCH FROM delivered_at)::bigint as delivered_at, "
             "retry_count "
             "FROM notifications WHERE id = $1 AND tenant_id = $2",
-            request->notification_id(),
+            request.notification_id(),
             tenant_ctx.tenant_id
         );
 
@@ -5,6 +5,7 @@
 #include "payment.grpc.pb.h"
 #include "common/redis_client.h"
 #include "common/db_pool.h"
+#include "common/tenant_context.h"
 
 namespace saasforge {
 namespace payment {
@@ -66,6 +67,11 @@ public:
         RecordUsageResponse* response
     ) override;
 
+    grpc::Status RecordUsageStream(
+        grpc::ServerContext* context,
+        grpc::ServerReaderWriter<RecordUsageResult, RecordUsageRequest>* stream
+    ) override;
+
 private:
     std::shared_ptr<common::RedisClient> redis_client_;
     std::shared_ptr<common::DbPool> db_pool_;
@@ -73,6 +79,9 @@ private:
     std::string stripe_webhook_secret_;
 
     // Helper methods
+    grpc::Status RecordOneUsage(const common::TenantContext& tenant_ctx,
+                                const RecordUsageRequest& request,
+                                RecordUsageResponse* response);
     std::string GenerateMockStripeId(const std::string& prefix);
     double CalculateMRR(const std::string& plan_id, int32_t quantity);
 };
@@ -513,13 +513,62 @@ grpc::Status PaymentServiceImpl::RecordUsage(
             return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
         }
 
+        return RecordOneUsage(tenant_ctx, *request, response);
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Record usage failed: ") + e.what());
+    }
+}
+
+grpc::Status PaymentServiceImpl::RecordUsageStream(
+    grpc::ServerContext* context,
+    grpc::ServerReaderWriter<RecordUsageResult, RecordUsageRequest>* stream
+) {
+    try {
+        // One stream carries one caller's metadata, so the tenant context is
+        // extracted once for every request on it, for at most kMaxStreamAge
+        auto tenant_ctx = common::TenantContextInterceptor::ExtractFromMetadata(context);
+
+        if (tenant_ctx.tenant_id.empty()) {
+            return grpc::Status(grpc::StatusCode::UNAUTHENTICATED, "Authentication required");
+        }
+
+        RecordUsageRequest request;
+        const auto stream_deadline = std::chrono::steady_clock::now() + common::kMaxStreamAge;
+        while (stream->Read(&request)) {
+            if (std::chrono::steady_clock::now() > stream_deadline) {
+                return grpc::Status(grpc::StatusCode::UNAVAILABLE, "Stream expired, reopen it");
+            }
+            // A failed record is reported in its result; the stream stays open
+            RecordUsageResult result;
+            grpc::Status status = RecordOneUsage(tenant_ctx, request, result.mutable_response());
+            result.set_code(status.error_code());
+            result.set_message(status.error_message());
+            if (!stream->Write(result)) {
+                break;  // Client went away
+            }
+        }
+
+        return grpc::Status::OK;
+
+    } catch (const std::exception& e) {
+        return grpc::Status(grpc::StatusCode::INTERNAL, std::string("Record usage stream failed: ") + e.what());
+    }
+}
+
+grpc::Status PaymentServiceImpl::RecordOneUsage(
+    const common::TenantContext& tenant_ctx,
+    const RecordUsageRequest& request,
+    RecordUsageResponse* response
+) {
+    try {
         // Verify subscription belongs to tenant
         auto conn_guard = db_pool_->AcquireConnection();
         pqxx::work txn(*conn_guard);
 
         auto sub_check = txn.exec_params(
             "SELECT id FROM subscriptions WHERE id = $1 AND tenant_id = $2",
-            request->subscription_id(),
+            request.subscription_id(),
             tenant_ctx.tenant_id
         );
 
@@ -533,10 +582,10 @@ grpc::Status PaymentServiceImpl::RecordUsage(
             "VALUES ($1, $2, $3, $4, to_timestamp($5)) "
             "RETURNING id",
             tenant_ctx.tenant_id,
-            request->subscription_id(),
-            request->metric_name(),
-            request->quantity(),
-            request->timestamp()
+            request.subscription_id(),
+            request.metric_name(),
+            request.quantity(),
+            request.timestamp()
         );
 
         response->set_success(true);